@@ -0,0 +1,509 @@
+import os
+import threading
+from typing import Callable, List, Optional
+
+from command_pool import COMMAND_TIMEOUT, MAX_PENDING, WORKERS, CommandPool, CommandRejected
+from dispatcher import CommandDispatcher
+from launcher import POWER_DELAY_MINUTES, AppLauncher, LaunchError
+from phrase_cache import PhraseCache
+from speech_worker import PRIORITY_LOW, PRIORITY_NORMAL, SpeechRequest, SpeechWorker
+from startup import StartupProfiler, Lazy, lazy_module
+from tiered_search import TIER_NETWORK
+from tracing import get_tracer
+from database import (inicializar_db, adicionar_informacao, registrar_pesquisa, buscar_informacao,
+                      buscar_por_topico, listar_topicos_pagina, fechar_conexoes,
+                      TAMANHO_PAGINA_TOPICOS)
+
+LISTEN_TIMEOUT = 8  # seconds
+
+# Fixed replies rendered to clips during warm-up, so they play without synthesis
+COMMON_PHRASES = (
+    "Abrindo bloco de notas.", "Abrindo o navegador Chrome.", "Abrindo a calculadora.",
+    "Memória limpa.", "Comando não reconhecido.", "Desculpe, não entendi.",
+    "Erro ao conectar com o serviço de voz.", "O que você gostaria que eu pesquisasse?",
+    "Sobre o que você gostaria de saber?", "Não encontrei informações sobre este tópico.",
+    "Qual tópico devo associar a esta informação?",
+    "Informação salva com sucesso na base de conhecimento.",
+    "Nenhum resultado selecionado para salvar.", "Não consegui abrir o aplicativo.",
+)
+
+
+class Assistant:
+    """Jarvis core: commands, speech, listening and search, without any UI
+
+    Front ends (the Tk window, the headless daemon) supply `log` and set
+    the `on_*` hooks; hooks are called from worker threads. Commands run
+    on a bounded CommandPool, so several may run at once; a prompt and the
+    answer listened for it form one dialog, and only one dialog runs at a
+    time. Each command is traced by the process-wide
+    Tracer when it is enabled. With `use_replica`, knowledge base reads are
+    answered from an in-memory KnowledgeReplica instead of SQLite.
+    """
+    def __init__(self, profiler: Optional[StartupProfiler] = None,
+                 log: Optional[Callable[[str], None]] = None,
+                 engine_factory: Optional[Callable] = None, listen_enabled: bool = True,
+                 workers: int = WORKERS, max_pending: int = MAX_PENDING,
+                 command_timeout: float = COMMAND_TIMEOUT, use_replica: bool = False):
+        self.profiler = profiler or StartupProfiler()
+        self._log = log or print
+        self.listen_enabled = listen_enabled
+        self.use_replica = use_replica
+        self.tracer = get_tracer()
+
+        # Hooks for the front end
+        self.on_result_streamed: Optional[Callable[[str, int, dict], None]] = None
+        self.on_results: Optional[Callable[[str, List[dict]], None]] = None
+        self.on_status: Optional[Callable[[], None]] = None
+        self.on_exit: Optional[Callable[[], None]] = None
+
+        # Clips only make sense for a real engine; test doubles speak nothing
+        self.speech = SpeechWorker(engine_factory, rate=170,
+                                   on_error=lambda e: self.log(f"Erro de voz: {e}"),
+                                   phrase_cache_factory=PhraseCache if engine_factory is None
+                                   else None)
+        self.current_search_results = []
+        self.selected_result = None
+        self.launcher = AppLauncher(on_exit=self._on_app_exit)
+        self.dispatcher = self._build_dispatcher()
+        self.commands = CommandPool(self.execute_command, workers, max_pending, command_timeout,
+                                    on_error=self._on_command_failed)
+        self._listening = threading.Lock()
+        self._dialog = threading.RLock()  # one prompt/listen exchange at a time
+
+        # Heavy subsystems are built on first use or by `warm_up`
+        self._database = Lazy('database', inicializar_db, self.profiler)
+        self._search_cache = Lazy('search_cache', self._create_search_cache, self.profiler)
+        self._search_client = Lazy('search_client', self._create_search_client, self.profiler)
+        self._tiered_search = Lazy('tiered_search', self._create_tiered_search, self.profiler)
+        self._sampler = Lazy('metrics_sampler', self._create_sampler, self.profiler)
+        self._speech_recognition = lazy_module('speech_recognition', self.profiler)
+        self._listener = Lazy('listen_service', self._create_listener, self.profiler)
+        self._requests = lazy_module('requests', self.profiler)
+        self._snapshots = Lazy('page_snapshot', self._create_snapshotter, self.profiler)
+        self._replica = Lazy('kb_replica', self._create_replica, self.profiler)
+
+    def _create_search_cache(self):
+        from search_cache import SearchCache
+        self._database.get()
+        return SearchCache()  # Persistent cache for search results
+
+    def _create_tiered_search(self):
+        from tiered_search import TieredSearch
+        return TieredSearch(self.search_cache, self._fetch_remote)
+
+    def _fetch_remote(self, query: str, on_result=None) -> List[dict]:
+        return self.search_client.search(query, on_result=on_result)
+
+    def _create_search_client(self):
+        from search_client import SearchClient
+        return SearchClient()
+
+    def _create_snapshotter(self):
+        from page_snapshot import PageSnapshotter
+        self._database.get()
+        return PageSnapshotter(on_done=self._on_snapshot_done)
+
+    def _create_replica(self):
+        from kb_replica import KnowledgeReplica
+        self._database.get()
+        return KnowledgeReplica()
+
+    def _on_snapshot_done(self, job) -> None:
+        if job.error is not None:
+            self.log(f"Não foi possível guardar a página {job.url}: {job.error}")
+        else:
+            self.log(f"Página guardada na base: {job.url} ({len(job.text)} caracteres"
+                     f"{', cortada' if job.truncated else ''})")
+
+    def _create_sampler(self):
+        from metrics_sampler import get_sampler
+        return get_sampler()
+
+    def _create_listener(self):
+        from audio_capture import BACKENDS, ListenService, MicrophoneSource
+        backend = BACKENDS[os.environ.get('JARVIS_RECOGNIZER', 'google')]()
+        return ListenService(MicrophoneSource(), backend,
+                             on_utterance=self._on_continuous_utterance,
+                             is_muted=self.speech.is_speaking)
+
+    @property
+    def search_cache(self):
+        return self._search_cache.get()
+
+    @property
+    def search_client(self):
+        return self._search_client.get()
+
+    @property
+    def sampler(self):
+        return self._sampler.get()
+
+    def open_database(self) -> None:
+        """Make sure the knowledge base is initialized"""
+        self._database.get()
+
+    def warm_up(self, extra: tuple = ()) -> None:
+        """Build the deferred subsystems now (call from a background thread)"""
+        self.speech.prerender(COMMON_PHRASES)  # rendered by the speech thread when idle
+        subsystems = (self._database, self._search_cache, self._requests, self._search_client,
+                      self._tiered_search)
+        if self.listen_enabled:
+            subsystems += (self._speech_recognition,)
+        if self.use_replica:
+            subsystems += (self._replica,)
+        for subsystem in subsystems + tuple(extra) + (self._sampler,):
+            try:
+                subsystem.get()
+            except Exception as e:
+                self.log(f"Erro ao carregar {subsystem.name}: {str(e)}")
+
+    def log(self, message: str) -> None:
+        """Send a message to the front end's log (safe from any thread)"""
+        self._log(message)
+
+    def speak(self, text: str, priority: int = PRIORITY_NORMAL, wait: bool = False,
+              on_done: Optional[Callable[[SpeechRequest], None]] = None) -> SpeechRequest:
+        """Queue text for speech; only blocks with `wait` (e.g. before listening)"""
+        self.log(f"Jarvis: {text}")
+        end_span = self.tracer.deferred('speak')
+        if end_span is not None:
+            # Spoken on the speech thread, after the command may have returned
+            def on_done(request, callback=on_done):
+                if request.completed:
+                    end_span()
+                if callback:
+                    callback(request)
+        request = self.speech.say(text, priority=priority, on_done=on_done)
+        if wait:
+            request.wait()
+        return request
+
+    def listen(self) -> Optional[str]:
+        """Listen for voice command"""
+        if not self.listen_enabled:
+            self.log("Entrada de voz desativada.")
+            return None
+        with self._dialog:
+            self.log("Ouvindo...")
+            with self.tracer.span('listen'):
+                utterance = self._listener.get().listen_once(timeout=LISTEN_TIMEOUT)
+            return self._utterance_text(utterance)
+
+    def _ask(self, prompt: str) -> Optional[str]:
+        """Speak `prompt` and listen for the answer, as one dialog"""
+        with self._dialog:
+            self.speak(prompt, wait=True)
+            return self.listen()
+
+    def _record_recognition(self, utterance) -> None:
+        """Trace the recognizer delay: end of speech to recognized text"""
+        if self.tracer.enabled and utterance is not None:
+            self.tracer.record('recognize', utterance.segment.detected_at, utterance.latency)
+
+    def _utterance_text(self, utterance) -> Optional[str]:
+        """Log/announce a recognition outcome and return its text, if any"""
+        self._record_recognition(utterance)
+        if utterance is None:
+            self.log("Nenhum comando ouvido.")
+        elif utterance.error is not None:
+            self.log(f"Erro no reconhecimento: {utterance.error}")
+            self.speak("Erro ao conectar com o serviço de voz.")
+        elif not utterance.text:
+            self.speak("Desculpe, não entendi.")
+        else:
+            self.log(f"Você disse: {utterance.text}")
+            return utterance.text.lower()
+        return None
+
+    def listen_for_command(self) -> None:
+        """Listen once in the background and queue what was heard
+
+        Only one such listen runs at a time; extra requests are ignored.
+        """
+        if not self._listening.acquire(blocking=False):
+            self.log("Já estou ouvindo.")
+            return
+
+        def listen_thread():
+            try:
+                with self._dialog:  # never talk over another command's prompt
+                    self.speech.cancel()
+                    command = self.listen()
+            finally:
+                self._listening.release()
+            if command:
+                self.submit(command)
+
+        threading.Thread(target=listen_thread, name='listen-once', daemon=True).start()
+
+    def set_continuous(self, enabled: bool) -> None:
+        """Switch hands-free listening on or off"""
+        def apply():
+            self._listener.get().set_continuous(enabled)
+        threading.Thread(target=apply, daemon=True).start()
+        self.log("Modo contínuo ativado." if enabled else "Modo contínuo desativado.")
+
+    def _on_continuous_utterance(self, utterance) -> None:
+        # Unrecognized noise is ignored silently in hands-free mode
+        self._record_recognition(utterance)
+        if utterance.error is not None:
+            self.log(f"Erro no reconhecimento: {utterance.error}")
+        elif utterance.text:
+            self.log(f"Você disse: {utterance.text}")
+            self.submit(utterance.text.lower(), block=False)
+
+    def submit(self, command: str, block: bool = True, on_done=None, interrupt: bool = True):
+        """Queue a command on the worker pool; returns its ticket, or None if rejected
+
+        With `interrupt` (a command the user just gave), whatever is being
+        said is cut off; other commands already running keep speaking.
+        """
+        if interrupt:
+            self.speech.cancel()
+        try:
+            return self.commands.submit(command, block=block, on_done=on_done)
+        except CommandRejected as e:
+            self.log(f"Comando '{command}' descartado: {e}")
+            return None
+
+    def _on_command_failed(self, ticket) -> None:
+        if ticket.error is not None:
+            self.log(f"Erro ao executar '{ticket.command}': {ticket.error}")
+        else:
+            self.log(f"Comando '{ticket.command}' excedeu {self.commands.timeout:.0f} s")
+
+    def execute_command(self, command: str, interrupt: bool = False) -> None:
+        """Execute the given command; `interrupt` cuts off what is being said first"""
+        if not command:
+            return
+
+        with self.tracer.trace(command):
+            if interrupt:
+                self.speech.cancel()
+            with self.tracer.span('dispatch'):
+                found = self.dispatcher.match(command)
+            if found is None:
+                self.speak("Comando não reconhecido.")
+            elif self.tracer.enabled:
+                with self.tracer.span(f'handler:{found.handler.__name__}'):
+                    found()
+            else:
+                found()
+
+    def _build_dispatcher(self) -> CommandDispatcher:
+        """Compile all command aliases once"""
+        dispatcher = CommandDispatcher()
+        # Notepad variations
+        dispatcher.add_many(['abrir bloco de notas', 'abre bloco de notas',
+                             'abrir o bloco de notas', 'abre o bloco de notas',
+                             'bloco de notas'], self._open_notepad)
+        # Memory variations
+        dispatcher.add_many(['limpar memória', 'limpa memória', 'limpar a memória'],
+                            self._clear_memory)
+        # System status
+        dispatcher.add_many(['status', 'status do sistema'], self._show_system_status)
+        # Chrome variations
+        dispatcher.add_many(['abrir chrome', 'abrir o chrome', 'abre chrome'], self._open_chrome)
+        # Calculator variations
+        dispatcher.add_many(['abrir calculadora', 'abre calculadora'], self._open_calculator)
+        # Shutdown variations
+        dispatcher.add_many(['desligar', 'desliga', 'desligar computador'], self._shutdown)
+        # Restart variations
+        dispatcher.add_many(['reiniciar', 'reinicia', 'reiniciar computador'], self._restart)
+        # Exit variations
+        dispatcher.add_many(['sair', 'fechar', 'encerrar'], self._exit)
+        # Search variations (the rest of the phrase is the query)
+        dispatcher.add_many(['pesquisar', 'buscar', 'pesquisar sobre', 'buscar na internet'],
+                            self._search_web, accepts_argument=True)
+        # Knowledge variations
+        dispatcher.add_many(['salvar informação', 'salvar esta informação'],
+                            self._save_current_result)
+        dispatcher.add('o que você sabe sobre', self._query_knowledge, accepts_argument=True)
+        return dispatcher
+
+    # Command handlers
+    def _launch(self, app: str) -> bool:
+        """Start a registered app without waiting for it; False if it failed"""
+        try:
+            launched = self.launcher.launch(app)
+        except LaunchError as e:
+            self.log(str(e))
+            self.speak("Não consegui abrir o aplicativo.")
+            return False
+        self.log(f"Iniciado {app} (pid {launched.pid}) em {launched.latency * 1000:.0f} ms")
+        return True
+
+    def _on_app_exit(self, launched) -> None:
+        if launched.returncode:
+            self.log(f"{launched.app} terminou com código {launched.returncode}")
+
+    def _open_notepad(self) -> None:
+        if self._launch('notepad'):
+            self.speak("Abrindo bloco de notas.")
+
+    def _clear_memory(self) -> None:
+        if self._launch('clear_memory'):
+            self.speak("Memória limpa.")
+
+    def _show_system_status(self) -> None:
+        sample = self.sampler.latest()
+        self.speak(f"Uso de memória: {sample['ram']:.0f}%. Uso de CPU: {sample['cpu']:.0f}%")
+        if self.on_status:
+            self.on_status()
+
+    def _open_chrome(self) -> None:
+        if self._launch('chrome'):
+            self.speak("Abrindo o navegador Chrome.")
+
+    def _open_calculator(self) -> None:
+        if self._launch('calculator'):
+            self.speak("Abrindo a calculadora.")
+
+    @staticmethod
+    def _power_delay() -> str:
+        if POWER_DELAY_MINUTES == 1:
+            return "um minuto"
+        return f"{POWER_DELAY_MINUTES} minutos"
+
+    def _shutdown(self) -> None:
+        self.speak(f"Desligando o computador em {self._power_delay()}.")
+        self._launch('shutdown')
+
+    def _restart(self) -> None:
+        self.speak(f"Reiniciando o computador em {self._power_delay()}.")
+        self._launch('restart')
+
+    def _exit(self) -> None:
+        if self.on_exit:
+            self.on_exit()
+
+    def _search_web(self, query: str = None) -> None:
+        """Search the web for information"""
+        if not query:
+            query = self._ask("O que você gostaria que eu pesquisasse?")
+            if not query:
+                return
+
+        requests = self._requests.get()
+        try:
+            self.log(f"Pesquisando: {query}")
+            streamed = []
+
+            def show_streamed(result):
+                # Paint network results as they are parsed instead of at the end
+                self.on_result_streamed(query, len(streamed), result)
+                streamed.append(result)
+
+            with self.tracer.span('tiered_search'):
+                answer = self._tiered_search.get().lookup(
+                    query, show_streamed if self.on_result_streamed else None)
+            results = answer.results
+
+            registrar_pesquisa(query, len(results))  # buffered, no disk commit here
+            if answer.error is not None:
+                self.log(f"Erro na pesquisa: {str(answer.error)}")
+            if results:
+                self.current_search_results = results
+                if self.on_results and (answer.tier != TIER_NETWORK
+                                        or len(streamed) != len(results)):
+                    self.on_results(query, results)
+                self.log(f"Encontrados {len(results)} resultados {answer.description} para '{query}' "
+                         f"em {answer.elapsed * 1000:.0f} ms")
+                if answer.stale:
+                    self.speak(f"Sem acesso à internet. Mostrando resultados antigos "
+                               f"{answer.description} para {query}")
+                elif answer.tier != TIER_NETWORK:
+                    self.speak(f"Mostrando resultados {answer.description} para {query}")
+            else:
+                msg = f"Não encontrei resultados para '{query}'. Tente reformular sua pesquisa."
+                self.speak(msg)
+                self.log(msg)
+
+        except requests.ConnectionError as e:
+            self.log(f"Erro na pesquisa: {str(e)}")
+            self.speak("Sem conexão com a internet. Verifique sua rede.")
+        except requests.exceptions.RequestException as e:
+            self.log(f"Erro na pesquisa: {str(e)}")
+            self.speak("Ocorreu um erro de rede ao pesquisar. Verifique sua conexão.")
+        except Exception as e:
+            self.log(f"Erro inesperado na pesquisa: {str(e)}")
+            self.speak("Ocorreu um erro inesperado ao pesquisar.")
+
+    def select_result(self, result: dict) -> None:
+        """Mark a search result for saving"""
+        self.selected_result = result
+        self.speak(f"Selecionado: {result['title']}")
+
+    def _save_current_result(self) -> None:
+        """Save the search result that was selected when the command was given"""
+        result = self.selected_result
+        if not result:
+            self.speak("Nenhum resultado selecionado para salvar.")
+            return
+
+        topic = self._ask("Qual tópico devo associar a esta informação?")
+        if topic:
+            self._database.get()
+            row_id = adicionar_informacao(
+                topic,
+                f"{result['title']}\n{result['snippet']}",
+                result['link']
+            )
+            if row_id and result['link']:
+                # The full page is fetched in the background; nothing waits for it
+                self._snapshots.get().submit(row_id, result['link'])
+            self.speak("Informação salva com sucesso na base de conhecimento.")
+
+    def _query_knowledge(self, query: str = None) -> None:
+        """Query local knowledge base"""
+        if not query:
+            query = self._ask("Sobre o que você gostaria de saber?")
+            if not query:
+                return
+
+        results = self.search_knowledge(query, 3)
+        if results:
+            for topic, info in results:
+                self.speak(f"Encontrei sobre {topic}: {info[:100]}...", priority=PRIORITY_LOW)
+        else:
+            self.speak("Não encontrei informações sobre este tópico.")
+
+    def search_knowledge(self, query: str, limit: int = 3) -> List[tuple]:
+        """Best (topic, content) matches for `query` in the knowledge base"""
+        if self.use_replica:
+            return self._replica.get().search(query, limit)
+        self._database.get()
+        return buscar_informacao(query, limite=limit)
+
+    def knowledge_topics(self, after: Optional[str] = None,
+                         limit: int = TAMANHO_PAGINA_TOPICOS,
+                         text_filter: Optional[str] = None) -> List[str]:
+        """One page of knowledge base topics, in alphabetical order"""
+        if self.use_replica:
+            return self._replica.get().topics_page(after, limit, text_filter)
+        self._database.get()
+        return listar_topicos_pagina(after, limit, text_filter)
+
+    def knowledge_entries(self, topic: str) -> List[tuple]:
+        """(topic, content) rows saved under exactly `topic`"""
+        if self.use_replica:
+            return self._replica.get().by_topic(topic)
+        self._database.get()
+        return buscar_por_topico(topic)
+
+    def close(self) -> None:
+        """Stop workers and release every subsystem that was started"""
+        if self._listener.ready:
+            self._listener.get().stop()
+        self.commands.stop()
+        self.launcher.close()
+        if self._sampler.ready:
+            self._sampler.get().stop()
+        self.speech.stop()
+        if self._search_client.ready:
+            self.search_client.close()
+        if self._snapshots.ready:
+            self._snapshots.get().close()
+        if self._replica.ready:
+            self._replica.get().close()
+        fechar_conexoes()
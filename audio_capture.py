@@ -0,0 +1,402 @@
+import math
+import queue
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM, mono
+FRAME_MS = 30
+PRE_ROLL_MS = 300
+START_SPEECH_MS = 90
+END_SILENCE_MS = 700
+MAX_SEGMENT_SECONDS = 15
+CALIBRATION_MS = 600
+MIN_ENERGY_THRESHOLD = 300
+THRESHOLD_MULTIPLIER = 2.5
+NOISE_ADAPTATION = 0.05
+SEGMENT_QUEUE = 8  # segments waiting for the recognizer
+QUEUE_POLL = 0.1  # seconds; how often a put blocked on a full queue re-checks for stop
+
+
+class RecognitionError(Exception):
+    """The recognizer backend failed (network, missing model, ...)"""
+
+
+def frame_energy(frame: bytes) -> float:
+    """RMS energy of a 16-bit little-endian PCM frame"""
+    samples = array('h')
+    samples.frombytes(frame[:len(frame) - len(frame) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class AudioSource:
+    """Yields fixed-size 16-bit mono PCM frames"""
+    sample_rate = SAMPLE_RATE
+    frame_ms = FRAME_MS
+    live = True  # a live source cannot wait for a slow recognizer
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.sample_rate * self.frame_ms // 1000 * SAMPLE_WIDTH
+
+    def open(self) -> None:
+        pass
+
+    def frames(self) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MicrophoneSource(AudioSource):
+    """Default microphone, opened once and kept open between commands"""
+    def __init__(self, sample_rate: int = SAMPLE_RATE, device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.device_index = device_index
+        self._microphone = None
+        self._stream = None
+
+    def open(self) -> None:
+        if self._microphone is not None:
+            return
+        import speech_recognition as sr
+        chunk = self.frame_bytes // SAMPLE_WIDTH
+        self._microphone = sr.Microphone(device_index=self.device_index,
+                                         sample_rate=self.sample_rate, chunk_size=chunk)
+        self._stream = self._microphone.__enter__().stream
+
+    def frames(self) -> Iterator[bytes]:
+        chunk = self.frame_bytes // SAMPLE_WIDTH
+        while self._stream is not None:
+            yield self._stream.read(chunk)
+
+    def close(self) -> None:
+        if self._microphone is not None:
+            microphone, self._microphone, self._stream = self._microphone, None, None
+            microphone.__exit__(None, None, None)
+
+
+class AudioFileSource(AudioSource):
+    """Frames read from a 16-bit mono WAV file, for tests and benchmarks
+
+    With `realtime`, frames are paced at the recording's speed; otherwise
+    they are produced as fast as the pipeline consumes them.
+    """
+    def __init__(self, path: str, realtime: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.live = realtime
+        with wave.open(path, 'rb') as wav:
+            if wav.getsampwidth() != SAMPLE_WIDTH or wav.getnchannels() != 1:
+                raise ValueError("Arquivo WAV precisa ser PCM 16 bits mono")
+            self.sample_rate = wav.getframerate()
+
+    def frames(self) -> Iterator[bytes]:
+        with wave.open(self.path, 'rb') as wav:
+            per_frame = self.frame_bytes // SAMPLE_WIDTH
+            start = time.perf_counter()
+            count = 0
+            while True:
+                data = wav.readframes(per_frame)
+                if len(data) < self.frame_bytes:
+                    break
+                if self.realtime:
+                    count += 1
+                    delay = start + count * self.frame_ms / 1000 - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                yield data
+
+
+class AudioSegment:
+    """One stretch of detected speech"""
+    def __init__(self, pcm: bytes, sample_rate: int, start: float, end: float):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.start = start  # seconds of audio since the source was opened
+        self.end = end
+        self.detected_at = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (self.sample_rate * SAMPLE_WIDTH)
+
+
+class Segmenter:
+    """Energy-based voice activity detection with an adaptive noise floor
+
+    The noise floor is calibrated once from the first frames and then
+    tracked during silence, so calibration survives between commands.
+    """
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.noise_floor: Optional[float] = None
+        self._calibration: List[float] = []
+        self._pre_roll: deque = deque(maxlen=max(1, PRE_ROLL_MS // frame_ms))
+        self._voiced: List[bytes] = []
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._frame_index = 0
+        self._segment_start = 0
+
+    @property
+    def threshold(self) -> float:
+        if self.noise_floor is None:
+            return float('inf')
+        return max(MIN_ENERGY_THRESHOLD, self.noise_floor * THRESHOLD_MULTIPLIER)
+
+    def feed(self, frame: bytes) -> Optional[AudioSegment]:
+        """Consume one frame; returns a segment when an utterance ends"""
+        self._frame_index += 1
+        energy = frame_energy(frame)
+        if self.noise_floor is None:
+            self._calibration.append(energy)
+            if len(self._calibration) * self.frame_ms >= CALIBRATION_MS:
+                self.noise_floor = sum(self._calibration) / len(self._calibration)
+            self._pre_roll.append(frame)
+            return None
+
+        voiced = energy > self.threshold
+        if not self._in_speech:
+            self._pre_roll.append(frame)
+            if voiced:
+                self._speech_run += 1
+                if self._speech_run * self.frame_ms >= START_SPEECH_MS:
+                    self._in_speech = True
+                    self._voiced = list(self._pre_roll)
+                    self._segment_start = self._frame_index - len(self._voiced)
+                    self._silence_run = 0
+            else:
+                self._speech_run = 0
+                self.noise_floor += NOISE_ADAPTATION * (energy - self.noise_floor)
+            return None
+
+        self._voiced.append(frame)
+        self._silence_run = 0 if voiced else self._silence_run + 1
+        too_long = len(self._voiced) * self.frame_ms >= MAX_SEGMENT_SECONDS * 1000
+        if self._silence_run * self.frame_ms >= END_SILENCE_MS or too_long:
+            return self._emit()
+        return None
+
+    def flush(self) -> Optional[AudioSegment]:
+        """End the current utterance at end of input"""
+        return self._emit() if self._in_speech else None
+
+    def _emit(self) -> AudioSegment:
+        seconds = self.frame_ms / 1000
+        segment = AudioSegment(b''.join(self._voiced), self.sample_rate,
+                               self._segment_start * seconds, self._frame_index * seconds)
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._voiced = []
+        self._pre_roll.clear()
+        return segment
+
+
+class RecognizerBackend:
+    """Turns an AudioSegment into text; returns None when nothing was understood"""
+    name = 'base'
+
+    def recognize(self, segment: AudioSegment) -> Optional[str]:
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API through speech_recognition (online)"""
+    name = 'google'
+
+    def __init__(self, language: str = 'pt-BR'):
+        import speech_recognition as sr
+        self._sr = sr
+        self._recognizer = sr.Recognizer()
+        self.language = language
+
+    def recognize(self, segment):
+        audio = self._sr.AudioData(segment.pcm, segment.sample_rate, SAMPLE_WIDTH)
+        try:
+            return self._recognizer.recognize_google(audio, language=self.language)
+        except self._sr.UnknownValueError:
+            return None
+        except self._sr.RequestError as e:
+            raise RecognitionError(str(e)) from e
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline recognition with a local Vosk model (e.g. vosk-model-small-pt)"""
+    name = 'vosk'
+
+    def __init__(self, model_path: str = 'modelo-vosk'):
+        import json
+        import vosk
+        self._json = json
+        self._vosk = vosk
+        try:
+            self._model = vosk.Model(model_path)
+        except Exception as e:
+            raise RecognitionError(f"Modelo Vosk indisponível em {model_path}: {e}") from e
+
+    def recognize(self, segment):
+        recognizer = self._vosk.KaldiRecognizer(self._model, segment.sample_rate)
+        recognizer.AcceptWaveform(segment.pcm)
+        text = self._json.loads(recognizer.FinalResult()).get('text', '')
+        return text or None
+
+
+BACKENDS: Dict[str, Callable[..., RecognizerBackend]] = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+class Utterance:
+    """Recognition outcome for one segment"""
+    def __init__(self, segment: AudioSegment, text: Optional[str] = None,
+                 error: Optional[Exception] = None):
+        self.segment = segment
+        self.text = text
+        self.error = error
+        self.latency = time.perf_counter() - segment.detected_at
+
+
+class ListenService:
+    """Long-lived capture loop: source -> segmenter -> recognizer -> queue
+
+    The source stays open and calibrated between commands. Segments are
+    only sent to the recognizer while armed, by `listen_once` or by
+    continuous mode. `is_muted` lets the caller drop audio while the
+    assistant itself is speaking.
+    """
+    def __init__(self, source: AudioSource, backend: RecognizerBackend,
+                 on_utterance: Optional[Callable[[Utterance], None]] = None,
+                 is_muted: Optional[Callable[[], bool]] = None):
+        self.source = source
+        self.backend = backend
+        self.on_utterance = on_utterance
+        self.is_muted = is_muted or (lambda: False)
+        self.segmenter = Segmenter(source.sample_rate, source.frame_ms)
+        self.continuous = False
+        self._waiters = 0
+        self._lock = threading.Lock()
+        self._results: queue.Queue = queue.Queue()
+        self._segments: queue.Queue = queue.Queue(maxsize=SEGMENT_QUEUE)
+        self._running = threading.Event()
+        self.finished = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._running.is_set():
+            return
+        self.source.open()
+        self._segments = queue.Queue(maxsize=SEGMENT_QUEUE)
+        self._running.set()
+        self.finished.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='audio-capture', daemon=True),
+            threading.Thread(target=self._recognize_loop, name='audio-recognize', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+        # Pending segments are dropped, so the sentinel never waits for room
+        while True:
+            try:
+                while True:
+                    self._segments.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._segments.put_nowait(None)
+                break
+            except queue.Full:
+                continue  # the capture loop slipped one in
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1)
+        self.source.close()
+
+    def set_continuous(self, enabled: bool) -> None:
+        self.continuous = enabled
+        if enabled:
+            self.start()
+
+    @property
+    def armed(self) -> bool:
+        return self.continuous or self._waiters > 0
+
+    def listen_once(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        """Wait for the next recognized utterance; None on timeout"""
+        self.start()
+        with self._lock:
+            self._waiters += 1
+        try:
+            while True:
+                try:
+                    self._results.get_nowait()  # discard stale results
+                except queue.Empty:
+                    break
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        finally:
+            with self._lock:
+                self._waiters -= 1
+
+    def _capture_loop(self) -> None:
+        try:
+            for frame in self.source.frames():
+                if not self._running.is_set():
+                    return
+                segment = self.segmenter.feed(frame)
+                if segment is not None and self.armed and not self.is_muted():
+                    if not self.source.live:
+                        self._offer(segment)
+                        continue
+                    try:
+                        self._segments.put_nowait(segment)
+                    except queue.Full:
+                        pass  # recognizer is behind; drop rather than lag further
+            segment = self.segmenter.flush()
+            if segment is not None and self.armed:
+                self._offer(segment)
+        finally:
+            self._offer(None)
+
+    def _offer(self, item: Optional[AudioSegment]) -> bool:
+        """Wait for room in the segment queue, giving up once the service stops"""
+        while self._running.is_set():
+            try:
+                self._segments.put(item, timeout=QUEUE_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _recognize_loop(self) -> None:
+        try:
+            while True:
+                segment = self._segments.get()
+                if segment is None:
+                    return
+                try:
+                    utterance = Utterance(segment, text=self.backend.recognize(segment))
+                except RecognitionError as e:
+                    utterance = Utterance(segment, error=e)
+                if self._waiters:
+                    self._results.put(utterance)  # a prompt is waiting for an answer
+                elif self.continuous and self.on_utterance:
+                    self.on_utterance(utterance)
+        finally:
+            self._running.clear()
+            self.finished.set()
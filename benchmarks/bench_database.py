@@ -0,0 +1,70 @@
+"""Micro-benchmark: latência por chamada do database.py, conexão nova vs. pool
+
+Uso: python benchmarks/bench_database.py [--linhas 5000] [--chamadas 2000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+def _popular(caminho, linhas):
+    conn = sqlite3.connect(caminho)
+    database.criar_tabela(conn)
+    conn.executemany("INSERT INTO conhecimento (topico, informacao, fonte) VALUES (?, ?, ?)",
+                     ((f"topico {i % 500}", f"informacao {i}", None) for i in range(linhas)))
+    conn.commit()
+    conn.close()
+
+
+def _buscar_sem_pool(caminho, topico):
+    """Reproduz o caminho antigo: abre e fecha uma conexão por chamada"""
+    conn = sqlite3.connect(caminho)
+    try:
+        return conn.execute("SELECT topico, informacao FROM conhecimento WHERE topico = ?",
+                            (topico,)).fetchall()
+    finally:
+        conn.close()
+
+
+def _buscar_com_pool(topico):
+    with database.conexao() as conn:
+        return conn.execute("SELECT topico, informacao FROM conhecimento WHERE topico = ?",
+                            (topico,)).fetchall()
+
+
+def _medir(func, chamadas):
+    inicio = time.perf_counter()
+    for i in range(chamadas):
+        func(f"topico {i % 500}")
+    return (time.perf_counter() - inicio) / chamadas * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--linhas', type=int, default=5000)
+    parser.add_argument('--chamadas', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, 'bench.db')
+        _popular(caminho, args.linhas)
+        database.definir_caminho_db(caminho)
+
+        antes = _medir(lambda t: _buscar_sem_pool(caminho, t), args.chamadas)
+        depois = _medir(_buscar_com_pool, args.chamadas)
+        database.fechar_conexoes()
+
+    print(f"conexão por chamada: {antes:8.1f} µs/chamada")
+    print(f"pool de conexões:    {depois:8.1f} µs/chamada")
+    print(f"ganho:               {antes / depois:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark do despacho de comandos com milhares de apelidos registrados
+
+Antes de medir, confere a precedência do despacho com os apelidos reais
+(o argumento de 'pesquisar' nunca é tratado como outro comando).
+
+Uso: python benchmarks/bench_dispatch.py [--apelidos 5000] [--comandos 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dispatcher import CommandDispatcher  # noqa: E402
+
+VERBOS = ['abrir', 'abre', 'tocar', 'mostrar', 'ler', 'cantar', 'buscar', 'anunciar']
+OBJETOS = ['hino', 'salmo', 'aviso', 'escala', 'agenda', 'culto', 'louvor', 'oração']
+
+
+# (frase, apelido esperado, argumento esperado)
+PRECEDENCIA = [
+    ("pesquisar como desligar o computador", 'pesquisar', 'como desligar o computador'),
+    ("pesquisar sobre abrir o bloco de notas", 'pesquisar sobre', 'abrir o bloco de notas'),
+    ("por favor desligar computador", 'desligar computador', ''),
+    ("o que você sabe sobre reiniciar", 'o que você sabe sobre', 'reiniciar'),
+]
+
+
+def verificar_precedencia():
+    """Falha com AssertionError se o despacho escolher o comando errado"""
+    dispatcher = CommandDispatcher()
+    dispatcher.add_many(['abrir bloco de notas', 'abre bloco de notas'], lambda: None)
+    dispatcher.add_many(['desligar', 'desliga', 'desligar computador'], lambda: None)
+    dispatcher.add_many(['reiniciar', 'reinicia', 'reiniciar computador'], lambda: None)
+    dispatcher.add_many(['pesquisar', 'buscar', 'pesquisar sobre', 'buscar na internet'],
+                        lambda arg=None: None, accepts_argument=True)
+    dispatcher.add('o que você sabe sobre', lambda arg=None: None, accepts_argument=True)
+    for frase, apelido, argumento in PRECEDENCIA:
+        encontrado = dispatcher.match(frase)
+        assert encontrado is not None and (encontrado.alias, encontrado.argument) == (
+            apelido, argumento), f"{frase!r} -> {encontrado!r}"
+
+
+def _gerar_apelidos(quantidade, rng):
+    apelidos = set()
+    while len(apelidos) < quantidade:
+        apelidos.add(f"{rng.choice(VERBOS)} {rng.choice(OBJETOS)} {rng.randrange(10 ** 6)}")
+    return sorted(apelidos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--apelidos', type=int, default=5000)
+    parser.add_argument('--comandos', type=int, default=20000)
+    args = parser.parse_args()
+    verificar_precedencia()
+    rng = random.Random(42)
+
+    apelidos = _gerar_apelidos(args.apelidos, rng)
+    inicio = time.perf_counter()
+    dispatcher = CommandDispatcher()
+    for apelido in apelidos:
+        dispatcher.add(apelido, lambda arg=None: None, accepts_argument=True)
+    compilacao = time.perf_counter() - inicio
+
+    comandos = [f"por favor {rng.choice(apelidos)} agora mesmo" for _ in range(args.comandos // 2)]
+    comandos += ["frase que não corresponde a nenhum comando registrado"] * (args.comandos // 2)
+    rng.shuffle(comandos)
+
+    tempos = []
+    for comando in comandos:
+        t0 = time.perf_counter()
+        dispatcher.match(comando)
+        tempos.append(time.perf_counter() - t0)
+    tempos.sort()
+
+    print(f"apelidos:     {dispatcher.alias_count}")
+    print(f"compilação:   {compilacao * 1e3:8.1f} ms")
+    print(f"mediana:      {tempos[len(tempos) // 2] * 1e6:8.1f} µs/comando")
+    print(f"p99:          {tempos[int(len(tempos) * 0.99)] * 1e6:8.1f} µs/comando")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Compara os extratores de resultados sobre as páginas gravadas em fixtures/
+
+Cada página é entregue em blocos, como em `response.iter_content()`.
+Uso: python benchmarks/bench_extractors.py [--repeticoes 200] [--bloco 16384]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_extractor import available_extractors, get_extractor  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def carregar_paginas():
+    """Lê o corpus gravado como (nome, bytes, codificação)"""
+    paginas = []
+    for nome in sorted(os.listdir(FIXTURES_DIR)):
+        if nome.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, nome), 'rb') as f:
+                codificacao = 'latin-1' if 'latin1' in nome else 'utf-8'
+                paginas.append((nome, f.read(), codificacao))
+    return paginas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--bloco', type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    paginas = carregar_paginas()
+    print(f"{'extrator':<12} {'página':<32} {'resultados':>10} {'µs/página':>10}")
+    for nome_extrator in available_extractors():
+        extrator = get_extractor(nome_extrator)
+        for nome, corpo, codificacao in paginas:
+            blocos = [corpo[i:i + args.bloco] for i in range(0, len(corpo), args.bloco)]
+            resultados = extrator.extract(blocos, codificacao)
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                extrator.extract(blocos, codificacao)
+            media = (time.perf_counter() - inicio) / args.repeticoes * 1e6
+            print(f"{nome_extrator:<12} {nome:<32} {len(resultados):>10} {media:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
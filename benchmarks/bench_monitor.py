@@ -0,0 +1,88 @@
+"""Tempo de desenho por quadro do monitor: redesenho completo vs. blit
+
+Usa o canvas Agg (sem Tk), então roda em máquinas sem display.
+Uso: python benchmarks/bench_monitor.py [--quadros 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from metrics_sampler import SAMPLE_INTERVAL, lttb  # noqa: E402
+from system_monitor import MAX_PLOT_POINTS, WINDOW_SECONDS, MonitorPlot  # noqa: E402
+
+HISTORY_POINTS = 20
+
+
+def _quadros_antigos(quadros, rng):
+    """Caminho anterior: ax.clear(), plot, tight_layout e draw completo"""
+    fig = Figure(figsize=(5, 4), dpi=100)
+    ax_ram, ax_cpu = fig.add_subplot(211), fig.add_subplot(212)
+    canvas = FigureCanvasAgg(fig)
+    ram_data, cpu_data = [], []
+    tempos = []
+    for _ in range(quadros):
+        ram, cpu = rng.uniform(0, 100), rng.uniform(0, 100)
+        ram_data.append(ram)
+        cpu_data.append(cpu)
+        if len(ram_data) > HISTORY_POINTS:
+            ram_data.pop(0)
+            cpu_data.pop(0)
+        inicio = time.perf_counter()
+        for ax, data, style, title in ((ax_ram, ram_data, 'r-', f'Uso de RAM: {ram}%'),
+                                       (ax_cpu, cpu_data, 'b-', f'Uso de CPU: {cpu}%')):
+            ax.clear()
+            ax.plot(data, style)
+            ax.set_title(title)
+            ax.set_ylim(0, 100)
+        fig.tight_layout()
+        canvas.draw()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _quadros_blit(quadros, rng, janela=WINDOW_SECONDS):
+    """Caminho novo, com amostras a cada SAMPLE_INTERVAL e o custo do LTTB por quadro"""
+    plot = MonitorPlot(janela)
+    canvas = FigureCanvasAgg(plot.fig)
+    plot.attach(canvas)
+    canvas.draw()
+    tempos_x = [t * SAMPLE_INTERVAL - janela for t in range(int(janela / SAMPLE_INTERVAL) + 1)]
+    ram = [rng.uniform(0, 100) for _ in tempos_x]
+    cpu = [rng.uniform(0, 100) for _ in tempos_x]
+    tempos = []
+    for _ in range(quadros):
+        ram = ram[1:] + [rng.uniform(0, 100)]
+        cpu = cpu[1:] + [rng.uniform(0, 100)]
+        inicio = time.perf_counter()
+        plot.update(*lttb(tempos_x, ram, MAX_PLOT_POINTS), *lttb(tempos_x, cpu, MAX_PLOT_POINTS))
+        plot.render()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _resumo(nome, tempos):
+    tempos = sorted(tempos)
+    media = sum(tempos) / len(tempos)
+    print(f"{nome:<18} média {media * 1e3:7.2f} ms/quadro   "
+          f"p95 {tempos[int(len(tempos) * 0.95)] * 1e3:7.2f} ms   "
+          f"máx. a 10 Hz: {media * 10 * 100:5.1f}% de um núcleo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--quadros', type=int, default=200)
+    args = parser.parse_args()
+    _resumo('redesenho completo', _quadros_antigos(args.quadros, random.Random(1)))
+    _resumo(f'blit, janela {WINDOW_SECONDS} s', _quadros_blit(args.quadros, random.Random(1)))
+    _resumo('blit, janela 1 h', _quadros_blit(args.quadros, random.Random(1), 3600))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Latência ponta a ponta do reconhecimento de voz a partir de um arquivo WAV
+
+Mede, para cada fala segmentada, o tempo entre o fim da fala detectado e
+o texto reconhecido, sem microfone. Sem --wav, gera um áudio sintético.
+Uso: python benchmarks/bench_recognition.py [--wav arquivo.wav] [--backend google|vosk]
+                                            [--tempo-real]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import BACKENDS, AudioFileSource, ListenService  # noqa: E402
+from falsos import BackendFalso, gerar_wav  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--wav')
+    parser.add_argument('--backend', default='falso')
+    parser.add_argument('--atraso', type=float, default=0.0,
+                        help="atraso simulado do backend falso, em segundos")
+    parser.add_argument('--tempo-real', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = args.wav
+        if caminho is None:
+            caminho = os.path.join(tmp, 'falas.wav')
+            gerar_wav(caminho)
+        if args.backend == 'falso':
+            backend = BackendFalso(args.atraso)
+        else:
+            backend = BACKENDS[args.backend]()
+
+        falas = []
+        servico = ListenService(AudioFileSource(caminho, realtime=args.tempo_real), backend,
+                                on_utterance=falas.append)
+        inicio = time.perf_counter()
+        servico.set_continuous(True)
+        servico.finished.wait()
+        total = time.perf_counter() - inicio
+
+    for fala in falas:
+        resultado = fala.text if fala.error is None else f"erro: {fala.error}"
+        print(f"{fala.segment.start:6.2f}-{fala.segment.end:6.2f} s  "
+              f"latência {fala.latency * 1e3:8.1f} ms  {resultado}")
+    if falas:
+        media = sum(f.latency for f in falas) / len(falas)
+        print(f"falas: {len(falas)}  latência média: {media * 1e3:.1f} ms  total: {total:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
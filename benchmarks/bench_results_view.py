@@ -0,0 +1,114 @@
+"""Tempo até o primeiro resultado pintado: janela nova por busca vs. ResultsView
+
+O caminho antigo cria um Toplevel e todos os widgets de cada busca antes de
+pintar; o ResultsView reaproveita a mesma janela e um conjunto fixo de
+linhas. Também mede a memória de widgets após várias buscas seguidas.
+Precisa de um display (Tk); em máquinas sem display, use xvfb-run.
+Uso: python benchmarks/bench_results_view.py [--resultados 5 50 1000] [--buscas 20]
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results_view import ResultsView  # noqa: E402
+
+
+def _resultados(quantidade):
+    return [{'title': f'Resultado de teste {i}', 'link': f'https://exemplo.com/{i}',
+             'snippet': 'Trecho de exemplo com algum texto para quebrar a linha. ' * 4}
+            for i in range(quantidade)]
+
+
+def _janela_antiga(root, results):
+    """Reprodução do antigo _display_search_results"""
+    result_window = tk.Toplevel(root)
+    result_window.geometry("800x600")
+    container = ttk.Frame(result_window)
+    canvas = tk.Canvas(container)
+    scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
+    scrollable_frame = ttk.Frame(canvas)
+    scrollable_frame.bind("<Configure>",
+                          lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+    canvas.configure(yscrollcommand=scrollbar.set)
+    container.pack(fill="both", expand=True)
+    canvas.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+    for idx, result in enumerate(results, 1):
+        frame = ttk.LabelFrame(scrollable_frame, text=f"Resultado {idx}")
+        frame.pack(fill="x", padx=10, pady=5, ipadx=5, ipady=5)
+        title_frame = ttk.Frame(frame)
+        title_frame.pack(fill="x", pady=(0, 5))
+        ttk.Label(title_frame, text=result['title'],
+                  font=('Arial', 10, 'bold')).pack(side="left")
+        ttk.Button(title_frame, text="Abrir Link").pack(side="right", padx=5)
+        ttk.Label(frame, text=result['snippet'], wraplength=700).pack(anchor='w')
+        ttk.Button(frame, text="Selecionar para Salvar").pack(pady=5)
+    return result_window
+
+
+def _contar_widgets(widget):
+    return 1 + sum(_contar_widgets(filho) for filho in widget.winfo_children())
+
+
+def _medir_antigo(root, results, buscas):
+    tempos = []
+    for _ in range(buscas):
+        inicio = time.perf_counter()
+        _janela_antiga(root, results)
+        root.update()
+        tempos.append(time.perf_counter() - inicio)
+    widgets = _contar_widgets(root)
+    for janela in root.winfo_children():
+        janela.destroy()
+    return tempos, widgets
+
+
+def _medir_view(root, results, buscas):
+    view = ResultsView(root, on_select=lambda result: None, on_open=lambda url: None)
+    tempos = []
+    for _ in range(buscas):
+        inicio = time.perf_counter()
+        view.begin('teste')
+        view.append(results[0])  # primeiro resultado chegando do extrator
+        root.update()
+        tempos.append(time.perf_counter() - inicio)
+        for result in results[1:]:
+            view.append(result)
+        root.update()
+    widgets = _contar_widgets(root)
+    view.window.destroy()
+    return tempos, widgets
+
+
+def _resumo(nome, tempos, widgets):
+    tempos = sorted(tempos)
+    print(f"  {nome:<22} mediana {tempos[len(tempos) // 2] * 1e3:8.1f} ms   "
+          f"máx. {tempos[-1] * 1e3:8.1f} ms   widgets vivos: {widgets}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resultados', type=int, nargs='+', default=[5, 50, 1000])
+    parser.add_argument('--buscas', type=int, default=20)
+    args = parser.parse_args()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"Sem display disponível para o Tk ({e}); rode com xvfb-run.")
+    root.withdraw()
+    for quantidade in args.resultados:
+        results = _resultados(quantidade)
+        print(f"{quantidade} resultados, {args.buscas} buscas:")
+        _resumo('janela nova por busca', *_medir_antigo(root, results, args.buscas))
+        _resumo('ResultsView', *_medir_view(root, results, args.buscas))
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
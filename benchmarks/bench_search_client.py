@@ -0,0 +1,49 @@
+"""Latência de busca: sonda + requisição nova vs. SearchClient com sessão persistente
+
+Roda contra o servidor local de benchmarks/fake_search_server.py.
+Uso: python benchmarks/bench_search_client.py [--buscas 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from fake_search_server import servir_paginas  # noqa: E402
+from search_client import DEFAULT_HEADERS, SearchClient  # noqa: E402
+
+
+def _busca_antiga(base_url, query):
+    """Caminho anterior: sonda de conectividade e requisição sem keep-alive"""
+    requests.get(base_url, timeout=5)
+    return requests.get(f"{base_url}/search", params={'q': query},
+                        headers=DEFAULT_HEADERS, timeout=10).text
+
+
+def _medir(func, buscas):
+    inicio = time.perf_counter()
+    for i in range(buscas):
+        func(f"horário do culto {i}")
+    return (time.perf_counter() - inicio) / buscas * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--buscas', type=int, default=200)
+    args = parser.parse_args()
+
+    with servir_paginas() as base_url:
+        client = SearchClient(base_url=base_url)
+        antes = _medir(lambda q: _busca_antiga(base_url, q), args.buscas)
+        depois = _medir(lambda q: client.fetch(q).text, args.buscas)
+        client.close()
+
+    print(f"sonda + requisição nova: {antes:7.2f} ms/busca")
+    print(f"sessão persistente:      {depois:7.2f} ms/busca")
+
+
+if __name__ == '__main__':
+    main()
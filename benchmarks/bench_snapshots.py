@@ -0,0 +1,79 @@
+"""Captura de páginas salvas em segundo plano, contra o servidor local
+
+Mede quanto `submit` segura quem chama (o listener ou a interface), o tempo
+total para capturar todas as páginas com o pool e o pico de pedidos
+simultâneos por host, que não deve passar de --por-host. A primeira metade
+das páginas vai para 127.0.0.1 e a segunda para localhost (o mesmo servidor,
+dois hosts para o limitador); como as páginas de um host ocupado esperam na
+fila do host e não num worker, o pico total deve chegar a --workers.
+Uso: python benchmarks/bench_snapshots.py [--paginas 40] [--atraso 0.05] [--por-host 2]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from fake_search_server import servir_paginas  # noqa: E402
+from page_snapshot import PageSnapshotter  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--paginas', type=int, default=40)
+    parser.add_argument('--atraso', type=float, default=0.05,
+                        help="segundos que o servidor leva para responder cada página")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--por-host', type=int, default=2)
+    parser.add_argument('--limite-kb', type=int, default=256,
+                        help="tamanho máximo baixado por página")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.definir_caminho_db(os.path.join(tmp, 'bench.db'))
+        database.inicializar_db()
+        ids = [database.adicionar_informacao(f"culto {i}", f"horários {i}", None)
+               for i in range(args.paginas + 1)]
+        with servir_paginas() as base_url:
+            snapshotter = PageSnapshotter(args.workers, args.por_host,
+                                          max_bytes=args.limite_kb * 1024)
+            inicio = time.perf_counter()
+            tempos_submit = []
+            futuros = []
+            hosts = [base_url, base_url.replace('127.0.0.1', 'localhost')]
+            for i, conhecimento_id in enumerate(ids[:-1]):
+                t0 = time.perf_counter()
+                futuros.append(snapshotter.submit(
+                    conhecimento_id,
+                    f"{hosts[2 * i // args.paginas]}/pagina/artigo_culto.html?s={args.atraso}"))
+                tempos_submit.append(time.perf_counter() - t0)
+            futuros.append(snapshotter.submit(ids[-1], f"{base_url}/grande?kb=4096"))
+            jobs = [futuro.result() for futuro in futuros]
+            total = time.perf_counter() - inicio
+            snapshotter.close(wait=True)
+            with urlopen(f"{base_url}/estatisticas") as resposta:
+                servidor = json.load(resposta)
+        url, texto = database.buscar_snapshot(ids[0])
+        database.fechar_conexoes()
+
+    grande = jobs[-1]
+    tempos_submit.sort()
+    print(f"submit:         mediana {tempos_submit[len(tempos_submit) // 2] * 1e6:8.1f} µs   "
+          f"máx. {tempos_submit[-1] * 1e6:8.1f} µs")
+    print(f"total:          {total:8.2f} s para {len(jobs)} páginas "
+          f"(em série seriam ≥ {args.paginas * args.atraso:.2f} s)")
+    print(f"estatísticas:   {snapshotter.stats}")
+    print(f"pico por host:  {servidor['simultaneas_max_por_host']} pedidos simultâneos "
+          f"(limite {args.por_host})")
+    print(f"pico total:     {servidor['simultaneas_max']} (workers: {args.workers})")
+    print(f"página grande:  {grande.bytes_read // 1024} KiB lidos, cortada: {grande.truncated}")
+    print(f"snapshot salvo: {len(texto)} caracteres de {url}")
+
+
+if __name__ == '__main__':
+    main()
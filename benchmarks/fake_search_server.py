@@ -0,0 +1,150 @@
+"""Servidor HTTP local que imita a página de resultados de busca
+
+Serve páginas gravadas de benchmarks/fixtures para que o SearchClient e os
+extratores possam ser exercitados sem rede:
+
+    with servir_paginas() as base_url:
+        SearchClient(base_url=base_url).search('horário do culto')
+
+Rotas: /search?q=... devolve a página gravada (ou `?pagina=nome.html`);
+/status/<código> devolve o código HTTP pedido; /lento?s=N espera N segundos;
+/pagina/<nome>?s=N devolve um artigo de fixtures/paginas após N segundos e
+/grande?kb=N devolve N KiB de HTML; /estatisticas devolve, em JSON, o
+total de pedidos e de conexões TCP abertas e o pico de pedidos atendidos
+ao mesmo tempo. Com `chunked=1` (ou `servir_paginas(chunked=True)`),
+/search e /grande respondem sem Content-Length, em Transfer-Encoding: chunked.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGINA_PADRAO = 'resultados_culto.html'
+TAMANHO_BLOCO = 4096  # bytes por bloco nas respostas chunked
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, como o servidor real
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        with self.server.lock:
+            self.server.conexoes += 1
+        super().handle()
+
+    def _responder(self, status, corpo, tipo='text/html; charset=UTF-8', chunked=False):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        if not chunked:
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+            return
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for inicio in range(0, len(corpo), TAMANHO_BLOCO):
+            bloco = corpo[inicio:inicio + TAMANHO_BLOCO]
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(bloco), bloco))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        host = self.headers.get('Host', '').rsplit(':', 1)[0]
+        with self.server.lock:
+            self.server.requisicoes += 1
+            self.server.simultaneas += 1
+            self.server.simultaneas_max = max(self.server.simultaneas_max,
+                                              self.server.simultaneas)
+            atual, maximo = self.server.por_host.get(host, (0, 0))
+            self.server.por_host[host] = (atual + 1, max(maximo, atual + 1))
+        try:
+            self._rotear()
+        finally:
+            with self.server.lock:
+                self.server.simultaneas -= 1
+                atual, maximo = self.server.por_host[host]
+                self.server.por_host[host] = (atual - 1, maximo)
+
+    def _rotear(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        chunked = params.get('chunked', ['1' if self.server.chunked else '0'])[0] == '1'
+        if url.path == '/search':
+            nome = os.path.basename(params.get('pagina', [self.server.pagina])[0])
+            caminho = os.path.join(self.server.diretorio, nome)
+            if not os.path.exists(caminho):
+                self._responder(404, b'not found', 'text/plain')
+                return
+            charset = 'ISO-8859-1' if 'latin1' in nome else 'UTF-8'
+            with open(caminho, 'rb') as f:
+                self._responder(200, f.read(), f'text/html; charset={charset}', chunked)
+        elif url.path.startswith('/status/'):
+            self._responder(int(url.path.rsplit('/', 1)[1]), b'', 'text/plain')
+        elif url.path == '/lento':
+            time.sleep(float(params.get('s', ['1'])[0]))
+            self._responder(200, b'ok', 'text/plain')
+        elif url.path.startswith('/pagina/'):
+            caminho = os.path.join(self.server.diretorio, 'paginas',
+                                   os.path.basename(url.path))
+            if not os.path.exists(caminho):
+                self._responder(404, b'not found', 'text/plain')
+                return
+            time.sleep(float(params.get('s', ['0'])[0]))
+            with open(caminho, 'rb') as f:
+                self._responder(200, f.read())
+        elif url.path == '/estatisticas':
+            with self.server.lock:
+                dados = {'requisicoes': self.server.requisicoes,
+                         'conexoes': self.server.conexoes,
+                         'simultaneas_max': self.server.simultaneas_max,
+                         'simultaneas_max_por_host': {
+                             host: maximo for host, (_, maximo) in self.server.por_host.items()}}
+            self._responder(200, json.dumps(dados).encode('utf-8'), 'application/json')
+        elif url.path == '/grande':
+            paragrafo = '<p>' + 'texto de exemplo ' * 60 + '</p>\n'
+            repeticoes = int(params.get('kb', ['1024'])[0]) * 1024 // len(paragrafo) + 1
+            self._responder(200, ('<html><body>' + paragrafo * repeticoes).encode('utf-8'),
+                            chunked=chunked)
+        else:
+            self._responder(404, b'not found', 'text/plain')
+
+
+@contextmanager
+def servir_paginas(diretorio=FIXTURES_DIR, pagina=PAGINA_PADRAO, chunked=False):
+    """Sobe o servidor numa porta livre e devolve a URL base
+
+    `pagina` é a página devolvida por /search quando a URL não pede outra;
+    com `chunked`, as respostas vão sem Content-Length.
+    """
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    servidor.diretorio = diretorio
+    servidor.pagina = pagina
+    servidor.chunked = chunked
+    servidor.requisicoes = 0
+    servidor.conexoes = 0
+    servidor.simultaneas = 0
+    servidor.simultaneas_max = 0
+    servidor.por_host = {}  # nome no cabeçalho Host -> (simultâneas agora, máximo)
+    servidor.lock = threading.Lock()
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    with servir_paginas() as base_url:
+        print(f"Servindo {FIXTURES_DIR} em {base_url} (Ctrl+C para sair)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,92 @@
+"""Dublês de microfone, reconhecedor e voz para benchmarks sem hardware
+
+O HTTP falso fica em fake_search_server.py.
+"""
+import math
+import os
+import random
+import sys
+import threading
+import time
+import wave
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_capture import SAMPLE_RATE, AudioSource, RecognizerBackend  # noqa: E402
+
+
+def gerar_pcm(falas=5, rng=None, taxa=SAMPLE_RATE):
+    """Alterna ruído de fundo e trechos tonais que imitam falas (PCM 16 bits)"""
+    rng = rng or random.Random(0)
+    amostras = []
+    for _ in range(falas):
+        amostras += [int(rng.gauss(0, 120)) for _ in range(int(taxa * 1.0))]
+        duracao = rng.uniform(0.6, 2.0)
+        freq = rng.uniform(120, 260)
+        amostras += [int(6000 * math.sin(2 * math.pi * freq * i / taxa) + rng.gauss(0, 120))
+                     for i in range(int(taxa * duracao))]
+    amostras += [int(rng.gauss(0, 120)) for _ in range(int(taxa * 1.5))]
+    return array('h', amostras).tobytes()
+
+
+def gerar_wav(caminho, falas=5, rng=None):
+    with wave.open(caminho, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(gerar_pcm(falas, rng))
+
+
+class MicrofoneFalso(AudioSource):
+    """Fonte de áudio em memória, entregue tão rápido quanto o pipeline consome"""
+    live = False
+
+    def __init__(self, pcm):
+        self.pcm = pcm
+
+    def frames(self):
+        passo = self.frame_bytes
+        for inicio in range(0, len(self.pcm) - passo + 1, passo):
+            yield self.pcm[inicio:inicio + passo]
+
+
+class BackendFalso(RecognizerBackend):
+    """Simula um reconhecedor com atraso fixo, para medir só o pipeline"""
+    name = 'falso'
+
+    def __init__(self, atraso=0.0):
+        self.atraso = atraso
+
+    def recognize(self, segment):
+        time.sleep(self.atraso)
+        return f"fala de {segment.duration:.2f} s"
+
+
+class VozFalsa:
+    """Motor compatível com pyttsx3 que só registra o que seria falado"""
+    def __init__(self, atraso_por_caractere=0.0):
+        self.atraso_por_caractere = atraso_por_caractere
+        self.falado = []
+        self._pendente = []
+        self._parar = threading.Event()
+
+    def setProperty(self, name, value):
+        pass
+
+    def connect(self, topic, callback):
+        pass
+
+    def say(self, text):
+        self._pendente.append(text)
+
+    def runAndWait(self):
+        self._parar.clear()
+        for texto in self._pendente:
+            if self.atraso_por_caractere:
+                self._parar.wait(self.atraso_por_caractere * len(texto))
+            self.falado.append(texto)
+        self._pendente = []
+
+    def stop(self):
+        self._parar.set()
@@ -0,0 +1,346 @@
+"""Suíte de benchmarks dos caminhos críticos, com resultados em JSON
+
+Grupos:
+  banco     chamadas do database.py (e da réplica em memória) com a tabela em vários tamanhos
+  despacho  Assistant.execute_command, do texto reconhecido até o handler
+  busca     Assistant._search_web sobre cada página gravada em fixtures/
+  monitor   tempo de desenho por quadro do gráfico do SystemMonitor (Agg, sem Tk)
+  escuta    latência da fala ao texto com microfone e reconhecedor falsos
+
+Microfone, voz e HTTP são dublês (falsos.py e fake_search_server.py), então
+roda sem hardware nem rede. Grupos cujas dependências faltam são ignorados
+e aparecem como tal no relatório.
+
+Uso:
+    python benchmarks/suite.py --salvar base.json
+    python benchmarks/suite.py --comparar base.json [--tolerancia 0.25] [--salvar atual.json]
+    python benchmarks/suite.py --grupos banco despacho --tamanhos 1000 10000
+
+Com --comparar, o código de saída é 1 se algum caso regrediu.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from kb_replica import KnowledgeReplica  # noqa: E402
+from falsos import BackendFalso, MicrofoneFalso, VozFalsa, gerar_pcm  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+VERSAO_FORMATO = 1
+GRUPOS = ('banco', 'despacho', 'busca', 'monitor', 'escuta')
+TAMANHOS = (1000, 10000, 50000)
+TOPICOS = 500
+PALAVRAS = ['culto', 'hino', 'salmo', 'oração', 'louvor', 'escala', 'aviso', 'ceia',
+            'batismo', 'jovens', 'domingo', 'quarta', 'reunião', 'ensaio', 'coral']
+TOLERANCIA = 0.25
+PISO_US = 5.0  # diferenças menores que isso são ruído, mesmo em porcentagem alta
+
+
+def medir(func, repeticoes, aquecimento=3):
+    """Tempo de cada chamada de `func(i)`, em segundos"""
+    for i in range(aquecimento):
+        func(i)
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        func(i)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def resumir(tempos):
+    tempos = sorted(tempos)
+    return {
+        'amostras': len(tempos),
+        'mediana_us': tempos[len(tempos) // 2] * 1e6,
+        'p95_us': tempos[min(int(len(tempos) * 0.95), len(tempos) - 1)] * 1e6,
+        'media_us': sum(tempos) / len(tempos) * 1e6,
+    }
+
+
+def _texto(rng, palavras=12):
+    return ' '.join(rng.choice(PALAVRAS) for _ in range(palavras))
+
+
+def _popular(caminho, linhas, rng):
+    conn = sqlite3.connect(caminho)
+    database.criar_tabela(conn)
+    registros = []
+    for i in range(linhas):
+        topico = f"{PALAVRAS[i % len(PALAVRAS)]} {i % TOPICOS}"
+        informacao = f"{_texto(rng)} {i}"
+        registros.append((topico, informacao, None, database.hash_conteudo(topico, informacao)))
+    conn.executemany("INSERT INTO conhecimento (topico, informacao, fonte, hash_conteudo) "
+                     "VALUES (?, ?, ?, ?)", registros)
+    conn.commit()
+    conn.close()
+
+
+def _banco_temporario(tmp, nome, linhas, rng):
+    caminho = os.path.join(tmp, f'{nome}_{linhas}.db')
+    _popular(caminho, linhas, rng)
+    database.definir_caminho_db(caminho)
+    database.inicializar_db()
+
+
+def verificar_poda(replica):
+    """Falha com AssertionError se a réplica perder alterações de um registro podado"""
+    recargas = replica.stats['reloads']
+    with database.conexao() as conn:
+        ids = [id_ for id_, in conn.execute("SELECT id FROM conhecimento ORDER BY id LIMIT 3")]
+        conn.executemany("UPDATE conhecimento SET topico = 'podado' WHERE id = ?",
+                         [(id_,) for id_ in ids])
+        conn.commit()
+        database.podar_alteracoes(conn, manter=1)
+    assert len(replica.by_topic('podado')) == len(ids), replica.by_topic('podado')
+    assert replica.stats['reloads'] == recargas + 1, replica.stats
+
+
+def grupo_banco(args, tmp):
+    rng = random.Random(7)
+    for linhas in args.tamanhos:
+        _banco_temporario(tmp, 'banco', linhas, rng)
+        # Montar a réplica lê a tabela inteira: poucas amostras bastam
+        yield f'banco[{linhas}].replica_carga', medir(lambda i: KnowledgeReplica().close(), 3,
+                                                      aquecimento=0)
+        replica = KnowledgeReplica()
+        topicos = [f"{PALAVRAS[i % len(PALAVRAS)]} {i % TOPICOS}" for i in range(TOPICOS)]
+        consultas = [f"{rng.choice(PALAVRAS)} {rng.choice(PALAVRAS)[:3]}" for _ in range(64)]
+        casos = {
+            'buscar_informacao': lambda i: database.buscar_informacao(consultas[i % 64], 3),
+            'buscar_resultados_locais':
+                lambda i: database.buscar_resultados_locais(consultas[i % 64], 5, 50),
+            'buscar_por_topico': lambda i: database.buscar_por_topico(topicos[i % TOPICOS]),
+            'listar_topicos_pagina': lambda i: database.listar_topicos_pagina(),
+            'listar_topicos_pagina_filtro':
+                lambda i: database.listar_topicos_pagina(filtro=PALAVRAS[i % len(PALAVRAS)][:3]),
+            'replica.search': lambda i: replica.search(consultas[i % 64], 3),
+            'replica.by_topic': lambda i: replica.by_topic(topicos[i % TOPICOS]),
+            'replica.topics_page': lambda i: replica.topics_page(),
+            'replica.topics_page_filtro':
+                lambda i: replica.topics_page(filtro=PALAVRAS[i % len(PALAVRAS)][:3]),
+            'adicionar_informacao':
+                lambda i: database.adicionar_informacao(f"novo {i % 50}", f"{_texto(rng)} {i}"),
+        }
+        for nome, func in casos.items():
+            yield f'banco[{linhas}].{nome}', medir(func, args.repeticoes)
+        # Cada escrita acima chega à réplica pelo delta, sem recarga completa
+        yield f'banco[{linhas}].replica.sync_apos_escrita', medir(
+            lambda i: (database.adicionar_informacao(f"sync {i % 50}", f"{_texto(rng)} s{i}"),
+                       replica.by_topic(f"sync {i % 50}")), args.repeticoes)
+        # Por último: mexe em linhas que os casos acima consultam
+        verificar_poda(replica)
+        replica.close()
+        database.fechar_conexoes()
+
+
+def _assistente(classe=None):
+    if classe is None:
+        from assistant import Assistant as classe
+    return classe(log=lambda mensagem: None, engine_factory=VozFalsa, listen_enabled=False)
+
+
+def grupo_despacho(args, tmp):
+    _banco_temporario(tmp, 'despacho', min(args.tamanhos), random.Random(7))
+    assistente = _assistente()
+    # Só handlers sem efeitos colaterais no sistema (nada que inicie processos pelo AppLauncher)
+    comandos = {
+        'nao_reconhecido': 'frase que não corresponde a nenhum comando registrado',
+        'salvar_sem_selecao': 'por favor salvar esta informação',
+        'o_que_voce_sabe': 'o que você sabe sobre culto domingo',
+    }
+    try:
+        for nome, comando in comandos.items():
+            yield f'despacho.{nome}', medir(lambda i: assistente.execute_command(comando),
+                                            args.repeticoes)
+        yield 'despacho.speak', medir(lambda i: assistente.speak("Comando não reconhecido.",
+                                                                 wait=True), args.repeticoes)
+    finally:
+        assistente.close()
+
+
+def grupo_busca(args, tmp):
+    from assistant import Assistant
+    from fake_search_server import servir_paginas
+    from search_client import SearchClient
+
+    class AssistenteLocal(Assistant):
+        base_url = None
+
+        def _create_search_client(self):
+            return SearchClient(base_url=self.base_url)
+
+    paginas = sorted(nome for nome in os.listdir(FIXTURES_DIR) if nome.endswith('.html'))
+    for pagina in paginas:
+        # Banco vazio e consultas únicas: cada busca passa pelos três níveis e vai à "rede"
+        caminho = os.path.join(tmp, f'busca_{pagina}.db')
+        database.definir_caminho_db(caminho)
+        with servir_paginas(pagina=pagina) as base_url:
+            AssistenteLocal.base_url = base_url
+            assistente = _assistente(AssistenteLocal)
+            try:
+                yield (f'busca.{pagina}',
+                       medir(lambda i: assistente._search_web(f"horário do culto {i}"),
+                             args.repeticoes))
+            finally:
+                assistente.close()
+
+
+def grupo_monitor(args, tmp):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    from metrics_sampler import SAMPLE_INTERVAL, lttb
+    from system_monitor import MAX_PLOT_POINTS, WINDOW_SECONDS, MonitorPlot
+
+    for janela in (WINDOW_SECONDS, 3600):
+        rng = random.Random(1)
+        plot = MonitorPlot(janela)
+        canvas = FigureCanvasAgg(plot.fig)
+        plot.attach(canvas)
+        canvas.draw()
+        tempos_x = [t * SAMPLE_INTERVAL - janela
+                    for t in range(int(janela / SAMPLE_INTERVAL) + 1)]
+        series = {'ram': [rng.uniform(0, 100) for _ in tempos_x],
+                  'cpu': [rng.uniform(0, 100) for _ in tempos_x]}
+
+        def quadro(i):
+            # Mesmo trabalho de SystemMonitor._tick: redução LTTB e blit
+            for chave in series:
+                series[chave] = series[chave][1:] + [rng.uniform(0, 100)]
+            plot.update(*lttb(tempos_x, series['ram'], MAX_PLOT_POINTS),
+                        *lttb(tempos_x, series['cpu'], MAX_PLOT_POINTS))
+            plot.render()
+
+        yield f'monitor.quadro[{janela}s]', medir(quadro, args.repeticoes)
+
+
+def grupo_escuta(args, tmp):
+    from audio_capture import ListenService
+
+    falas = []
+    servico = ListenService(MicrofoneFalso(gerar_pcm(falas=max(args.repeticoes // 10, 5))),
+                            BackendFalso(), on_utterance=falas.append)
+    servico.set_continuous(True)
+    servico.finished.wait()
+    servico.stop()
+    yield 'escuta.fim_da_fala_ate_texto', [fala.latency for fala in falas]
+
+
+def executar(args):
+    """Roda os grupos pedidos e devolve o relatório (dicionário serializável)"""
+    relatorio = {
+        'versao': VERSAO_FORMATO,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {'repeticoes': args.repeticoes, 'tamanhos': list(args.tamanhos)},
+        'resultados': {},
+        'ignorados': {},
+    }
+    caminho_original = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        for grupo in args.grupos:
+            inicio = time.perf_counter()
+            try:
+                for caso, tempos in globals()[f'grupo_{grupo}'](args, tmp):
+                    relatorio['resultados'][caso] = resumir(tempos)
+                    _imprimir_caso(caso, relatorio['resultados'][caso])
+            except ImportError as e:
+                relatorio['ignorados'][grupo] = str(e)
+                print(f"{grupo}: ignorado ({e})")
+                continue
+            finally:
+                database.fechar_conexoes()
+            print(f"{grupo}: {time.perf_counter() - inicio:.1f} s")
+    database.definir_caminho_db(caminho_original)
+    return relatorio
+
+
+def _imprimir_caso(caso, resumo):
+    print(f"  {caso:<48} mediana {resumo['mediana_us']:10.1f} µs   "
+          f"p95 {resumo['p95_us']:10.1f} µs")
+
+
+def comparar(base, atual, tolerancia=TOLERANCIA, piso_us=PISO_US):
+    """Lista (caso, mediana base, mediana atual, situação) e se houve regressão
+
+    Um caso regride quando a mediana cresce mais que `tolerancia` (fração)
+    e mais que `piso_us` em valor absoluto.
+    """
+    linhas = []
+    regrediu = False
+    for caso, resumo in atual['resultados'].items():
+        anterior = base['resultados'].get(caso)
+        agora = resumo['mediana_us']
+        if anterior is None:
+            linhas.append((caso, None, agora, 'novo'))
+            continue
+        antes = anterior['mediana_us']
+        if agora > antes * (1 + tolerancia) and agora - antes > piso_us:
+            situacao = 'REGRESSÃO'
+            regrediu = True
+        elif agora < antes * (1 - tolerancia) and antes - agora > piso_us:
+            situacao = 'melhora'
+        else:
+            situacao = ''
+        linhas.append((caso, antes, agora, situacao))
+    for caso in base['resultados']:
+        if caso not in atual['resultados']:
+            linhas.append((caso, base['resultados'][caso]['mediana_us'], None, 'ausente'))
+    return linhas, regrediu
+
+
+def _imprimir_comparacao(linhas):
+    print(f"\n{'caso':<48} {'base µs':>10} {'atual µs':>10} {'variação':>9}")
+    for caso, antes, agora, situacao in linhas:
+        variacao = f"{(agora / antes - 1) * 100:+8.1f}%" if antes and agora is not None else ''
+        antes_txt = f"{antes:10.1f}" if antes is not None else f"{'-':>10}"
+        agora_txt = f"{agora:10.1f}" if agora is not None else f"{'-':>10}"
+        print(f"{caso:<48} {antes_txt} {agora_txt} {variacao:>9} {situacao}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--grupos', nargs='+', choices=GRUPOS, default=list(GRUPOS))
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=list(TAMANHOS),
+                        help="linhas na tabela conhecimento para o grupo banco")
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--salvar', help="grava o relatório JSON neste arquivo")
+    parser.add_argument('--comparar', help="relatório JSON de referência")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="aumento relativo da mediana aceito antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+
+    relatorio = executar(args)
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.salvar}")
+
+    if base is not None:
+        linhas, regrediu = comparar(base, relatorio, args.tolerancia)
+        _imprimir_comparacao(linhas)
+        if regrediu:
+            print("\nHá regressões em relação à referência.")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
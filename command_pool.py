@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+WORKERS = 4
+MAX_PENDING = 32
+COMMAND_TIMEOUT = 30.0  # seconds
+WATCHDOG_INTERVAL = 0.25
+
+STATUS_PENDING = 'pendente'
+STATUS_RUNNING = 'executando'
+STATUS_OK = 'ok'
+STATUS_ERROR = 'erro'
+STATUS_TIMEOUT = 'tempo_esgotado'
+STATUS_CANCELLED = 'cancelado'
+
+
+class CommandRejected(Exception):
+    """The pool is full or stopped; the caller should retry later"""
+
+
+class CommandTicket:
+    """Handle for a submitted command; `wait()` blocks until it finishes or times out"""
+    def __init__(self, command: str, on_done: Optional[Callable[['CommandTicket'], None]] = None):
+        self.command = command
+        self.on_done = on_done
+        self.status = STATUS_PENDING
+        self.error: Optional[Exception] = None
+        self.submitted = time.perf_counter()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.done = threading.Event()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds from submission to completion (or until now)"""
+        return (self.finished or time.perf_counter()) - self.submitted
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def _finish(self, status: str, error: Optional[Exception] = None) -> None:
+        if self.done.is_set():
+            return
+        self.status = status
+        self.error = error
+        self.finished = time.perf_counter()
+        try:
+            if self.on_done:
+                self.on_done(self)  # before `done`, so waiters see its effects
+        finally:
+            self.done.set()
+
+
+class CommandPool:
+    """Bounded pool of worker threads fed by a bounded command queue
+
+    `submit` applies backpressure: it blocks, or raises CommandRejected
+    when `block` is False, while `max_pending` commands are waiting.
+    Commands running longer than `timeout` are reported as timed out and
+    their worker is replaced, so a stuck handler does not shrink the pool
+    (up to `workers` replacements at a time).
+    """
+    def __init__(self, execute: Callable[[str], None], workers: int = WORKERS,
+                 max_pending: int = MAX_PENDING, timeout: float = COMMAND_TIMEOUT,
+                 on_error: Optional[Callable[[CommandTicket], None]] = None):
+        self.execute = execute
+        self.workers = workers
+        self.timeout = timeout
+        self.on_error = on_error
+        self.stats = {'submitted': 0, 'rejected': 0, STATUS_OK: 0,
+                      STATUS_ERROR: 0, STATUS_TIMEOUT: 0}
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._active: Dict[threading.Thread, CommandTicket] = {}
+        self._replaced: Set[threading.Thread] = set()
+        self._threads: Set[threading.Thread] = set()
+        self._stopped = threading.Event()
+        self._serial = 0
+        for _ in range(workers):
+            self._spawn()
+        self._watchdog = threading.Thread(target=self._watch, name='command-watchdog',
+                                          daemon=True)
+        self._watchdog.start()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, command: str, block: bool = True, timeout: Optional[float] = None,
+               on_done: Optional[Callable[[CommandTicket], None]] = None) -> CommandTicket:
+        """Queue a command for the workers; raises CommandRejected when full"""
+        if self._stopped.is_set():
+            raise CommandRejected("Fila de comandos encerrada")
+        ticket = CommandTicket(command, on_done)
+        try:
+            self._queue.put(ticket, block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.stats['rejected'] += 1
+            raise CommandRejected("Fila de comandos cheia") from None
+        with self._lock:
+            self.stats['submitted'] += 1
+        return ticket
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Cancel queued commands and end the workers; running commands may finish"""
+        self._stopped.set()
+        while True:
+            try:
+                ticket = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if ticket is not None:
+                ticket._finish(STATUS_CANCELLED)
+        with self._lock:
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for thread in threads:
+            if thread is threading.current_thread():
+                continue
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            thread.join(remaining)
+
+    def _spawn(self) -> None:
+        self._serial += 1
+        thread = threading.Thread(target=self._work, name=f'command-worker-{self._serial}',
+                                  daemon=True)
+        self._threads.add(thread)
+        thread.start()
+
+    def _work(self) -> None:
+        me = threading.current_thread()
+        try:
+            while True:
+                ticket = self._queue.get()
+                if ticket is None:
+                    return
+                with self._lock:
+                    ticket.started = time.perf_counter()
+                    ticket.status = STATUS_RUNNING
+                    self._active[me] = ticket
+                status, error = STATUS_OK, None
+                try:
+                    self.execute(ticket.command)
+                except Exception as e:
+                    status, error = STATUS_ERROR, e
+                with self._lock:
+                    timed_out = self._active.pop(me, None) is None
+                    replaced = me in self._replaced
+                    self._replaced.discard(me)
+                    if not timed_out:
+                        self.stats[status] += 1
+                if timed_out:
+                    if replaced:
+                        return  # a fresh worker took this one's place
+                    continue
+                ticket._finish(status, error)
+                if error is not None and self.on_error:
+                    self.on_error(ticket)
+        finally:
+            with self._lock:
+                self._threads.discard(me)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(WATCHDOG_INTERVAL):
+            now = time.perf_counter()
+            expired = []
+            with self._lock:
+                for worker, ticket in list(self._active.items()):
+                    if now - ticket.started <= self.timeout:
+                        continue
+                    del self._active[worker]
+                    expired.append(ticket)
+                    self.stats[STATUS_TIMEOUT] += 1
+                    if len(self._replaced) < self.workers:
+                        self._replaced.add(worker)
+                        self._spawn()
+            for ticket in expired:
+                ticket._finish(STATUS_TIMEOUT)
+                if self.on_error:
+                    self.on_error(ticket)
@@ -0,0 +1,166 @@
+"""Jarvis sem interface gráfica: comandos por stdin ou por socket local
+
+Cada linha recebida é um comando, executado pelo pool de workers do
+Assistant. Para cada comando é devolvida uma linha
+"<status> <milissegundos> <comando>", com status ok, erro,
+tempo_esgotado, cancelado ou ocupado (fila cheia; só no modo socket).
+
+Uso:
+    python daemon.py < comandos.txt
+    python daemon.py --porta 8765 [--workers 4] [--fila 32] [--timeout 30]
+    python daemon.py --rastrear [--metricas jarvis_metrics.prom] < comandos.txt
+"""
+import argparse
+import socketserver
+import sys
+import threading
+
+from assistant import Assistant
+from database import definir_caminho_db
+from command_pool import CommandPool, CommandRejected, COMMAND_TIMEOUT, MAX_PENDING, WORKERS
+from speech_worker import NullEngine
+from tracing import METRICS_FILE, get_tracer
+
+HOST = '127.0.0.1'
+STATUS_BUSY = 'ocupado'
+
+
+def _format(status: str, seconds: float, command: str) -> str:
+    return f"{status} {seconds * 1000:.1f} {command}\n"
+
+
+def _log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+def _log_results(query: str, results) -> None:
+    for index, result in enumerate(results, 1):
+        _log(f"  {index}. {result['title']} - {result['link']}")
+
+
+def serve_stdin(assistant: Assistant, stop: threading.Event) -> None:
+    """Read commands until EOF or 'sair'; a full queue blocks the reader"""
+    write_lock = threading.Lock()
+    tickets = []
+
+    def reply(ticket):
+        with write_lock:
+            sys.stdout.write(_format(ticket.status, ticket.elapsed, ticket.command))
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        if stop.is_set():
+            break
+        command = line.strip().lower()
+        if command:
+            try:
+                tickets.append(assistant.commands.submit(command, on_done=reply))
+            except CommandRejected:
+                break  # pool stopped
+    for ticket in tickets:
+        ticket.wait()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """One client connection; replies are written as commands finish"""
+    def handle(self):
+        pool: CommandPool = self.server.assistant.commands
+        write_lock = threading.Lock()
+        tickets = []
+
+        def reply(status, seconds, command):
+            with write_lock:
+                try:
+                    self.wfile.write(_format(status, seconds, command).encode('utf-8'))
+                    self.wfile.flush()
+                except OSError:
+                    pass  # client went away
+
+        for raw in self.rfile:
+            command = raw.decode('utf-8', errors='replace').strip().lower()
+            if not command:
+                continue
+            try:
+                tickets.append(pool.submit(
+                    command, block=False,
+                    on_done=lambda t: reply(t.status, t.elapsed, t.command)))
+            except CommandRejected:
+                reply(STATUS_BUSY, 0.0, command)
+        for ticket in tickets:
+            ticket.wait()
+
+
+class CommandServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int, assistant: Assistant):
+        super().__init__((HOST, port), _CommandHandler)
+        self.assistant = assistant
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--porta', type=int, help="escuta comandos em 127.0.0.1:PORTA")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--fila', type=int, default=MAX_PENDING,
+                        help="comandos aguardando antes de recusar ou bloquear")
+    parser.add_argument('--timeout', type=float, default=COMMAND_TIMEOUT,
+                        help="segundos por comando")
+    parser.add_argument('--banco', help="arquivo do banco (padrão: conhecimento.db)")
+    parser.add_argument('--voz', action='store_true',
+                        help="usa microfone e síntese de voz (padrão: silencioso)")
+    parser.add_argument('--continuo', action='store_true',
+                        help="com --voz, também ouve comandos continuamente")
+    parser.add_argument('--rastrear', action='store_true',
+                        help="mede cada etapa dos comandos e exporta histogramas de latência")
+    parser.add_argument('--metricas', default=METRICS_FILE,
+                        help="arquivo de métricas no formato Prometheus (com --rastrear)")
+    parser.add_argument('--replica', action='store_true',
+                        help="responde consultas à base de conhecimento por uma cópia em memória")
+    args = parser.parse_args()
+
+    if args.banco:
+        definir_caminho_db(args.banco)
+    tracer = get_tracer()
+    if args.rastrear:
+        tracer.enabled = True
+        tracer.start_export(args.metricas)
+    assistant = Assistant(log=_log, engine_factory=None if args.voz else NullEngine,
+                          listen_enabled=args.voz, workers=args.workers,
+                          max_pending=args.fila, command_timeout=args.timeout,
+                          use_replica=args.replica)
+    stop = threading.Event()
+    assistant.on_results = _log_results
+    assistant.on_exit = stop.set
+    threading.Thread(target=assistant.warm_up, name='warmup', daemon=True).start()
+    if args.voz and args.continuo:
+        assistant.set_continuous(True)
+
+    server = None
+    try:
+        if args.porta is None:
+            serve_stdin(assistant, stop)
+        else:
+            server = CommandServer(args.porta, assistant)
+            threading.Thread(target=server.serve_forever, name='command-server',
+                             daemon=True).start()
+            _log(f"Aguardando comandos em {HOST}:{args.porta}")
+            while not stop.wait(0.5):
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if args.rastrear:
+            tracer.stop_export()
+            _log(tracer.report())
+        assistant.close()
+        _log(f"Encerrado. Estatísticas: {assistant.commands.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,192 @@
+import csv
+import hashlib
+import json
+import re
 import sqlite3
+import sys
+import threading
+import time
+import queue
+import zlib
+from contextlib import contextmanager
 from sqlite3 import Error
 
+from tracing import traced
+
+DB_PATH = 'conhecimento.db'
+POOL_SIZE = 4
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT_MS = 5000
+LIMITE_BUSCA = 20
+TAMANHO_PAGINA_TOPICOS = 200
+TAMANHO_LOTE = 1000
+# Histórico de pesquisas: descarrega a cada N segundos ou N registros
+HISTORICO_INTERVALO = 2.0
+HISTORICO_LIMITE = 50
+# Peso do tópico vs. conteúdo no ranking BM25
+PESO_TOPICO = 10.0
+PESO_INFORMACAO = 1.0
+
+# Conteúdos a partir deste tamanho (bytes UTF-8) vão comprimidos para a tabela blobs
+BLOB_MINIMO = 256
+NIVEL_ZLIB = 9
+NIVEL_ZSTD = 12
+# Entradas mais recentes de conhecimento_alteracoes mantidas por `compactar`;
+# réplicas mais atrasadas que isso recarregam tudo
+RETENCAO_ALTERACOES = 10000
+
+
+def _zstd():
+    """Módulo zstandard, se instalado (opcional; senão usa zlib)"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+def comprimir(dados):
+    """Comprime bytes com zstd (se disponível) ou zlib; retorna (algoritmo, dados)"""
+    zstandard = _zstd()
+    if zstandard is not None:
+        algoritmo, comprimido = 'zstd', zstandard.ZstdCompressor(level=NIVEL_ZSTD).compress(dados)
+    else:
+        algoritmo, comprimido = 'zlib', zlib.compress(dados, NIVEL_ZLIB)
+    if len(comprimido) >= len(dados):
+        return 'nenhuma', dados
+    return algoritmo, comprimido
+
+def descomprimir(dados, algoritmo):
+    """Inverso de `comprimir`; devolve o texto"""
+    if dados is None:
+        return None
+    if algoritmo == 'zlib':
+        dados = zlib.decompress(dados)
+    elif algoritmo == 'zstd':
+        zstandard = _zstd()
+        if zstandard is None:
+            raise Error("Conteúdo comprimido com zstd, mas o pacote zstandard não está instalado")
+        dados = zstandard.ZstdDecompressor().decompress(dados)
+    return bytes(dados).decode('utf-8')
+
+# Para ler o texto completo de `conhecimento c`: selecione COLUNAS_TEXTO com
+# JUNCAO_BLOBS e passe as três colunas para `texto_completo`
+COLUNAS_TEXTO = "c.informacao, b.compressao, b.dados"
+JUNCAO_BLOBS = "LEFT JOIN blobs b ON b.hash = c.blob_hash"
+
+def texto_completo(informacao, compressao, dados):
+    """Texto de uma linha de `conhecimento`: o da própria linha ou o do blob"""
+    return informacao if dados is None else descomprimir(dados, compressao)
+
+def _configurar_conexao(conn):
+    """Aplica os PRAGMAs de desempenho a uma conexão nova"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def _abrir_conexao(caminho):
+    """Abre uma conexão configurada, compartilhável entre threads do pool"""
+    conn = sqlite3.connect(caminho, check_same_thread=False,
+                           cached_statements=CACHED_STATEMENTS)
+    return _configurar_conexao(conn)
+
+
+class PoolConexoes:
+    """Pool de conexões SQLite reutilizadas entre a GUI e as threads de fundo
+
+    Cada conexão é usada por apenas uma thread por vez: ela é retirada do pool
+    em `conexao()` e devolvida ao final do bloco.
+    """
+    def __init__(self, caminho, tamanho=POOL_SIZE):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self._livres = queue.LifoQueue(maxsize=tamanho)
+        self._lock = threading.Lock()
+        self._fechado = False
+
+    def _retirar(self):
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            return _abrir_conexao(self.caminho)
+
+    def _devolver(self, conn):
+        with self._lock:
+            if not self._fechado:
+                try:
+                    self._livres.put_nowait(conn)
+                    return
+                except queue.Full:
+                    pass
+        conn.close()
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão; confirma ao sair ou desfaz em caso de erro"""
+        conn = self._retirar()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._devolver(conn)
+
+    def fechar(self):
+        """Fecha todas as conexões ociosas do pool"""
+        with self._lock:
+            self._fechado = True
+            while True:
+                try:
+                    self._livres.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool():
+    """Retorna o pool do banco atual, criando-o na primeira chamada"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.caminho != DB_PATH:
+            if _pool is not None:
+                _pool.fechar()
+            _pool = PoolConexoes(DB_PATH)
+        return _pool
+
+
+def conexao():
+    """Atalho para emprestar uma conexão do pool padrão"""
+    return obter_pool().conexao()
+
+
+def definir_caminho_db(caminho):
+    """Troca o arquivo de banco usado pelo módulo (ex.: benchmarks)"""
+    global DB_PATH
+    fechar_conexoes()
+    DB_PATH = caminho
+
+
+def fechar_conexoes():
+    """Fecha as conexões do pool; chamado ao encerrar a aplicação"""
+    global _pool
+    fechar_historico()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.fechar()
+            _pool = None
+
+
 def criar_conexao():
     """Cria conexão com o banco de dados SQLite"""
     conn = None
     try:
-        conn = sqlite3.connect('conhecimento.db')
+        conn = _abrir_conexao(DB_PATH)
         return conn
     except Error as e:
         print(e)
@@ -32,79 +213,774 @@ def criar_tabela(conn):
             data_pesquisa TEXT DEFAULT CURRENT_TIMESTAMP
         )
         """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            compressao TEXT NOT NULL,
+            dados BLOB NOT NULL,
+            tamanho INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """)
+        migrar_snapshots(conn)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            conhecimento_id INTEGER PRIMARY KEY REFERENCES conhecimento (id),
+            url TEXT NOT NULL,
+            blob_hash TEXT NOT NULL REFERENCES blobs (hash),
+            capturado_em TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        novos_blobs = adicionar_coluna_blob(conn)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_conhecimento_topico "
+                       "ON conhecimento (topico)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_history_data "
+                       "ON search_history (data_pesquisa)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_history_query "
+                       "ON search_history (query COLLATE NOCASE)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_history_vazias "
+                       "ON search_history (query COLLATE NOCASE) WHERE results_count = 0")
+        criar_indice_fts(conn)
+        migrar_hash_conteudo(conn)
+        if novos_blobs:
+            migrar_blobs(conn)
+        criar_registro_alteracoes(conn)
+
+    except Error as e:
+        print(e)
+
+def criar_registro_alteracoes(conn):
+    """Registra ids alterados ou apagados, para réplicas em memória se atualizarem
+
+    Inserções não entram no registro: como os ids são AUTOINCREMENT, basta
+    ler as linhas com id maior que o último conhecido.
+    """
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS conhecimento_alteracoes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        conhecimento_id INTEGER NOT NULL
+    );
+    CREATE TRIGGER IF NOT EXISTS conhecimento_alteracoes_au
+    AFTER UPDATE OF topico, informacao, blob_hash ON conhecimento BEGIN
+        INSERT INTO conhecimento_alteracoes (conhecimento_id) VALUES (old.id);
+    END;
+    CREATE TRIGGER IF NOT EXISTS conhecimento_alteracoes_ad AFTER DELETE ON conhecimento BEGIN
+        INSERT INTO conhecimento_alteracoes (conhecimento_id) VALUES (old.id);
+    END;
+    """)
+
+def podar_alteracoes(conn, manter=RETENCAO_ALTERACOES):
+    """Apaga do registro de alterações tudo menos as `manter` entradas mais recentes
+
+    A última entrada sempre fica: é por ela que uma réplica atrasada percebe
+    que o registro foi podado (o primeiro seq que lê não é o seguinte ao seu).
+    Retorna quantas entradas foram apagadas.
+    """
+    cursor = conn.execute("DELETE FROM conhecimento_alteracoes WHERE seq <= "
+                          "(SELECT MAX(seq) FROM conhecimento_alteracoes) - ?",
+                          (max(manter, 1),))
+    conn.commit()
+    return cursor.rowcount
+
+def _preparar_blob(informacao):
+    """(texto que fica na linha, hash do blob, linha da tabela blobs ou None)"""
+    dados = informacao.encode('utf-8')
+    if len(dados) < BLOB_MINIMO:
+        return informacao, None, None
+    chave = hashlib.sha1(dados).hexdigest()
+    algoritmo, comprimido = comprimir(dados)
+    return '', chave, (chave, algoritmo, comprimido, len(dados))
+
+def _gravar_blobs(conn, blobs):
+    conn.executemany("INSERT OR IGNORE INTO blobs (hash, compressao, dados, tamanho) "
+                     "VALUES (?, ?, ?, ?)", [blob for blob in blobs if blob is not None])
+
+def adicionar_coluna_blob(conn):
+    """Adiciona conhecimento.blob_hash em bancos antigos; True se a coluna é nova"""
+    colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(conhecimento)")]
+    if 'blob_hash' in colunas:
+        return False
+    conn.execute("ALTER TABLE conhecimento ADD COLUMN blob_hash TEXT REFERENCES blobs (hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_conhecimento_blob ON conhecimento (blob_hash) "
+                 "WHERE blob_hash IS NOT NULL")
+    conn.commit()
+    return True
+
+def migrar_blobs(conn, tamanho_lote=TAMANHO_LOTE):
+    """Move conteúdos grandes ainda guardados na própria linha para a tabela blobs
+
+    Conteúdos iguais (em tópicos diferentes) passam a ocupar um único blob.
+    O trigger tira a versão inline do FTS e o texto completo é indexado aqui.
+    Retorna quantas linhas foram movidas.
+    """
+    movidas = 0
+    ultimo_id = 0
+    while True:
+        linhas = conn.execute("SELECT id, topico, informacao FROM conhecimento "
+                              "WHERE id > ? AND blob_hash IS NULL "
+                              "AND length(CAST(informacao AS BLOB)) >= ? ORDER BY id LIMIT ?",
+                              (ultimo_id, BLOB_MINIMO, tamanho_lote)).fetchall()
+        if not linhas:
+            break
+        preparadas = [(id_,) + _preparar_blob(informacao) for id_, _, informacao in linhas]
+        _gravar_blobs(conn, [blob for _, _, _, blob in preparadas])
+        conn.executemany("UPDATE conhecimento SET informacao = ?, blob_hash = ? WHERE id = ?",
+                         [(texto, chave, id_) for id_, texto, chave, _ in preparadas])
+        _indexar(conn, linhas)
+        conn.commit()
+        movidas += len(linhas)
+        ultimo_id = linhas[-1][0]
+    return movidas
 
+def migrar_snapshots(conn):
+    """Converte a tabela snapshots antiga (conteúdo zlib na linha) para blobs"""
+    colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(snapshots)")]
+    if 'conteudo' not in colunas:
+        return
+    linhas = conn.execute("SELECT conhecimento_id, url, conteudo, capturado_em "
+                          "FROM snapshots").fetchall()
+    conn.execute("ALTER TABLE snapshots RENAME TO snapshots_antigos")
+    conn.execute("""
+    CREATE TABLE snapshots (
+        conhecimento_id INTEGER PRIMARY KEY REFERENCES conhecimento (id),
+        url TEXT NOT NULL,
+        blob_hash TEXT NOT NULL REFERENCES blobs (hash),
+        capturado_em TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    for conhecimento_id, url, conteudo, capturado_em in linhas:
+        dados = zlib.decompress(conteudo)
+        chave = hashlib.sha1(dados).hexdigest()
+        _gravar_blobs(conn, [(chave,) + comprimir(dados) + (len(dados),)])
+        conn.execute("INSERT INTO snapshots (conhecimento_id, url, blob_hash, capturado_em) "
+                     "VALUES (?, ?, ?, ?)", (conhecimento_id, url, chave, capturado_em))
+    conn.execute("DROP TABLE snapshots_antigos")
+    conn.commit()
+
+def limpar_blobs(conn):
+    """Apaga blobs que nenhuma informação ou snapshot referencia; retorna quantos"""
+    cursor = conn.execute("""
+        DELETE FROM blobs
+        WHERE hash NOT IN (SELECT blob_hash FROM conhecimento WHERE blob_hash IS NOT NULL)
+          AND hash NOT IN (SELECT blob_hash FROM snapshots)
+    """)
+    conn.commit()
+    return cursor.rowcount
+
+def relatorio_armazenamento():
+    """Bytes lógicos (texto como lido) vs. gravados no banco, e a economia obtida"""
+    try:
+        with conexao() as conn:
+            inline, linhas_inline = conn.execute(
+                "SELECT COALESCE(SUM(length(CAST(informacao AS BLOB))), 0), COUNT(*) "
+                "FROM conhecimento WHERE blob_hash IS NULL").fetchone()
+            logico_blobs, linhas_blob = conn.execute(
+                "SELECT COALESCE(SUM(b.tamanho), 0), COUNT(*) "
+                "FROM conhecimento c JOIN blobs b ON b.hash = c.blob_hash").fetchone()
+            logico_snapshots, = conn.execute(
+                "SELECT COALESCE(SUM(b.tamanho), 0) "
+                "FROM snapshots s JOIN blobs b ON b.hash = s.blob_hash").fetchone()
+            blobs, gravado_blobs = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(dados)), 0) FROM blobs").fetchone()
+            por_algoritmo = dict(conn.execute(
+                "SELECT compressao, COUNT(*) FROM blobs GROUP BY compressao").fetchall())
     except Error as e:
         print(e)
+        return {}
+    logico = inline + logico_blobs + logico_snapshots
+    gravado = inline + gravado_blobs
+    return {
+        'linhas_inline': linhas_inline,
+        'linhas_em_blob': linhas_blob,
+        'blobs': blobs,
+        'por_algoritmo': por_algoritmo,
+        'bytes_logicos': logico,
+        'bytes_gravados': gravado,
+        'economia_pct': 100 * (1 - gravado / logico) if logico else 0.0,
+    }
+
+def hash_conteudo(topico, informacao):
+    """Hash usado para não gravar duas vezes a mesma informação no mesmo tópico"""
+    return hashlib.sha1(f"{topico}\x1f{informacao}".encode('utf-8')).hexdigest()
+
+def migrar_hash_conteudo(conn):
+    """Adiciona a coluna hash_conteudo, preenche as linhas antigas e cria o índice único
+
+    Em bancos antigos com linhas repetidas, só a primeira recebe o hash; as
+    demais ficam com NULL e continuam disponíveis.
+    """
+    colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(conhecimento)")]
+    if 'hash_conteudo' not in colunas:
+        conn.execute("ALTER TABLE conhecimento ADD COLUMN hash_conteudo TEXT")
+        vistos = set()
+        atualizacoes = []
+        for id_, topico, informacao in conn.execute(
+                "SELECT id, topico, informacao FROM conhecimento ORDER BY id"):
+            chave = hash_conteudo(topico, informacao)
+            if chave not in vistos:
+                vistos.add(chave)
+                atualizacoes.append((chave, id_))
+        conn.executemany("UPDATE conhecimento SET hash_conteudo = ? WHERE id = ?", atualizacoes)
+        conn.commit()
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS idx_conhecimento_hash
+                    ON conhecimento (hash_conteudo) WHERE hash_conteudo IS NOT NULL""")
+
+def criar_indice_fts(conn):
+    """Cria o índice FTS5 sobre tópico e informação
+
+    Os triggers indexam só as linhas com o texto na própria tabela; as que
+    apontam para um blob são indexadas pelo Python ao gravar (o esquema não
+    depende de funções registradas, então qualquer cliente SQLite continua
+    podendo ler e escrever). Bancos sem índice, ou com o índice de uma
+    versão anterior, são reindexados.
+    """
+    gatilho = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'conhecimento_ai'"
+    ).fetchone()
+    visao = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'conhecimento_texto'"
+    ).fetchone()
+    if gatilho and 'blob_hash IS NULL' in gatilho[0] and not visao:
+        return
+    conn.executescript("""
+    DROP TRIGGER IF EXISTS conhecimento_ai;
+    DROP TRIGGER IF EXISTS conhecimento_ad;
+    DROP TRIGGER IF EXISTS conhecimento_au;
+    DROP TABLE IF EXISTS conhecimento_fts;
+    DROP VIEW IF EXISTS conhecimento_texto;
+    CREATE VIRTUAL TABLE conhecimento_fts USING fts5(
+        topico, informacao,
+        content='conhecimento', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    );
+    CREATE TRIGGER conhecimento_ai AFTER INSERT ON conhecimento
+    WHEN new.blob_hash IS NULL BEGIN
+        INSERT INTO conhecimento_fts(rowid, topico, informacao)
+        VALUES (new.id, new.topico, new.informacao);
+    END;
+    CREATE TRIGGER conhecimento_ad AFTER DELETE ON conhecimento
+    WHEN old.blob_hash IS NULL BEGIN
+        INSERT INTO conhecimento_fts(conhecimento_fts, rowid, topico, informacao)
+        VALUES ('delete', old.id, old.topico, old.informacao);
+    END;
+    CREATE TRIGGER conhecimento_au AFTER UPDATE OF topico, informacao, blob_hash ON conhecimento
+    BEGIN
+        INSERT INTO conhecimento_fts(conhecimento_fts, rowid, topico, informacao)
+        SELECT 'delete', old.id, old.topico, old.informacao WHERE old.blob_hash IS NULL;
+        INSERT INTO conhecimento_fts(rowid, topico, informacao)
+        SELECT new.id, new.topico, new.informacao WHERE new.blob_hash IS NULL;
+    END;
+    """)
+    reindexar_fts(conn)
+
+def _indexar(conn, linhas):
+    """Indexa no FTS linhas (id, tópico, texto completo) guardadas em blobs"""
+    conn.executemany("INSERT INTO conhecimento_fts(rowid, topico, informacao) VALUES (?, ?, ?)",
+                     linhas)
+
+def reindexar_fts(conn, tamanho_lote=TAMANHO_LOTE):
+    """Refaz o índice FTS inteiro, descomprimindo os blobs no Python
+
+    Corrige também linhas com blob alteradas ou apagadas por fora deste
+    módulo, que os triggers não conseguem acompanhar.
+    """
+    conn.execute("INSERT INTO conhecimento_fts(conhecimento_fts) VALUES ('delete-all')")
+    cursor = conn.execute(f"SELECT c.id, c.topico, {COLUNAS_TEXTO} "
+                          f"FROM conhecimento c {JUNCAO_BLOBS}")
+    while True:
+        linhas = cursor.fetchmany(tamanho_lote)
+        if not linhas:
+            break
+        _indexar(conn, [(id_, topico, texto_completo(*resto)) for id_, topico, *resto in linhas])
+    conn.commit()
+
+def _consulta_fts(texto):
+    """Converte texto livre em uma expressão MATCH com prefixos (ex.: "hin"*)"""
+    termos = re.findall(r'\w+', texto)
+    return ' '.join(f'"{termo}"*' for termo in termos)
 
 def inicializar_db():
     """Inicializa o banco de dados"""
-    conn = criar_conexao()
-    if conn is not None:
-        criar_tabela(conn)
-        conn.close()
+    try:
+        with conexao() as conn:
+            criar_tabela(conn)
+    except Error as e:
+        print(e)
 
+@traced('database')
 def adicionar_informacao(topico, informacao, fonte=None):
-    """Adiciona nova informação à base de conhecimento"""
-    conn = criar_conexao()
-    if conn is not None:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO conhecimento (topico, informacao, fonte) VALUES (?, ?, ?)", 
-                         (topico, informacao, fonte))
+    """Adiciona nova informação à base de conhecimento
 
-            conn.commit()
-            return True
-        except Error as e:
-            print(e)
-        finally:
-            conn.close()
+    Retorna o id da linha (o da já existente, se o conteúdo for repetido)
+    ou False em caso de erro.
+    """
+    chave = hash_conteudo(topico, informacao)
+    texto, blob_hash, blob = _preparar_blob(informacao)
+    try:
+        with conexao() as conn:
+            _gravar_blobs(conn, [blob])
+            cursor = conn.execute("INSERT OR IGNORE INTO conhecimento "
+                                  "(topico, informacao, fonte, hash_conteudo, blob_hash) "
+                                  "VALUES (?, ?, ?, ?, ?)",
+                                  (topico, texto, fonte, chave, blob_hash))
+            if cursor.rowcount:
+                if blob_hash:
+                    _indexar(conn, [(cursor.lastrowid, topico, informacao)])
+                return cursor.lastrowid
+            return conn.execute("SELECT id FROM conhecimento WHERE hash_conteudo = ?",
+                                (chave,)).fetchone()[0]
+    except Error as e:
+        print(e)
     return False
 
-def buscar_informacao(topico=None):
-    """Busca informações na base de conhecimento"""
-    conn = criar_conexao()
-    if conn is not None:
-        try:
-            cursor = conn.cursor()
+@traced('database')
+def buscar_informacao(topico=None, limite=LIMITE_BUSCA):
+    """Busca informações na base de conhecimento
+
+    Com `topico`, usa o índice FTS5 e devolve os `limite` resultados mais
+    relevantes (BM25), sem diferenciar acentos e aceitando prefixos.
+    """
+    try:
+        with conexao() as conn:
             if topico:
-                cursor.execute("SELECT topico, informacao FROM conhecimento WHERE topico LIKE ?", 
-                             (f'%{topico}%',))
+                consulta = _consulta_fts(topico)
+                if not consulta:
+                    return []
+                cursor = conn.execute(f"""
+                    SELECT c.topico, {COLUNAS_TEXTO}
+                    FROM conhecimento_fts
+                    JOIN conhecimento c ON c.id = conhecimento_fts.rowid
+                    {JUNCAO_BLOBS}
+                    WHERE conhecimento_fts MATCH ?
+                    ORDER BY bm25(conhecimento_fts, ?, ?)
+                    LIMIT ?
+                """, (consulta, PESO_TOPICO, PESO_INFORMACAO, limite if limite else -1))
             else:
-                cursor.execute("SELECT topico, informacao FROM conhecimento")
-            return cursor.fetchall()
-        except Error as e:
-            print(e)
-        finally:
-            conn.close()
+                cursor = conn.execute(f"SELECT c.topico, {COLUNAS_TEXTO} "
+                                      f"FROM conhecimento c {JUNCAO_BLOBS}")
+            return [(topico, texto_completo(*resto)) for topico, *resto in cursor.fetchall()]
+    except Error as e:
+        print(e)
     return []
 
-def registrar_pesquisa(query, results_count=0):
-    """Registra uma pesquisa no histórico"""
-    conn = criar_conexao()
-    if conn is not None:
+class GravadorHistorico:
+    """Grava o histórico de pesquisas em lotes numa thread de fundo
+
+    `registrar` só enfileira em memória; a thread descarrega o buffer a cada
+    `intervalo` segundos ou assim que ele atinge `limite` registros.
+    """
+    def __init__(self, intervalo=HISTORICO_INTERVALO, limite=HISTORICO_LIMITE):
+        self.intervalo = intervalo
+        self.limite = limite
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='historico', daemon=True)
+        self._thread.start()
+
+    def registrar(self, query, results_count=0):
+        data = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())  # igual a CURRENT_TIMESTAMP
+        with self._lock:
+            self._buffer.append((query, results_count, data))
+            cheio = len(self._buffer) >= self.limite
+        if cheio:
+            self._acordar.set()
+
+    def descarregar(self):
+        """Grava imediatamente o que estiver no buffer"""
+        with self._lock:
+            lote, self._buffer = self._buffer, []
+        if not lote:
+            return
         try:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO search_history (query, results_count) VALUES (?, ?)",
-                         (query, results_count))
-            conn.commit()
-            return True
+            with conexao() as conn:
+                conn.executemany("INSERT INTO search_history (query, results_count, data_pesquisa) "
+                                 "VALUES (?, ?, ?)", lote)
         except Error as e:
             print(e)
-        finally:
-            conn.close()
+
+    def _executar(self):
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            self.descarregar()
+
+    def fechar(self):
+        """Para a thread e grava o restante do buffer"""
+        self._parar.set()
+        self._acordar.set()
+        self._thread.join()
+        self.descarregar()
+
+
+_historico = None
+_historico_lock = threading.Lock()
+
+
+def _gravador_historico():
+    global _historico
+    with _historico_lock:
+        if _historico is None:
+            _historico = GravadorHistorico()
+        return _historico
+
+
+def fechar_historico():
+    """Descarrega e encerra o gravador de histórico, se estiver ativo"""
+    global _historico
+    with _historico_lock:
+        gravador, _historico = _historico, None
+    if gravador is not None:
+        gravador.fechar()
+
+
+@traced('database')
+def buscar_resultados_locais(consulta, limite=5, orcamento_ms=None):
+    """Entradas mais relevantes para `consulta`, com fonte e data de criação
+
+    Com `orcamento_ms`, a consulta é interrompida ao estourar o tempo e a
+    função retorna None (diferente de [] = nada encontrado).
+    """
+    expressao = _consulta_fts(consulta)
+    if not expressao:
+        return []
+    try:
+        with conexao() as conn:
+            if orcamento_ms is not None:
+                limite_tempo = time.perf_counter() + orcamento_ms / 1000
+                conn.set_progress_handler(lambda: time.perf_counter() > limite_tempo, 1000)
+            try:
+                linhas = conn.execute(f"""
+                    SELECT c.topico, c.fonte, c.data_criacao, {COLUNAS_TEXTO}
+                    FROM conhecimento_fts
+                    JOIN conhecimento c ON c.id = conhecimento_fts.rowid
+                    {JUNCAO_BLOBS}
+                    WHERE conhecimento_fts MATCH ?
+                    ORDER BY bm25(conhecimento_fts, ?, ?)
+                    LIMIT ?
+                """, (expressao, PESO_TOPICO, PESO_INFORMACAO, limite)).fetchall()
+            finally:
+                conn.set_progress_handler(None, 0)
+        return [(topico, texto_completo(*texto), fonte, data)
+                for topico, fonte, data, *texto in linhas]
+    except sqlite3.OperationalError as e:
+        if 'interrupted' in str(e):
+            return None
+        print(e)
+    except Error as e:
+        print(e)
+    return []
+
+@traced('database')
+def buscar_por_topico(topico):
+    """Informações gravadas exatamente sob `topico`, na ordem em que foram salvas"""
+    try:
+        with conexao() as conn:
+            linhas = conn.execute(f"SELECT c.topico, {COLUNAS_TEXTO} "
+                                  f"FROM conhecimento c {JUNCAO_BLOBS} "
+                                  "WHERE c.topico = ? ORDER BY c.id", (topico,)).fetchall()
+        return [(topico, texto_completo(*resto)) for topico, *resto in linhas]
+    except Error as e:
+        print(e)
+    return []
+
+@traced('database')
+def salvar_snapshot(conhecimento_id, url, texto):
+    """Grava (ou substitui) o texto comprimido da página ligada a uma informação"""
+    dados = texto.encode('utf-8')
+    chave = hashlib.sha1(dados).hexdigest()
+    try:
+        with conexao() as conn:
+            _gravar_blobs(conn, [(chave,) + comprimir(dados) + (len(dados),)])
+            conn.execute("INSERT OR REPLACE INTO snapshots (conhecimento_id, url, blob_hash) "
+                         "VALUES (?, ?, ?)", (conhecimento_id, url, chave))
+        return True
+    except Error as e:
+        print(e)
     return False
 
+@traced('database')
+def buscar_snapshot(conhecimento_id):
+    """Texto da página capturada para a informação, como (url, texto), ou None"""
+    try:
+        with conexao() as conn:
+            linha = conn.execute("SELECT s.url, b.dados, b.compressao "
+                                 "FROM snapshots s JOIN blobs b ON b.hash = s.blob_hash "
+                                 "WHERE s.conhecimento_id = ?", (conhecimento_id,)).fetchone()
+    except Error as e:
+        print(e)
+        return None
+    if linha is None:
+        return None
+    return linha[0], descomprimir(linha[1], linha[2])
+
+@traced('database')
+def registrar_pesquisa(query, results_count=0):
+    """Registra uma pesquisa no histórico (gravação assíncrona em lote)"""
+    _gravador_historico().registrar(query, results_count)
+    return True
+
+def consultas_mais_frequentes(limite=10, desde=None):
+    """Pesquisas mais repetidas como (query, vezes, média de resultados)"""
+    try:
+        with conexao() as conn:
+            return conn.execute("""
+                SELECT query COLLATE NOCASE, COUNT(*) AS vezes, AVG(results_count)
+                FROM search_history
+                WHERE data_pesquisa >= ?
+                GROUP BY query COLLATE NOCASE
+                ORDER BY vezes DESC
+                LIMIT ?
+            """, (desde or '', limite)).fetchall()
+    except Error as e:
+        print(e)
+    return []
+
+def consultas_sem_resultado(limite=10, desde=None):
+    """Pesquisas que não retornaram nada, como (query, vezes, última vez)"""
+    try:
+        with conexao() as conn:
+            return conn.execute("""
+                SELECT query COLLATE NOCASE, COUNT(*) AS vezes, MAX(data_pesquisa)
+                FROM search_history
+                WHERE results_count = 0 AND data_pesquisa >= ?
+                GROUP BY query COLLATE NOCASE
+                ORDER BY vezes DESC
+                LIMIT ?
+            """, (desde or '', limite)).fetchall()
+    except Error as e:
+        print(e)
+    return []
+
+def volume_por_hora(desde=None):
+    """Quantidade de pesquisas por hora (UTC), como ('AAAA-MM-DD HH:00', vezes)"""
+    try:
+        with conexao() as conn:
+            return conn.execute("""
+                SELECT strftime('%Y-%m-%d %H:00', data_pesquisa) AS hora, COUNT(*)
+                FROM search_history
+                WHERE data_pesquisa >= ?
+                GROUP BY hora
+                ORDER BY hora
+            """, (desde or '',)).fetchall()
+    except Error as e:
+        print(e)
+    return []
+
+@traced('database')
 def listar_topicos():
     """Lista todos os tópicos distintos na base de conhecimento"""
+    try:
+        with conexao() as conn:
+            cursor = conn.execute("SELECT DISTINCT topico FROM conhecimento")
+            return [item[0] for item in cursor.fetchall()]
+    except Error as e:
+        print(e)
+    return []
 
-    conn = criar_conexao()
-    if conn is not None:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT topico FROM conhecimento")
+@traced('database')
+def listar_topicos_pagina(apos=None, limite=TAMANHO_PAGINA_TOPICOS, filtro=None):
+    """Uma página de tópicos distintos em ordem alfabética (paginação por chave)
+
+    `apos` é o último tópico da página anterior. Com `filtro`, só entram
+    tópicos que contêm palavras começando pelos termos digitados, sem
+    diferenciar acentos (índice FTS na coluna topico).
+    """
+    try:
+        with conexao() as conn:
+            consulta = _consulta_fts(filtro) if filtro else ''
+            if consulta:
+                cursor = conn.execute("""
+                    SELECT DISTINCT c.topico
+                    FROM conhecimento_fts
+                    JOIN conhecimento c ON c.id = conhecimento_fts.rowid
+                    WHERE conhecimento_fts MATCH ? AND c.topico > ?
+                    ORDER BY c.topico
+                    LIMIT ?
+                """, (f'topico : ({consulta})', apos or '', limite))
+            else:
+                cursor = conn.execute("SELECT DISTINCT topico FROM conhecimento "
+                                      "WHERE topico > ? ORDER BY topico LIMIT ?",
+                                      (apos or '', limite))
             return [item[0] for item in cursor.fetchall()]
-        except Error as e:
-            print(e)
-        finally:
-            conn.close()
+    except Error as e:
+        print(e)
     return []
+
+def _ler_registros(arquivo, formato):
+    """Gera dicionários a partir de um arquivo JSONL ou CSV já aberto
+
+    Linhas malformadas geram None, para serem contadas como inválidas
+    sem interromper a leitura.
+    """
+    if formato == 'csv':
+        leitor = csv.DictReader(arquivo)
+        while True:
+            try:
+                yield next(leitor)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield None
+    else:
+        for linha in arquivo:
+            linha = linha.strip()
+            if linha:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    registro = None
+                yield registro if isinstance(registro, dict) else None
+
+def _formato_de(caminho, formato):
+    if formato:
+        return formato
+    return 'csv' if caminho.lower().endswith('.csv') else 'jsonl'
+
+def importar_arquivo(caminho, formato=None, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Importa tópicos de um arquivo JSONL/CSV em lotes, ignorando duplicatas
+
+    Cada registro precisa de `topico` e `informacao` (`fonte` é opcional);
+    linhas malformadas ou incompletas são contadas em `invalidas` e puladas.
+    Cada lote é gravado com `executemany` numa única transação.
+    `progresso(lidas, inseridas)` é chamado após cada lote.
+    Retorna um resumo com contagens e linhas por segundo.
+    """
+    formato = _formato_de(caminho, formato)
+    resumo = {'lidas': 0, 'inseridas': 0, 'duplicadas': 0, 'invalidas': 0}
+    inicio = time.perf_counter()
+
+    def gravar(conn, lote):
+        _gravar_blobs(conn, [linha[5] for linha in lote])
+        ultimo_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM conhecimento").fetchone()[0]
+        cursor = conn.executemany("INSERT OR IGNORE INTO conhecimento "
+                                  "(topico, informacao, fonte, hash_conteudo, blob_hash) "
+                                  "VALUES (?, ?, ?, ?, ?)", [linha[:5] for linha in lote])
+        inseridas = cursor.rowcount
+        # Linhas novas com blob: o texto completo vai para o FTS daqui
+        textos = {linha[3]: linha[6] for linha in lote if linha[4]}
+        if textos:
+            _indexar(conn, [(id_, topico, textos[chave]) for id_, topico, chave in conn.execute(
+                "SELECT id, topico, hash_conteudo FROM conhecimento "
+                "WHERE id > ? AND blob_hash IS NOT NULL", (ultimo_id,)).fetchall()])
+        conn.commit()
+        resumo['inseridas'] += inseridas
+        resumo['duplicadas'] += len(lote) - inseridas
+        if progresso:
+            progresso(resumo['lidas'], resumo['inseridas'])
+
+    try:
+        with open(caminho, newline='', encoding='utf-8') as arquivo, conexao() as conn:
+            lote = []
+            try:
+                for registro in _ler_registros(arquivo, formato):
+                    resumo['lidas'] += 1
+                    topico = (registro or {}).get('topico')
+                    informacao = (registro or {}).get('informacao')
+                    if not isinstance(topico, str) or not isinstance(informacao, str) \
+                            or not topico.strip() or not informacao:
+                        resumo['invalidas'] += 1
+                        continue
+                    topico = topico.strip()
+                    texto, blob_hash, blob = _preparar_blob(informacao)
+                    lote.append((topico, texto, registro.get('fonte') or None,
+                                 hash_conteudo(topico, informacao), blob_hash, blob,
+                                 informacao if blob_hash else None))
+                    if len(lote) >= tamanho_lote:
+                        pendente, lote = lote, []
+                        gravar(conn, pendente)
+            finally:
+                # Mesmo se a leitura falhar no meio, o que já foi lido é gravado
+                if lote:
+                    gravar(conn, lote)
+    except (Error, OSError, ValueError) as e:
+        print(e)
+        resumo['erro'] = str(e)
+
+    resumo['segundos'] = time.perf_counter() - inicio
+    resumo['linhas_por_segundo'] = resumo['lidas'] / resumo['segundos'] if resumo['segundos'] else 0.0
+    return resumo
+
+def exportar_arquivo(caminho, formato=None, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Exporta a base para JSONL/CSV lendo o cursor em blocos (memória constante)"""
+    formato = _formato_de(caminho, formato)
+    resumo = {'exportadas': 0}
+    inicio = time.perf_counter()
+    campos = ['topico', 'informacao', 'fonte', 'data_criacao']
+    try:
+        with open(caminho, 'w', newline='', encoding='utf-8') as arquivo, conexao() as conn:
+            escritor = csv.writer(arquivo) if formato == 'csv' else None
+            if escritor:
+                escritor.writerow(campos)
+            cursor = conn.execute(f"SELECT c.topico, c.fonte, c.data_criacao, {COLUNAS_TEXTO} "
+                                  f"FROM conhecimento c {JUNCAO_BLOBS} ORDER BY c.id")
+            while True:
+                linhas = [(topico, texto_completo(*texto), fonte, data)
+                          for topico, fonte, data, *texto in cursor.fetchmany(tamanho_lote)]
+                if not linhas:
+                    break
+                if escritor:
+                    escritor.writerows(linhas)
+                else:
+                    arquivo.writelines(json.dumps(dict(zip(campos, linha)), ensure_ascii=False) + '\n'
+                                       for linha in linhas)
+                resumo['exportadas'] += len(linhas)
+                if progresso:
+                    progresso(resumo['exportadas'])
+    except (Error, OSError) as e:
+        print(e)
+        resumo['erro'] = str(e)
+
+    resumo['segundos'] = time.perf_counter() - inicio
+    resumo['linhas_por_segundo'] = (resumo['exportadas'] / resumo['segundos']
+                                    if resumo['segundos'] else 0.0)
+    return resumo
+
+def compactar():
+    """Move conteúdos longos para blobs, apaga blobs órfãos, refaz o FTS,
+    poda o registro de alterações e faz VACUUM"""
+    with conexao() as conn:
+        movidas = migrar_blobs(conn)
+        removidos = limpar_blobs(conn)
+        # Linhas com blob gravadas por outras ferramentas não passam pelo índice
+        reindexar_fts(conn)
+        podadas = podar_alteracoes(conn)
+        conn.execute("VACUUM")
+    return {'movidas': movidas, 'blobs_removidos': removidos, 'alteracoes_removidas': podadas}
+
+def main(argv=None):
+    """Linha de comando: python database.py importar|exportar ARQUIVO | compactar | relatorio"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Importação, exportação e manutenção "
+                                                 "da base de conhecimento")
+    parser.add_argument('acao', choices=['importar', 'exportar', 'compactar', 'relatorio'])
+    parser.add_argument('arquivo', nargs='?')
+    parser.add_argument('--formato', choices=['jsonl', 'csv'])
+    parser.add_argument('--banco', default=DB_PATH, help="arquivo SQLite (padrão: %(default)s)")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+    args = parser.parse_args(argv)
+    if args.acao in ('importar', 'exportar') and not args.arquivo:
+        parser.error(f"{args.acao} precisa de um ARQUIVO")
+
+    definir_caminho_db(args.banco)
+    inicializar_db()
+
+    def mostrar(*contagens):
+        print(f"\r{' / '.join(str(c) for c in contagens)} linhas", end='', file=sys.stderr)
+
+    if args.acao == 'importar':
+        resumo = importar_arquivo(args.arquivo, args.formato, args.lote, mostrar)
+    elif args.acao == 'exportar':
+        resumo = exportar_arquivo(args.arquivo, args.formato, args.lote, mostrar)
+    else:
+        resumo = compactar() if args.acao == 'compactar' else {}
+        resumo.update(relatorio_armazenamento())
+    print(file=sys.stderr)
+    fechar_conexoes()
+    print(', '.join(f"{chave}: {valor:.1f}" if isinstance(valor, float) else f"{chave}: {valor}"
+                    for chave, valor in resumo.items()))
+    return 1 if 'erro' in resumo else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
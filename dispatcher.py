@@ -0,0 +1,116 @@
+import unicodedata
+from typing import Callable, Dict, List, Optional, Tuple
+
+FILLER_WORDS = frozenset(['o', 'a', 'os', 'as', 'de', 'do', 'da'])
+
+
+def normalize_word(word: str) -> str:
+    """Lowercase a word and strip its accents"""
+    decomposed = unicodedata.normalize('NFKD', word.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[Tuple[int, str]]:
+    """Split text into (original index, normalized word), dropping filler words"""
+    tokens = []
+    for index, word in enumerate(text.split()):
+        normalized = normalize_word(word)
+        if normalized not in FILLER_WORDS:
+            tokens.append((index, normalized))
+    return tokens
+
+
+class _Node:
+    __slots__ = ('children', 'handler', 'accepts_argument', 'alias')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.handler: Optional[Callable] = None
+        self.accepts_argument = False
+        self.alias: Optional[str] = None
+
+
+class CommandMatch:
+    """Result of matching a spoken command against the registered aliases"""
+    __slots__ = ('alias', 'handler', 'accepts_argument', 'argument')
+
+    def __init__(self, alias: str, handler: Callable, accepts_argument: bool, argument: str):
+        self.alias = alias
+        self.handler = handler
+        self.accepts_argument = accepts_argument
+        self.argument = argument
+
+    def __call__(self):
+        if self.accepts_argument:
+            return self.handler(self.argument or None)
+        return self.handler()
+
+    def __repr__(self) -> str:
+        return f"CommandMatch({self.alias!r}, argument={self.argument!r})"
+
+
+class CommandDispatcher:
+    """Word-level trie over command aliases with leftmost-longest precedence
+
+    Aliases are compiled once; matching a command walks the trie from each
+    word, so the cost depends on the command length and the depth of the
+    longest alias, not on how many aliases are registered. The alias that
+    starts earliest wins (the longest one among those starting there), so
+    the words after 'pesquisar' are its argument, never another command.
+    """
+    def __init__(self):
+        self._root = _Node()
+        self.alias_count = 0
+
+    def add(self, alias: str, handler: Callable, accepts_argument: bool = False) -> None:
+        """Register an alias; a later registration of the same alias replaces it"""
+        words = [word for _, word in tokenize(alias)]
+        if not words:
+            raise ValueError(f"Alias vazio: {alias!r}")
+        node = self._root
+        for word in words:
+            node = node.children.setdefault(word, _Node())
+        if node.handler is None:
+            self.alias_count += 1
+        node.handler = handler
+        node.accepts_argument = accepts_argument
+        node.alias = alias
+
+    def add_many(self, aliases, handler: Callable, accepts_argument: bool = False) -> None:
+        """Register several aliases for the same handler"""
+        for alias in aliases:
+            self.add(alias, handler, accepts_argument)
+
+    def match(self, command: str) -> Optional[CommandMatch]:
+        """Find the leftmost (then longest) alias and extract the text after it"""
+        if not command:
+            return None
+        tokens = tokenize(command)
+        best: Optional[_Node] = None
+        best_end = -1
+        for start in range(len(tokens)):
+            node = self._root
+            for position in range(start, len(tokens)):
+                node = node.children.get(tokens[position][1])
+                if node is None:
+                    break
+                if node.handler is not None:
+                    best, best_end = node, position
+            if best is not None:
+                break  # the rest of the sentence is the argument
+        if best is None:
+            return None
+
+        words = command.split()
+        rest = words[tokens[best_end][0] + 1:]
+        while rest and normalize_word(rest[0]) in FILLER_WORDS:
+            rest.pop(0)
+        return CommandMatch(best.alias, best.handler, best.accepts_argument, ' '.join(rest))
+
+    def dispatch(self, command: str) -> bool:
+        """Run the handler for the command; returns False if nothing matched"""
+        found = self.match(command)
+        if found is None:
+            return False
+        found()
+        return True
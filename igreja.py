@@ -1,80 +1,48 @@
-import speech_recognition as sr
-import pyttsx3
+from startup import StartupProfiler, lazy_module
+import argparse
 import os
-import psutil
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import threading
-import time
 import queue
-import requests
-from bs4 import BeautifulSoup
-from typing import Optional, List, Tuple
-from database import inicializar_db, adicionar_informacao, registrar_pesquisa, buscar_informacao, listar_topicos
+from typing import Callable, Optional, List, Tuple
+from assistant import Assistant
+from log_bus import LogBus
+from results_view import ResultsView
+from speech_worker import PRIORITY_NORMAL, SpeechRequest
+from database import TAMANHO_PAGINA_TOPICOS
+from tracing import METRICS_FILE, get_tracer
 
+UI_POLL_MS = 50
+FILTER_DEBOUNCE_MS = 250
+# Delay before optional background warm-up, so the first paint is not contended
+WARMUP_DELAY_MS = 200
 
 
 
-class SystemMonitor:
-    """Handles system monitoring and visualization"""
-    def __init__(self, parent: tk.Toplevel):
-        self.parent = parent
-        self.fig = Figure(figsize=(5, 4), dpi=100)
-        self.ax_ram = self.fig.add_subplot(211)
-        self.ax_cpu = self.fig.add_subplot(212)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        self.ram_data: List[float] = []
-        self.cpu_data: List[float] = []
-        self.running = True
-
-    def update(self) -> None:
-        """Update monitoring graphs"""
-        while self.running and self.parent.winfo_exists():
-            ram = psutil.virtual_memory().percent
-            cpu = psutil.cpu_percent()
-            
-            # Update data buffers
-            self.ram_data.append(ram)
-            self.cpu_data.append(cpu)
-            if len(self.ram_data) > 20:
-                self.ram_data.pop(0)
-                self.cpu_data.pop(0)
-            
-            # Update plots
-            self._update_plot(self.ax_ram, self.ram_data, 'r-', f'Uso de RAM: {ram}%')
-            self._update_plot(self.ax_cpu, self.cpu_data, 'b-', f'Uso de CPU: {cpu}%')
-            
-            self.fig.tight_layout()
-            self.canvas.draw()
-            time.sleep(1)
-
-    def _update_plot(self, ax, data, style, title) -> None:
-        """Helper method to update individual plots"""
-        ax.clear()
-        ax.plot(data, style)
-        ax.set_title(title)
-        ax.set_ylim(0, 100)
-
-    def stop(self) -> None:
-        """Stop monitoring thread"""
-        self.running = False
 
 class JarvisGUI(tk.Tk):
     """Main application GUI for Jarvis assistant"""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, profiler: Optional[StartupProfiler] = None, warmup: bool = True,
+                 use_replica: bool = False):
+        self.profiler = profiler or StartupProfiler()
+        self.use_replica = use_replica
+        with self.profiler.measure('tk root'):
+            super().__init__()
         self.title("Assistente Jarvis")
         self.geometry("800x600")
         self.protocol("WM_DELETE_WINDOW", self.on_close)
-        
-        self._init_ui()
-        self._init_systems()
-        self.monitor: Optional[SystemMonitor] = None
+
+        with self.profiler.measure('ui'):
+            self._init_ui()
+        with self.profiler.measure('systems'):
+            self._init_systems()
+        self.monitor = None
+        self.warmup_done = threading.Event()
+        self._painted = False
+        self.bind('<Map>', self._on_first_map, add='+')
+        if warmup:
+            self.after(WARMUP_DELAY_MS, self._start_warmup)
 
     def _init_ui(self) -> None:
         """Initialize user interface components"""
@@ -90,8 +58,9 @@ class JarvisGUI(tk.Tk):
         log_frame = ttk.LabelFrame(main_frame, text="Log de Interações")
         log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        self.txt_logs = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD)
+        self.txt_logs = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, state='disabled')
         self.txt_logs.pack(fill=tk.BOTH, expand=True)
+        self.log_bus = LogBus(self.txt_logs, log_file=os.environ.get('JARVIS_LOG_FILE'))
         
         # Control buttons
         ctrl_frame = ttk.Frame(main_frame)
@@ -99,356 +68,87 @@ class JarvisGUI(tk.Tk):
         
         ttk.Button(ctrl_frame, text="Ouvir Comando", 
                   command=self._start_listening).pack(side=tk.LEFT, padx=5)
+        self.continuous_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(ctrl_frame, text="Modo Contínuo", variable=self.continuous_var,
+                        command=self._toggle_continuous).pack(side=tk.LEFT, padx=5)
         ttk.Button(ctrl_frame, text="Base de Conhecimento",
                   command=self._open_knowledge_base).pack(side=tk.LEFT, padx=5)
-        ttk.Button(ctrl_frame, text="Sair", 
-                  command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(ctrl_frame, text="Sair",
+                  command=self.on_close).pack(side=tk.RIGHT, padx=5)
 
     def _init_systems(self) -> None:
         """Initialize backend systems"""
-        self.voice_engine = pyttsx3.init()
-        self.voice_engine.setProperty('rate', 170)
-        self.speak_lock = threading.Lock()
-        self.command_queue = queue.Queue()
-
-        self.current_search_results = []
-        self.selected_result = None
-        self.search_cache = {}  # Cache for search results
-        inicializar_db()
+        self._ui_calls = queue.SimpleQueue()
+        self.after(UI_POLL_MS, self._poll_ui_calls)
+
+        self.assistant = Assistant(self.profiler, log=self.log, use_replica=self.use_replica)
+        self.assistant.on_result_streamed = self._on_result_streamed
+        self.assistant.on_results = lambda query, results: self.call_in_ui(
+            self.results_view.show, results, query)
+        self.assistant.on_status = lambda: self.call_in_ui(self._open_system_monitor)
+        self.assistant.on_exit = lambda: self.call_in_ui(self.on_close)
+        self.speech = self.assistant.speech
+        self.results_view = ResultsView(self, on_select=self.assistant.select_result)
+        self._system_monitor = lazy_module('system_monitor', self.profiler)
         self.log("Sistema inicializado. Pronto para ajudar.")
 
+    def _on_first_map(self, event) -> None:
+        if not self._painted:
+            self._painted = True
+            self.profiler.mark('window mapped')
 
+    def _start_warmup(self) -> None:
+        """Load the deferred subsystems in the background once the window is up"""
+        def warmup():
+            self.assistant.warm_up(extra=(self._system_monitor,))
+            self.warmup_done.set()
 
-    def log(self, message: str) -> None:
-        """Add message to log display"""
-        self.txt_logs.config(state='normal')
-        self.txt_logs.insert(tk.END, f"{message}\n")
-        self.txt_logs.see(tk.END)
-        self.txt_logs.config(state='disabled')
-
-    def speak(self, text: str) -> None:
-        """Convert text to speech"""
-        self.log(f"Jarvis: {text}")
-        with self.speak_lock:
-            self.voice_engine.say(text)
-            self.voice_engine.runAndWait()
-
-
-    def listen(self) -> Optional[str]:
-        """Listen for voice command"""
-        recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
-            self.log("Ouvindo...")
-            try:
-                audio = recognizer.listen(source, timeout=5)
-                command = recognizer.recognize_google(audio, language='pt-BR')
-                self.log(f"Você disse: {command}")
-                return command.lower()
-            except sr.UnknownValueError:
-                self.speak("Desculpe, não entendi.")
-            except sr.RequestError:
-                self.speak("Erro ao conectar com o serviço de voz.")
-            return None
-
-    def execute_command(self, command: str) -> None:
-        """Execute the given command"""
-        if not command:
-            return
-
-        command_handlers = {
-            # Notepad variations
-            'abrir bloco de notas': self._open_notepad,
-            'abre bloco de notas': self._open_notepad,
-            'abrir o bloco de notas': self._open_notepad,
-            'abre o bloco de notas': self._open_notepad,
-            'bloco de notas': self._open_notepad,
-            
-            # Memory variations
-            'limpar memória': self._clear_memory,
-            'limpa memória': self._clear_memory,
-            'limpar a memória': self._clear_memory,
-            
-            # System status
-            'status': self._show_system_status,
-            'status do sistema': self._show_system_status,
-            
-            # Chrome variations
-            'abrir chrome': self._open_chrome,
-            'abrir o chrome': self._open_chrome,
-            'abre chrome': self._open_chrome,
-            
-            # Calculator variations
-            'abrir calculadora': self._open_calculator,
-            'abre calculadora': self._open_calculator,
-            
-            # Shutdown variations
-            'desligar': self._shutdown,
-            'desliga': self._shutdown,
-            'desligar computador': self._shutdown,
-            
-            # Restart variations
-            'reiniciar': self._restart,
-            'reinicia': self._restart,
-            'reiniciar computador': self._restart,
-            
-            # Exit variations
-            'sair': self.destroy,
-            'fechar': self.destroy,
-            'encerrar': self.destroy,
-            
-            # Search variations
-            'pesquisar': self._search_web,
-            'buscar': self._search_web,
-            'pesquisar sobre': self._search_web,
-            'buscar na internet': self._search_web,
-            
-            # Knowledge variations
-            'salvar informação': self._save_current_result,
-            'salvar esta informação': self._save_current_result,
-            'o que você sabe sobre': self._query_knowledge
-
-        }
-
-
-        # Normalize command by removing extra spaces and common filler words
-        normalized = ' '.join([word for word in command.split() 
-                             if word not in ['o', 'a', 'os', 'as', 'de', 'do', 'da']])
-        
-        for cmd, handler in command_handlers.items():
-            if cmd in normalized:
-                handler()
-                return
-
-
-        self.speak("Comando não reconhecido.")
-
-    # Command handlers
-    def _open_notepad(self) -> None:
-        os.system("notepad.exe")
-        self.speak("Abrindo bloco de notas.")
+        threading.Thread(target=warmup, name='warmup', daemon=True).start()
 
-    def _clear_memory(self) -> None:
-        os.system("cls && echo off | clip")
-        self.speak("Memória limpa.")
 
-    def _show_system_status(self) -> None:
-        ram = psutil.virtual_memory().percent
-        cpu = psutil.cpu_percent()
-        self.speak(f"Uso de memória: {ram}%. Uso de CPU: {cpu}%")
-        
-        monitor_window = tk.Toplevel(self)
-        monitor_window.title("Monitor de Sistema")
-        
-        self.monitor = SystemMonitor(monitor_window)
-        monitor_thread = threading.Thread(
-            target=self.monitor.update,
-            daemon=True
-        )
-        monitor_thread.start()
 
-    def _open_chrome(self) -> None:
-        os.system("start chrome")
-        self.speak("Abrindo o navegador Chrome.")
+    def log(self, message: str) -> None:
+        """Add message to log display (safe from any thread)"""
+        self.log_bus.post(message)
 
-    def _open_calculator(self) -> None:
-        os.system("calc")
-        self.speak("Abrindo a calculadora.")
+    def speak(self, text: str, priority: int = PRIORITY_NORMAL, wait: bool = False,
+              on_done: Optional[Callable[[SpeechRequest], None]] = None) -> SpeechRequest:
+        """Queue text for speech through the assistant"""
+        return self.assistant.speak(text, priority, wait, on_done)
 
-    def _shutdown(self) -> None:
-        self.speak("Desligando o computador em 10 segundos.")
-        os.system("shutdown /s /t 10")
+    def execute_command(self, command: str) -> None:
+        """Execute the given command on the calling thread"""
+        self.assistant.execute_command(command, interrupt=True)
 
-    def _restart(self) -> None:
-        self.speak("Reiniciando o computador em 10 segundos.")
-        os.system("shutdown /r /t 10")
+    def _toggle_continuous(self) -> None:
+        """Switch hands-free listening on or off"""
+        self.assistant.set_continuous(self.continuous_var.get())
 
     def _start_listening(self) -> None:
-        """Start listening for commands in a separate thread"""
-        def listen_thread():
-            command = self.listen()
-            if command:
-                self.execute_command(command)
-
-        threading.Thread(target=listen_thread, daemon=True).start()
-
-    def _search_web(self, query: str = None) -> None:
-        """Search the web for information"""
-        if not query:
-            self.speak("O que você gostaria que eu pesquisasse?")
-            query = self.listen()
-            if not query:
-                return
-
-        # Check cache first
-        if query in self.search_cache:
-            self.current_search_results = self.search_cache[query]
-            self._display_search_results(self.current_search_results)
-            self.speak(f"Mostrando resultados em cache para {query}")
+        """Listen for one command; it then runs on the assistant's worker pool"""
+        self.assistant.listen_for_command()
+
+    def _on_result_streamed(self, query: str, index: int, result: dict) -> None:
+        if index == 0:
+            self.call_in_ui(self.results_view.begin, query)
+        self.call_in_ui(self.results_view.append, result)
+
+    def _open_system_monitor(self) -> None:
+        """Show the live monitor, reusing the window if it is still open"""
+        if self.monitor and self.monitor.running and self.monitor.parent.winfo_exists():
+            self.monitor.parent.lift()
             return
 
-        try:
-            # Check internet connection first
-            try:
-                requests.get('https://www.google.com', timeout=5)
-            except requests.ConnectionError:
-                self.speak("Sem conexão com a internet. Verifique sua rede.")
-                return
-                
-            # URL encode query and handle special characters
-            encoded_query = requests.utils.quote(query)
-            url = f"https://www.google.com/search?q={encoded_query}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0',
-                'Accept-Language': 'pt-BR,pt;q=0.9'
-            }
-            
-            self.log(f"Pesquisando: {query}")
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            results = []
-            seen_links = set()  # For deduplication
-            
-            # More robust result parsing
-            for result in soup.select('.tF2Cxc'):
-                try:
-                    title = result.select_one('h3')
-                    link = result.a['href']
-                    
-                    # Skip duplicates
-                    if link in seen_links:
-                        continue
-                    seen_links.add(link)
-                    
-                    snippet = result.select_one('.IsZvec, .VwiC3b')
-                    if title and link:
-                        results.append({
-                            'title': title.text.strip(),
-                            'link': link,
-                            'snippet': snippet.text.strip()[:250] + '...' if snippet else ''
-                        })
-                        if len(results) >= 5:  # Show more results
-                            break
-                except Exception as e:
-                    self.log(f"Erro ao processar resultado: {str(e)}")
-                    continue
-            
-            # Cache results
-            if results:
-                self.search_cache[query] = results
-
-            
-            if results:
-                self.current_search_results = results
-                registrar_pesquisa(query, len(results))
-                self._display_search_results(results)
-                self.log(f"Encontrados {len(results)} resultados para '{query}'")
-            else:
-                msg = f"Não encontrei resultados para '{query}'. Tente reformular sua pesquisa."
-                self.speak(msg)
-                self.log(msg)
-                
-        except requests.exceptions.RequestException as e:
-            self.log(f"Erro na pesquisa: {str(e)}")
-            self.speak("Ocorreu um erro de rede ao pesquisar. Verifique sua conexão.")
-        except Exception as e:
-            self.log(f"Erro inesperado na pesquisa: {str(e)}")
-            self.speak("Ocorreu um erro inesperado ao pesquisar.")
-
-
-    def _display_search_results(self, results: List[dict]) -> None:
-        """Display search results in a new window"""
-        result_window = tk.Toplevel(self)
-        result_window.title("Resultados da Pesquisa")
-        result_window.geometry("800x600")
-        
-        # Create scrollable container
-        container = ttk.Frame(result_window)
-        canvas = tk.Canvas(container)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        container.pack(fill="both", expand=True)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        def open_link(url):
-            import webbrowser
-            webbrowser.open(url)
-            
-        for idx, result in enumerate(results, 1):
-            frame = ttk.LabelFrame(scrollable_frame, text=f"Resultado {idx}")
-            frame.pack(fill="x", padx=10, pady=5, ipadx=5, ipady=5)
-            
-            # Title with clickable link
-            title_frame = ttk.Frame(frame)
-            title_frame.pack(fill="x", pady=(0,5))
-            
-            ttk.Label(title_frame, text=result['title'], 
-                     font=('Arial', 10, 'bold')).pack(side="left")
-            
-            link_btn = ttk.Button(title_frame, text="Abrir Link",
-                                command=lambda url=result['link']: open_link(url))
-            link_btn.pack(side="right", padx=5)
-            
-            # Snippet text
-            ttk.Label(frame, text=result['snippet'], 
-                     wraplength=700).pack(anchor='w')
-            
-            # Select button
-            def select_result(result=result):
-                self.selected_result = result
-                self.speak(f"Selecionado: {result['title']}")
-                
-            ttk.Button(frame, text="Selecionar para Salvar", 
-                      command=select_result).pack(pady=5)
-
-
-    def _save_current_result(self) -> None:
-        """Save the currently selected search result"""
-        if not self.selected_result:
-            self.speak("Nenhum resultado selecionado para salvar.")
-            return
-            
-        self.speak("Qual tópico devo associar a esta informação?")
-        topic = self.listen()
-        if topic:
-            adicionar_informacao(
-                topic,
-                f"{self.selected_result['title']}\n{self.selected_result['snippet']}",
-                self.selected_result['link']
-            )
-            self.speak("Informação salva com sucesso na base de conhecimento.")
-
-    def _query_knowledge(self, query: str = None) -> None:
-        """Query local knowledge base"""
-        if not query:
-            self.speak("Sobre o que você gostaria de saber?")
-            query = self.listen()
-            if not query:
-                return
-                
-        results = buscar_informacao(query)
-        if results:
-            for topic, info in results:
-                self.speak(f"Encontrei sobre {topic}: {info[:100]}...")
-        else:
-            self.speak("Não encontrei informações sobre este tópico.")
+        monitor_window = tk.Toplevel(self)
+        monitor_window.title("Monitor de Sistema")
+
+        self.monitor = self._system_monitor.get().SystemMonitor(monitor_window,
+                                                                self.assistant.sampler)
+        self.monitor.start()
 
     def _open_knowledge_base(self) -> None:
         """Open knowledge base interface"""
+        self.assistant.open_database()
         kb_window = tk.Toplevel(self)
         kb_window.title("Base de Conhecimento")
         kb_window.geometry("800x600")
@@ -457,13 +157,24 @@ class JarvisGUI(tk.Tk):
         main_frame = ttk.Frame(kb_window)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        # Topics list (left)
+        # Topics list (left), filled one page at a time as it is scrolled
         topics_frame = ttk.Frame(main_frame)
         topics_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5)
 
         ttk.Label(topics_frame, text="Tópicos").pack()
-        self.topics_tree = ttk.Treeview(topics_frame, height=25)
-        self.topics_tree.pack(fill=tk.Y)
+        self.topic_filter = tk.StringVar()
+        filter_entry = ttk.Entry(topics_frame, textvariable=self.topic_filter)
+        filter_entry.pack(fill=tk.X, pady=(0, 5))
+        filter_entry.bind('<KeyRelease>', self._on_filter_typed)
+
+        tree_frame = ttk.Frame(topics_frame)
+        tree_frame.pack(fill=tk.Y, expand=True)
+        self.topics_tree = ttk.Treeview(tree_frame, height=25)
+        self.topics_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical",
+                                              command=self.topics_tree.yview)
+        self.topics_tree.configure(yscrollcommand=self._on_topics_scrolled)
+        self.topics_tree.pack(side=tk.LEFT, fill=tk.Y)
+        self.topics_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.topics_tree.bind('<<TreeviewSelect>>', self._on_topic_select)
 
         # Information display (right)
@@ -483,33 +194,133 @@ class JarvisGUI(tk.Tk):
         ttk.Button(btn_frame, text="Fechar",
                  command=kb_window.destroy).pack(side=tk.RIGHT, padx=5)
 
+        self._topics_page = {'generation': 0, 'last': None, 'done': False, 'loading': False}
+        self._filter_after_id = None
         self._refresh_topics()
         self.speak("Base de conhecimento aberta.")
 
     def _refresh_topics(self) -> None:
-        """Refresh the topics list"""
+        """Restart the topics list from the first page of the current filter"""
         self.topics_tree.delete(*self.topics_tree.get_children())
-        for topic in listar_topicos():
-            self.topics_tree.insert('', 'end', text=topic, values=(topic,))
+        page = self._topics_page
+        page.update(generation=page['generation'] + 1, last=None, done=False, loading=False)
+        self._load_topics_page()
+
+    def _load_topics_page(self) -> None:
+        """Fetch the next page of topics off the UI thread"""
+        page = self._topics_page
+        if page['loading'] or page['done']:
+            return
+        page['loading'] = True
+        generation = page['generation']
+        self.run_in_background(
+            self.assistant.knowledge_topics,
+            lambda topics: self._append_topics(generation, topics),
+            page['last'], TAMANHO_PAGINA_TOPICOS, self.topic_filter.get().strip() or None
+        )
+
+    def _append_topics(self, generation: int, topics: List[str]) -> None:
+        page = self._topics_page
+        if generation != page['generation']:
+            return  # filter changed or list refreshed meanwhile
+        try:
+            for topic in topics:
+                self.topics_tree.insert('', 'end', text=topic, values=(topic,))
+            page['loading'] = False
+            page['done'] = len(topics) < TAMANHO_PAGINA_TOPICOS
+            if topics:
+                page['last'] = topics[-1]
+            # Keep loading until the visible area is filled
+            if not page['done'] and self.topics_tree.yview()[1] >= 1.0:
+                self._load_topics_page()
+        except tk.TclError:
+            pass  # window closed
+
+    def _on_topics_scrolled(self, first: str, last: str) -> None:
+        self.topics_scrollbar.set(first, last)
+        if float(last) > 0.9:
+            self._load_topics_page()
+
+    def _on_filter_typed(self, event) -> None:
+        """Type-ahead: refresh the list shortly after the user stops typing"""
+        if self._filter_after_id is not None:
+            self.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.after(FILTER_DEBOUNCE_MS, self._refresh_topics)
 
     def _on_topic_select(self, event) -> None:
         """Handle topic selection"""
         selected = self.topics_tree.focus()
         if selected:
             topic = self.topics_tree.item(selected)['text']
-            info = buscar_informacao(topic)
+            info = self.assistant.knowledge_entries(topic)
             self.info_text.delete(1.0, tk.END)
             for topic, content in info:
                 self.info_text.insert(tk.END, f"{topic}:\n{content}\n\n")
 
+    def run_in_background(self, func: Callable, callback: Callable, *args) -> None:
+        """Run func(*args) on a worker thread and hand its result to callback on the UI thread"""
+        def worker():
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.log(f"Erro em segundo plano: {str(e)}")
+                return
+            self.call_in_ui(callback, result)
+        threading.Thread(target=worker, daemon=True).start()
 
+    def call_in_ui(self, func: Callable, *args) -> None:
+        """Schedule func(*args) on the Tk main thread; safe from any thread"""
+        self._ui_calls.put((func, args))
+
+    def _poll_ui_calls(self) -> None:
+        while True:
+            try:
+                func, args = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                self.log(f"Erro na interface: {str(e)}")
+        self.after(UI_POLL_MS, self._poll_ui_calls)
 
     def on_close(self) -> None:
         """Clean up resources before closing"""
         if self.monitor:
             self.monitor.stop()
+        get_tracer().stop_export()  # before close() releases the database
+        self.assistant.close()
+        self.log_bus.stop()
         self.destroy()
 
-if __name__ == "__main__":
-    app = JarvisGUI()
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Assistente virtual Jarvis")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="mede importação e inicialização de cada subsistema e sai")
+    parser.add_argument('--rastrear', action='store_true',
+                        help="mede cada etapa dos comandos e exporta histogramas de latência")
+    parser.add_argument('--metricas', default=METRICS_FILE,
+                        help="arquivo de métricas no formato Prometheus (com --rastrear)")
+    parser.add_argument('--replica', action='store_true',
+                        help="responde consultas à base de conhecimento por uma cópia em memória")
+    args = parser.parse_args()
+    if args.rastrear:
+        get_tracer().enabled = True
+        get_tracer().start_export(args.metricas)
+
+    profiler = StartupProfiler(enabled=args.profile_startup)
+    profiler.mark('eager imports done')
+    app = JarvisGUI(profiler=profiler, use_replica=args.replica)
+    if args.profile_startup:
+        def report_when_warm():
+            if app.warmup_done.is_set():
+                print(profiler.report())
+                app.on_close()
+            else:
+                app.after(50, report_when_warm)
+        app.after(WARMUP_DELAY_MS, report_when_warm)
     app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import bisect
+import heapq
+import re
+import sys
+import threading
+from array import array
+from sqlite3 import Error
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from database import (COLUNAS_TEXTO, JUNCAO_BLOBS, PESO_INFORMACAO, PESO_TOPICO,
+                      TAMANHO_PAGINA_TOPICOS, criar_conexao, texto_completo)
+from dispatcher import normalize_word
+from tracing import traced
+
+MAX_DELTA = 512  # changed rows kept aside before the arrays are rebuilt
+MAX_PARAMS = 500  # ids per `IN (...)` query
+_WORDS = re.compile(r'\w+')
+_ROWS = f"SELECT c.topico, c.id, {COLUNAS_TEXTO} FROM conhecimento c {JUNCAO_BLOBS}"
+
+
+def words(text: str) -> List[str]:
+    """Lowercase, accent-free words, split like the FTS index does"""
+    return _WORDS.findall(normalize_word(text))
+
+
+def _prefixed(vocabulary: List[str], postings: Dict[str, array], term: str) -> Iterator[array]:
+    """Posting lists of every word starting with `term`"""
+    i = bisect.bisect_left(vocabulary, term)
+    while i < len(vocabulary) and vocabulary[i].startswith(term):
+        yield postings[vocabulary[i]]
+        i += 1
+
+
+class KnowledgeReplica:
+    """Read-only in-memory copy of the knowledge base
+
+    Answers the same questions as `listar_topicos_pagina`, `buscar_por_topico`
+    and `buscar_informacao` without going to disk. Rows live in flat arrays
+    sorted by (topic, id): each distinct topic is stored once (interned) and
+    `offsets[i]:offsets[i + 1]` is the slice of rows under topic i. Word
+    posting lists over topics and contents serve prefix searches.
+
+    Before each read, `PRAGMA data_version` on a private connection tells
+    whether anyone else (the pool, another thread or process) committed.
+    If so, only rows with a new id and the ids logged in
+    `conhecimento_alteracoes` are read back; they are kept in a small delta
+    until `max_delta` changes pile up and the arrays are rebuilt in memory.
+    """
+    def __init__(self, max_delta: int = MAX_DELTA):
+        self.max_delta = max_delta
+        self.stats = {'reloads': 0, 'syncs': 0, 'rows_applied': 0, 'compactions': 0}
+        self._lock = threading.Lock()
+        self._conn = criar_conexao()
+        if self._conn is None:
+            raise Error("não foi possível abrir a base de conhecimento")
+        self._version: Optional[int] = None
+        self._last_seq = 0
+        self._max_id = 0
+        self._added: Dict[int, Tuple[str, str]] = {}  # id -> (topic, content)
+        self._removed: Set[int] = set()  # ids whose base row is stale
+        self._live_topics: Optional[List[str]] = None
+        self._build([])
+        with self._lock:
+            self._reload()
+
+    def _build(self, rows: List[Tuple[str, int, str]]) -> None:
+        """Lay out (topic, id, content) rows in the compact arrays"""
+        rows.sort()
+        topics: List[str] = []
+        offsets = array('q')
+        ids = array('q')
+        row_topic = array('l')
+        contents: List[str] = []
+        topic_postings: Dict[str, array] = {}
+        content_postings: Dict[str, array] = {}
+        for topic, id_, content in rows:
+            if not topics or topics[-1] != topic:
+                index = len(topics)
+                topics.append(sys.intern(topic))
+                offsets.append(len(ids))
+                for word in set(words(topic)):
+                    topic_postings.setdefault(word, array('l')).append(index)
+            row = len(ids)
+            ids.append(id_)
+            row_topic.append(len(topics) - 1)
+            contents.append(content)
+            for word in set(words(content)):
+                content_postings.setdefault(word, array('l')).append(row)
+        offsets.append(len(ids))
+
+        self._topics, self._offsets, self._ids = topics, offsets, ids
+        self._row_topic, self._contents = row_topic, contents
+        self._topic_index = {topic: index for index, topic in enumerate(topics)}
+        self._topic_postings, self._topic_vocabulary = topic_postings, sorted(topic_postings)
+        self._content_postings, self._content_vocabulary = (content_postings,
+                                                            sorted(content_postings))
+        self._added.clear()
+        self._removed.clear()
+        self._live_topics = None
+
+    def _read(self, sql: str, params=()) -> List[Tuple[str, int, str]]:
+        return [(topic, id_, texto_completo(*text))
+                for topic, id_, *text in self._conn.execute(sql, params).fetchall()]
+
+    def _reload(self) -> None:
+        """Read every row again and rebuild from scratch"""
+        conn = self._conn
+        self._version = conn.execute("PRAGMA data_version").fetchone()[0]
+        conn.execute("BEGIN")
+        try:
+            self._last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) "
+                                          "FROM conhecimento_alteracoes").fetchone()[0]
+            rows = self._read(_ROWS)
+        finally:
+            conn.rollback()
+        self._max_id = max((id_ for _, id_, _ in rows), default=0)
+        self._build(rows)
+        self.stats['reloads'] += 1
+
+    def _sync(self) -> None:
+        """Apply whatever was committed since the last read (lock held)"""
+        conn = self._conn
+        try:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._version:
+                return
+            self._version = version
+            conn.execute("BEGIN")
+            try:
+                changes = conn.execute("SELECT seq, conhecimento_id FROM conhecimento_alteracoes "
+                                       "WHERE seq > ? ORDER BY seq", (self._last_seq,)).fetchall()
+                if changes and changes[0][0] != self._last_seq + 1:
+                    changes = None  # log trimmed by `podar_alteracoes`; the delta cannot be trusted
+                else:
+                    rows = self._read(f"{_ROWS} WHERE c.id > ?", (self._max_id,))
+                    changed = sorted({id_ for _, id_ in changes if id_ <= self._max_id})
+                    for start in range(0, len(changed), MAX_PARAMS):
+                        chunk = changed[start:start + MAX_PARAMS]
+                        rows += self._read(
+                            f"{_ROWS} WHERE c.id IN ({', '.join('?' * len(chunk))})", chunk)
+            finally:
+                conn.rollback()
+        except Error as e:
+            print(e)
+            self._version = None  # serve what we have and retry on the next read
+            return
+        if changes is None:
+            self._reload()
+            return
+
+        for id_ in changed:
+            self._added.pop(id_, None)
+            self._removed.add(id_)
+        for topic, id_, content in rows:
+            self._added[id_] = (sys.intern(topic), content)
+            self._max_id = max(self._max_id, id_)
+        if changes:
+            self._last_seq = changes[-1][0]
+        self._live_topics = None
+        self.stats['syncs'] += 1
+        self.stats['rows_applied'] += len(rows) + len(changed)
+        if len(self._added) + len(self._removed) > self.max_delta:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Fold the delta into the arrays (no database access)"""
+        rows = [(self._topics[self._row_topic[row]], id_, self._contents[row])
+                for row, id_ in enumerate(self._ids) if id_ not in self._removed]
+        rows.extend((topic, id_, content) for id_, (topic, content) in self._added.items())
+        self._build(rows)
+        self.stats['compactions'] += 1
+
+    def refresh(self) -> None:
+        """Pick up pending changes now instead of on the next read"""
+        with self._lock:
+            self._sync()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return (len(self._ids) + len(self._added)
+                    - sum(1 for id_ in self._ids if id_ in self._removed))
+
+    def _topics_in_use(self) -> List[str]:
+        if not self._added and not self._removed:
+            return self._topics
+        if self._live_topics is None:
+            live = set(self._added_topics())
+            for index, topic in enumerate(self._topics):
+                if any(self._ids[row] not in self._removed
+                       for row in range(self._offsets[index], self._offsets[index + 1])):
+                    live.add(topic)
+            self._live_topics = sorted(live)
+        return self._live_topics
+
+    def _added_topics(self) -> Set[str]:
+        return {topic for topic, _ in self._added.values()}
+
+    def _topics_matching(self, terms: List[str]) -> Set[str]:
+        """Topics with a word starting with each of `terms`"""
+        matching: Optional[Set[int]] = None
+        for term in terms:
+            hits = set()
+            for posting in _prefixed(self._topic_vocabulary, self._topic_postings, term):
+                hits.update(posting)
+            matching = hits if matching is None else matching & hits
+        found = {self._topics[index] for index in matching or ()}
+        for topic in self._added_topics():
+            topic_words = words(topic)
+            if all(any(word.startswith(term) for word in topic_words) for term in terms):
+                found.add(topic)
+        return found
+
+    @traced('replica')
+    def topics_page(self, apos: Optional[str] = None, limite: int = TAMANHO_PAGINA_TOPICOS,
+                    filtro: Optional[str] = None) -> List[str]:
+        """Same contract as `database.listar_topicos_pagina`"""
+        with self._lock:
+            self._sync()
+            topics = self._topics_in_use()
+            start = bisect.bisect_right(topics, apos or '')
+            terms = words(filtro) if filtro else []
+            if not terms:
+                return topics[start:start + limite]
+            matching = self._topics_matching(terms)
+            page = []
+            for topic in topics[start:]:
+                if topic in matching:
+                    page.append(topic)
+                    if len(page) >= limite:
+                        break
+            return page
+
+    @traced('replica')
+    def by_topic(self, topico: str) -> List[Tuple[str, str]]:
+        """Same contract as `database.buscar_por_topico`"""
+        with self._lock:
+            self._sync()
+            entries = []
+            index = self._topic_index.get(topico)
+            if index is not None:
+                topic = self._topics[index]
+                for row in range(self._offsets[index], self._offsets[index + 1]):
+                    if self._ids[row] not in self._removed:
+                        entries.append((self._ids[row], topic, self._contents[row]))
+            extra = [(id_, topic, content) for id_, (topic, content) in self._added.items()
+                     if topic == topico]
+            if extra:
+                entries = sorted(entries + extra)
+            return [(topic, content) for _, topic, content in entries]
+
+    @traced('replica')
+    def search(self, consulta: str, limite: int = 3) -> List[Tuple[str, str]]:
+        """Entries matching every word prefix of `consulta`, best first
+
+        Like `database.buscar_informacao`, a hit in the topic weighs
+        PESO_TOPICO and a hit in the content PESO_INFORMACAO; the order
+        approximates the BM25 ranking of the FTS index.
+        """
+        terms = words(consulta)
+        if not terms:
+            return []
+        with self._lock:
+            self._sync()
+            candidates: Optional[Dict[int, float]] = None
+            for term in terms:
+                scores: Dict[int, float] = {}
+                for posting in _prefixed(self._topic_vocabulary, self._topic_postings, term):
+                    for index in posting:
+                        for row in range(self._offsets[index], self._offsets[index + 1]):
+                            scores[row] = PESO_TOPICO
+                content_rows = set()
+                for posting in _prefixed(self._content_vocabulary, self._content_postings, term):
+                    content_rows.update(posting)
+                for row in content_rows:
+                    scores[row] = scores.get(row, 0.0) + PESO_INFORMACAO
+                if candidates is None:
+                    candidates = scores
+                else:
+                    candidates = {row: score + scores[row] for row, score in candidates.items()
+                                  if row in scores}
+                if not candidates:
+                    break
+            ranked = [(-score, self._ids[row], self._topics[self._row_topic[row]],
+                       self._contents[row])
+                      for row, score in (candidates or {}).items()
+                      if self._ids[row] not in self._removed]
+
+            for id_, (topic, content) in self._added.items():
+                topic_words, content_words = words(topic), words(content)
+                score = 0.0
+                for term in terms:
+                    in_topic = any(word.startswith(term) for word in topic_words)
+                    in_content = any(word.startswith(term) for word in content_words)
+                    if not in_topic and not in_content:
+                        break
+                    score += PESO_TOPICO * in_topic + PESO_INFORMACAO * in_content
+                else:
+                    ranked.append((-score, id_, topic, content))
+
+            return [(topic, content)
+                    for _, _, topic, content in heapq.nsmallest(limite, ranked)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
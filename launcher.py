@@ -0,0 +1,175 @@
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from tracing import get_tracer
+
+REAP_INTERVAL = 0.5  # seconds
+# Grace period before shutdown/restart; Unix `shutdown` only takes whole minutes
+POWER_DELAY_MINUTES = 1
+
+# App name -> platform -> command. A string runs through the shell (needed
+# for shell built-ins such as `start` or pipes); a list is run directly.
+APP_COMMANDS: Dict[str, Dict[str, object]] = {
+    'notepad': {
+        'win32': ['notepad.exe'],
+        'darwin': ['open', '-a', 'TextEdit'],
+        'linux': ['gedit'],
+    },
+    'calculator': {
+        'win32': ['calc.exe'],
+        'darwin': ['open', '-a', 'Calculator'],
+        'linux': ['gnome-calculator'],
+    },
+    'chrome': {
+        'win32': 'start "" chrome',
+        'darwin': ['open', '-a', 'Google Chrome'],
+        'linux': ['google-chrome'],
+    },
+    'clear_memory': {
+        'win32': 'cls && echo off | clip',
+        'darwin': 'pbcopy < /dev/null',
+        'linux': 'xclip -selection clipboard < /dev/null',
+    },
+    'shutdown': {
+        'win32': ['shutdown', '/s', '/t', str(POWER_DELAY_MINUTES * 60)],
+        'darwin': ['shutdown', '-h', f'+{POWER_DELAY_MINUTES}'],
+        'linux': ['shutdown', '-h', f'+{POWER_DELAY_MINUTES}'],
+    },
+    'restart': {
+        'win32': ['shutdown', '/r', '/t', str(POWER_DELAY_MINUTES * 60)],
+        'darwin': ['shutdown', '-r', f'+{POWER_DELAY_MINUTES}'],
+        'linux': ['shutdown', '-r', f'+{POWER_DELAY_MINUTES}'],
+    },
+}
+
+
+def current_platform() -> str:
+    if sys.platform.startswith('win'):
+        return 'win32'
+    if sys.platform == 'darwin':
+        return 'darwin'
+    return 'linux'
+
+
+class LaunchError(Exception):
+    """The app is not registered for this platform or could not be started"""
+
+
+class LaunchedApp:
+    """A started child process and how long `Popen` took to return"""
+    def __init__(self, app: str, process: subprocess.Popen, latency: float):
+        self.app = app
+        self.process = process
+        self.latency = latency
+        self.returncode: Optional[int] = None
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def __repr__(self) -> str:
+        return f"LaunchedApp({self.app!r}, pid={self.pid}, {self.latency * 1e3:.1f} ms)"
+
+
+class AppLauncher:
+    """Starts registered apps without waiting for them to exit
+
+    `launch` returns as soon as the process exists. Children are detached
+    from the console and polled by one reaper thread, which records their
+    exit codes (and calls `on_exit`) so no zombie processes pile up.
+    """
+    def __init__(self, registry: Optional[Dict[str, Dict[str, object]]] = None,
+                 platform: Optional[str] = None, reap_interval: float = REAP_INTERVAL,
+                 on_exit: Optional[Callable[[LaunchedApp], None]] = None):
+        self.registry = registry if registry is not None else APP_COMMANDS
+        self.platform = platform or current_platform()
+        self.reap_interval = reap_interval
+        self.on_exit = on_exit
+        self.stats = {'launched': 0, 'failed': 0, 'reaped': 0}
+        self.latencies: Dict[str, float] = {}  # last launch latency per app
+        self._children: List[LaunchedApp] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def command_for(self, app: str):
+        """The registered command for `app` on this platform"""
+        try:
+            return self.registry[app][self.platform]
+        except KeyError:
+            raise LaunchError(f"'{app}' não está disponível neste sistema") from None
+
+    def launch(self, app: str) -> LaunchedApp:
+        """Start `app` and return immediately; raises LaunchError"""
+        command = self.command_for(app)
+        options = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL,
+                   'stderr': subprocess.DEVNULL, 'shell': isinstance(command, str)}
+        if self.platform == 'win32':
+            options['creationflags'] = (subprocess.CREATE_NEW_PROCESS_GROUP
+                                        | subprocess.CREATE_NO_WINDOW)
+        else:
+            options['start_new_session'] = True
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, **options)
+        except (OSError, ValueError) as e:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise LaunchError(f"Não foi possível iniciar '{app}': {e}") from e
+        latency = time.perf_counter() - start
+        get_tracer().record(f'launch:{app}', start, latency)
+
+        launched = LaunchedApp(app, process, latency)
+        with self._lock:
+            self._children.append(launched)
+            self.stats['launched'] += 1
+            self.latencies[app] = latency
+            if self._reaper is None and not self._stop.is_set():
+                self._reaper = threading.Thread(target=self._reap_loop, name='app-reaper',
+                                                daemon=True)
+                self._reaper.start()
+        return launched
+
+    @property
+    def running(self) -> List[LaunchedApp]:
+        with self._lock:
+            return list(self._children)
+
+    def reap(self) -> List[LaunchedApp]:
+        """Collect children that have exited; returns them"""
+        with self._lock:
+            children = list(self._children)
+        finished = []
+        for child in children:
+            code = child.process.poll()
+            if code is not None:
+                child.returncode = code
+                finished.append(child)
+        if finished:
+            with self._lock:
+                self._children = [child for child in self._children if child not in finished]
+                self.stats['reaped'] += len(finished)
+            if self.on_exit:
+                for child in finished:
+                    self.on_exit(child)
+        return finished
+
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(self.reap_interval):
+            self.reap()
+            with self._lock:
+                if not self._children:
+                    self._reaper = None  # the next launch starts a new one
+                    return
+
+    def close(self) -> None:
+        """Stop reaping; apps that are still open keep running"""
+        self._stop.set()
+        with self._lock:
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            reaper.join(timeout=1)
+        self.reap()
@@ -0,0 +1,84 @@
+import logging
+import queue
+import tkinter as tk
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+MAX_LINES = 5000
+FLUSH_INTERVAL_MS = 100
+MAX_BATCH = 500
+LOG_FILE_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+
+class LogBus:
+    """Thread-safe pipeline from `post()` calls to a Tk text widget
+
+    Any thread may post; messages wait in a queue and are written to the
+    widget in batches by an `after` tick on the Tk main thread. Scrollback
+    is capped at `max_lines`, and an optional rotating file mirrors the log.
+    """
+    def __init__(self, widget: tk.Text, max_lines: int = MAX_LINES,
+                 flush_interval_ms: int = FLUSH_INTERVAL_MS,
+                 log_file: Optional[str] = None):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._after_id: Optional[str] = None
+        self._logger: Optional[logging.Logger] = None
+        if log_file:
+            self._logger = logging.getLogger(f'{__name__}.{id(self)}')
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            handler = RotatingFileHandler(log_file, maxBytes=LOG_FILE_BYTES,
+                                          backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self._logger.addHandler(handler)
+        self._after_id = self.widget.after(self.flush_interval_ms, self._tick)
+
+    def post(self, message: str) -> None:
+        """Queue a message; safe to call from any thread"""
+        self._queue.put(message)
+        if self._logger:
+            self._logger.info(message)
+
+    def _tick(self) -> None:
+        self.flush()
+        self._after_id = self.widget.after(self.flush_interval_ms, self._tick)
+
+    def flush(self) -> None:
+        """Write pending messages to the widget; must run on the Tk main thread"""
+        lines = []
+        while len(lines) < MAX_BATCH:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not lines:
+            return
+        self.widget.config(state='normal')
+        self.widget.insert(tk.END, '\n'.join(lines) + '\n')
+        excess = int(self.widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.widget.delete('1.0', f'{excess + 1}.0')
+        self.widget.see(tk.END)
+        self.widget.config(state='disabled')
+
+    def stop(self) -> None:
+        """Stop the flush tick, write what is left and close the log file"""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+        try:
+            while not self._queue.empty():
+                self.flush()
+        except tk.TclError:
+            pass
+        if self._logger:
+            for handler in list(self._logger.handlers):
+                handler.close()
+                self._logger.removeHandler(handler)
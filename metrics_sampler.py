@@ -0,0 +1,253 @@
+import os
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+SAMPLE_INTERVAL = 0.1  # seconds; 10 Hz, only while someone is subscribed
+PRIME_SECONDS = 0.1  # first CPU reading after the sampler starts is measured over this
+HISTORY_SECONDS = 3600
+METRICS = ('cpu', 'ram', 'disk', 'disk_read', 'disk_write', 'net_sent', 'net_recv')
+
+
+class RingSeries:
+    """Fixed-capacity time series stored in a flat array, oldest values overwritten"""
+    def __init__(self, capacity: int, typecode: str = 'f'):
+        self.capacity = capacity
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._head = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def tail(self, n: Optional[int] = None) -> List[float]:
+        """The last `n` values (all of them by default), oldest first"""
+        n = self.count if n is None else min(n, self.count)
+        start = (self._head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n].tolist()
+        return self._data[start:].tolist() + self._data[:self._head].tolist()
+
+    def last(self) -> Optional[float]:
+        return self._data[self._head - 1] if self.count else None
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """Largest-Triangle-Three-Buckets downsampling to at most `threshold` points
+
+    Keeps the first and last points and, for each bucket in between, the
+    point forming the largest triangle with the previous pick and the
+    average of the next bucket, which preserves peaks and dips.
+    """
+    length = len(xs)
+    if threshold >= length or threshold < 3:
+        return list(xs), list(ys)
+    out_x, out_y = [xs[0]], [ys[0]]
+    bucket = (length - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, length)
+        if end >= next_end:
+            avg_x, avg_y = xs[length - 1], ys[length - 1]
+        else:
+            span = next_end - end
+            avg_x = sum(xs[end:next_end]) / span
+            avg_y = sum(ys[end:next_end]) / span
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+
+class MetricsSampler:
+    """Process-wide background sampler of CPU, RAM, per-core, disk and network usage
+
+    One daemon thread polls psutil while at least one subscriber is
+    registered. Subscriber callbacks run on the sampler thread and receive
+    the latest sample; GUI consumers should only record it and read the
+    series from their own thread. Only that thread samples: psutil's CPU
+    baseline and the previous I/O counters are shared state.
+    """
+    def __init__(self, interval: float = SAMPLE_INTERVAL, history_seconds: int = HISTORY_SECONDS):
+        self.interval = interval
+        capacity = max(2, int(history_seconds / interval))
+        self.core_count = psutil.cpu_count() or 1
+        self.timestamps = RingSeries(capacity, 'd')
+        self.series: Dict[str, RingSeries] = {name: RingSeries(capacity) for name in METRICS}
+        self.cores = [RingSeries(capacity) for _ in range(self.core_count)]
+        self.version = 0  # bumped on every sample
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Callable[[dict], None]] = {}
+        self._next_token = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._previous_io: Optional[tuple] = None
+        self._sampling = threading.Lock()  # a stopping thread may overlap its successor
+        self._disk_path = os.path.abspath(os.sep)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> int:
+        """Register a consumer and start sampling if needed; returns a token"""
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = callback
+            self._ensure_running()
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        """Remove a consumer; sampling stops when nobody is subscribed"""
+        with self._lock:
+            self._subscribers.pop(token, None)
+            if not self._subscribers:
+                self._stop.set()
+
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def _run(self, stop: threading.Event) -> None:
+        with self._sampling:
+            psutil.cpu_percent(percpu=True)  # prime; the first reading is meaningless
+            self._previous_io = None
+        next_tick = time.monotonic() + min(self.interval, PRIME_SECONDS)
+        while not stop.wait(max(0.0, next_tick - time.monotonic())):
+            next_tick += self.interval
+            sample = self._sample()
+            with self._lock:
+                callbacks = list(self._subscribers.values())
+            for callback in callbacks:
+                callback(sample)
+
+    def _sample(self) -> dict:
+        """Take one sample and append it to the history (sampler thread only)"""
+        with self._sampling:
+            now = time.time()
+            per_core = psutil.cpu_percent(percpu=True)
+            disk_io = psutil.disk_io_counters()
+            net_io = psutil.net_io_counters()
+            io = (now,
+                  disk_io.read_bytes if disk_io else 0, disk_io.write_bytes if disk_io else 0,
+                  net_io.bytes_sent, net_io.bytes_recv)
+            rates = [0.0] * 4
+            if self._previous_io is not None:
+                elapsed = max(io[0] - self._previous_io[0], 1e-6)
+                rates = [(io[i] - self._previous_io[i]) / elapsed for i in range(1, 5)]
+            self._previous_io = io
+
+        sample = {
+            'time': now,
+            'cpu': sum(per_core) / len(per_core) if per_core else 0.0,
+            'ram': psutil.virtual_memory().percent,
+            'disk': psutil.disk_usage(self._disk_path).percent,
+            'disk_read': rates[0],
+            'disk_write': rates[1],
+            'net_sent': rates[2],
+            'net_recv': rates[3],
+            'per_core': per_core,
+        }
+        with self._lock:
+            self.timestamps.append(now)
+            for name in METRICS:
+                self.series[name].append(sample[name])
+            for series, value in zip(self.cores, per_core):
+                series.append(value)
+            self.version += 1
+        return sample
+
+    def latest(self, timeout: Optional[float] = None) -> dict:
+        """Most recent values, plus their 'age' in seconds
+
+        When the history is older than two intervals (nobody subscribed, or
+        the sampler fell behind), a one-shot subscription wakes the sampler
+        thread and waits up to `timeout` (default: two intervals after
+        priming) for its next sample; the caller's thread never samples. On
+        timeout the last recorded values are returned with their age.
+        """
+        with self._lock:
+            recorded = self._recorded()
+        if recorded is not None and recorded['age'] <= 2 * self.interval:
+            return recorded
+
+        arrived = threading.Event()
+        received = []
+
+        def once(sample):
+            received.append(sample)
+            arrived.set()
+
+        token = self.subscribe(once)
+        try:
+            arrived.wait(PRIME_SECONDS + 2 * self.interval if timeout is None else timeout)
+        finally:
+            self.unsubscribe(token)
+        if received:
+            return dict(received[0], age=time.time() - received[0]['time'])
+        with self._lock:
+            recorded = self._recorded()
+        if recorded is None:
+            raise TimeoutError("Nenhuma amostra do sistema disponível")
+        return recorded
+
+    def _recorded(self) -> Optional[dict]:
+        """The last sample in the history, with its age (lock held)"""
+        if not self.timestamps.count:
+            return None
+        sample = {name: self.series[name].last() for name in METRICS}
+        sample['time'] = self.timestamps.last()
+        sample['per_core'] = [series.last() for series in self.cores]
+        sample['age'] = time.time() - sample['time']
+        return sample
+
+    def window(self, seconds: float, metrics: Sequence[str] = ('ram', 'cpu'),
+               max_points: Optional[int] = None) -> Dict[str, Tuple[List[float], List[float]]]:
+        """(times, values) per metric for the last `seconds`; times are relative to now
+
+        With `max_points`, each series is reduced with LTTB for plotting.
+        """
+        with self._lock:
+            n = min(self.timestamps.count, int(seconds / self.interval) + 1)
+            times = self.timestamps.tail(n)
+            values = {name: self.series[name].tail(n) for name in metrics}
+        now = time.time()
+        relative = [t - now for t in times]
+        if max_points is None:
+            return {name: (relative, values[name]) for name in metrics}
+        return {name: lttb(relative, values[name], max_points) for name in metrics}
+
+    def stop(self) -> None:
+        """Stop sampling regardless of subscribers (application shutdown)"""
+        with self._lock:
+            self._subscribers.clear()
+            self._stop.set()
+
+
+_sampler: Optional[MetricsSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> MetricsSampler:
+    """The process-wide sampler instance"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler()
+        return _sampler
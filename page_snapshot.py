@@ -0,0 +1,257 @@
+import codecs
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from database import salvar_snapshot
+from search_client import CHUNK_SIZE, CONNECT_TIMEOUT, DEFAULT_HEADERS, READ_TIMEOUT
+
+WORKERS = 4
+PER_HOST = 2
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MAX_TEXT_CHARS = 200_000
+
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template', 'svg', 'nav', 'header',
+                       'footer', 'aside', 'form', 'iframe', 'button', 'select'])
+MAIN_TAGS = frozenset(['article', 'main'])
+BLOCK_TAGS = frozenset(['p', 'div', 'section', 'li', 'br', 'tr', 'h1', 'h2', 'h3', 'h4',
+                        'h5', 'h6', 'blockquote', 'pre', 'article', 'main', 'dd', 'dt'])
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'param', 'source', 'track', 'wbr'])
+_SPACES = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+class _MainTextParser(HTMLParser):
+    """Collects readable text, keeping <article>/<main> content apart
+
+    Text inside navigation, scripts, forms and similar chrome is dropped.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.all_parts: List[str] = []
+        self.main_parts: List[str] = []
+        self._skip_depth = 0
+        self._main_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == 'br':
+                self._add('\n')
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in MAIN_TAGS:
+            self._main_depth += 1
+        if tag in BLOCK_TAGS:
+            self._add('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in MAIN_TAGS:
+            self._main_depth = max(self._main_depth - 1, 0)
+        if tag in BLOCK_TAGS:
+            self._add('\n')
+
+    def handle_data(self, data):
+        self._add(data)
+
+    def _add(self, text: str) -> None:
+        if self._skip_depth:
+            return
+        self.all_parts.append(text)
+        if self._main_depth:
+            self.main_parts.append(text)
+
+
+def _normalize(parts: List[str]) -> str:
+    text = _SPACES.sub(' ', ''.join(parts))
+    lines = (line.strip() for line in text.split('\n'))
+    return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def extract_main_text(chunks, encoding: str = 'utf-8', limit: int = MAX_TEXT_CHARS) -> str:
+    """Readable text of an HTML page given as byte chunks
+
+    Prefers the content of <article>/<main> when the page has a
+    meaningful amount of it; otherwise uses all visible text.
+    """
+    parser = _MainTextParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    main = _normalize(parser.main_parts)
+    text = main if len(main) >= 200 else _normalize(parser.all_parts)
+    return text[:limit]
+
+
+class SnapshotJob:
+    """Outcome of one page capture"""
+    def __init__(self, conhecimento_id: int, url: str):
+        self.conhecimento_id = conhecimento_id
+        self.url = url
+        self.text: Optional[str] = None
+        self.bytes_read = 0
+        self.truncated = False
+        self.error: Optional[Exception] = None
+
+    def __repr__(self) -> str:
+        state = 'erro' if self.error else f"{len(self.text or '')} caracteres"
+        return f"SnapshotJob({self.conhecimento_id}, {self.url!r}, {state})"
+
+
+class _HostQueue:
+    """Captures running for one host and those waiting for a free slot"""
+    __slots__ = ('active', 'pending')
+
+    def __init__(self):
+        self.active = 0
+        self.pending: Deque[Tuple[SnapshotJob, Future]] = deque()
+
+
+class PageSnapshotter:
+    """Fetches saved result pages in the background and stores their text
+
+    `submit` never blocks: pages are downloaded by a pool of `workers`
+    threads, with at most `per_host` requests in flight to any one host.
+    Jobs for a busy host wait in that host's queue rather than in a
+    worker, so other hosts keep the pool busy. Bodies are streamed and cut
+    at `max_bytes`. The extracted text is stored compressed in the
+    `snapshots` table, tied to the knowledge row.
+    """
+    def __init__(self, workers: int = WORKERS, per_host: int = PER_HOST,
+                 max_bytes: int = MAX_PAGE_BYTES,
+                 on_done: Optional[Callable[[SnapshotJob], None]] = None,
+                 store: Callable[[int, str, str], bool] = salvar_snapshot):
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.on_done = on_done
+        self.store = store
+        self.stats = {'submitted': 0, 'stored': 0, 'failed': 0, 'truncated': 0}
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='snapshot')
+        self._hosts: Dict[str, _HostQueue] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+
+    def submit(self, conhecimento_id: int, url: str) -> Future:
+        """Queue a capture of `url` for the knowledge row; returns at once"""
+        job = SnapshotJob(conhecimento_id, url)
+        future: Future = Future()
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PageSnapshotter já foi fechado")
+            self.stats['submitted'] += 1
+            queue = self._hosts.get(host)
+            if queue is None:
+                queue = self._hosts[host] = _HostQueue()
+            if queue.active >= self.per_host:
+                queue.pending.append((job, future))
+                return future
+            queue.active += 1
+        self._dispatch(host, job, future)
+        return future
+
+    def _dispatch(self, host: str, job: SnapshotJob, future: Future) -> None:
+        try:
+            started = self._executor.submit(self._run, host, job, future)
+        except RuntimeError:  # the pool was shut down meanwhile
+            future.cancel()
+            self._release(host)
+            return
+        started.add_done_callback(lambda done: done.cancelled() and future.cancel())
+
+    def _release(self, host: str) -> None:
+        """Hand the host's slot to its next waiting job, or free it"""
+        with self._lock:
+            queue = self._hosts[host]
+            if not queue.pending:
+                queue.active -= 1
+                if not queue.active:
+                    del self._hosts[host]
+                    self._idle.notify_all()
+                return
+            job, future = queue.pending.popleft()
+        self._dispatch(host, job, future)
+
+    def _run(self, host: str, job: SnapshotJob, future: Future) -> None:
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._capture(job))
+                except Exception as e:  # raised by on_done
+                    future.set_exception(e)
+        finally:
+            self._release(host)
+
+    def _capture(self, job: SnapshotJob) -> SnapshotJob:
+        try:
+            job.text = self._fetch_text(job)
+            if not job.text:
+                raise ValueError("página sem texto legível")
+            if not self.store(job.conhecimento_id, job.url, job.text):
+                raise RuntimeError("falha ao gravar o snapshot")
+            with self._lock:
+                self.stats['stored'] += 1
+                self.stats['truncated'] += job.truncated
+        except Exception as e:
+            job.error = e
+            with self._lock:
+                self.stats['failed'] += 1
+        if self.on_done:
+            self.on_done(job)
+        return job
+
+    def _fetch_text(self, job: SnapshotJob) -> str:
+        with self.session.get(job.url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                              stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '').lower()
+            if content_type and 'html' not in content_type and 'text' not in content_type:
+                raise ValueError(f"tipo de conteúdo não suportado: {content_type}")
+            encoding = response.encoding if 'charset' in content_type else 'utf-8'
+            return extract_main_text(self._capped(response, job), encoding)
+
+    def _capped(self, response, job: SnapshotJob):
+        for chunk in response.iter_content(CHUNK_SIZE):
+            remaining = self.max_bytes - job.bytes_read
+            if len(chunk) >= remaining:
+                job.bytes_read += remaining
+                job.truncated = True
+                yield chunk[:remaining]
+                return
+            job.bytes_read += len(chunk)
+            yield chunk
+
+    def close(self, wait: bool = False) -> None:
+        """Stop accepting pages; pending ones are dropped unless `wait`"""
+        dropped = []
+        with self._lock:
+            self._closed = True
+            if wait:
+                while self._hosts:
+                    self._idle.wait()
+            else:
+                for queue in self._hosts.values():
+                    dropped.extend(future for _, future in queue.pending)
+                    queue.pending.clear()
+        for future in dropped:
+            future.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self.session.close()
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import subprocess
+import sys
+import threading
+import wave
+from collections import OrderedDict
+from typing import Dict, Optional
+
+CLIP_DIR = 'frases_cache'
+DISK_BUDGET = 20 * 1024 * 1024  # bytes
+RENDER_AFTER_USES = 2
+MAX_TRACKED_PHRASES = 2000
+CLIP_EXTENSION = '.aiff' if sys.platform == 'darwin' else '.wav'  # what the TTS driver writes
+
+
+def clip_key(text: str, voice: Optional[str], rate: int) -> str:
+    return hashlib.sha1(f"{voice}\x1f{rate}\x1f{text}".encode('utf-8')).hexdigest()
+
+
+class PhraseCache:
+    """Pre-rendered speech clips on disk, keyed by text, voice and rate
+
+    Clips are evicted least recently used first once the directory grows
+    beyond `budget` bytes; file modification times carry the LRU order
+    across restarts. A phrase is worth rendering once it has been spoken
+    `render_after` times (or when it is warmed up explicitly).
+    """
+    def __init__(self, directory: str = CLIP_DIR, budget: int = DISK_BUDGET,
+                 render_after: int = RENDER_AFTER_USES):
+        self.directory = directory
+        self.budget = budget
+        self.render_after = render_after
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clips: 'OrderedDict[str, int]' = OrderedDict()  # key -> size, oldest first
+        self._uses: Dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(CLIP_EXTENSION):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-len(CLIP_EXTENSION)], stat.st_size))
+            elif name.endswith('.tmp'):
+                os.remove(path)  # render interrupted by a previous exit
+        for _, key, size in sorted(entries):
+            self._clips[key] = size
+            self._size += size
+        self._evict()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + CLIP_EXTENSION)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._clips
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Path of the clip for `key`, marking it recently used; None on a miss"""
+        with self._lock:
+            if key not in self._clips:
+                self.misses += 1
+                return None
+            self._clips.move_to_end(key)
+            self.hits += 1
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        return path
+
+    def should_render(self, key: str) -> bool:
+        """Count a use of a phrase with no clip; True once it is frequent enough"""
+        with self._lock:
+            if key in self._clips:
+                return False
+            if len(self._uses) >= MAX_TRACKED_PHRASES:
+                self._uses.clear()
+            uses = self._uses[key] = self._uses.get(key, 0) + 1
+            return uses == self.render_after
+
+    def temporary_path(self, key: str) -> str:
+        """Where the engine should write a clip before `store` adopts it"""
+        return self.path_for(key) + '.tmp'
+
+    def store(self, key: str) -> bool:
+        """Adopt the clip written at `temporary_path(key)`; False if it is unusable"""
+        temporary = self.temporary_path(key)
+        try:
+            size = os.path.getsize(temporary)
+        except OSError:
+            return False
+        if size == 0 or size > self.budget:
+            os.remove(temporary)
+            return False
+        os.replace(temporary, self.path_for(key))
+        with self._lock:
+            if key in self._clips:
+                self._size -= self._clips[key]
+            self._clips[key] = size
+            self._size += size
+            self._uses.pop(key, None)
+            self._evict()
+        return True
+
+    def _forget(self, key: str) -> None:
+        self._size -= self._clips.pop(key, 0)
+
+    def _evict(self) -> None:
+        while self._size > self.budget and self._clips:
+            key, size = self._clips.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._clips):
+                try:
+                    os.remove(self.path_for(key))
+                except OSError:
+                    pass
+            self._clips.clear()
+            self._uses.clear()
+            self._size = 0
+
+
+class ClipPlayer:
+    """Plays a clip file to completion; `stop` cuts it short from any thread
+
+    A stop also cancels the next `play` until `reset` is called, so a stop
+    that lands between choosing a clip and starting it is not lost: call
+    `reset` before deciding what to play, never after.
+    """
+    def __init__(self):
+        self._stop = threading.Event()
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Forget earlier stops (the caller checks its own cancellation next)"""
+        self._stop.clear()
+
+    def play(self, path: str) -> bool:
+        """Block until the clip ends; False if it was stopped or could not play"""
+        if sys.platform.startswith('win'):
+            return self._play_winsound(path)
+        command = ['afplay', path] if sys.platform == 'darwin' else ['aplay', '-q', path]
+        with self._lock:
+            if self._stop.is_set():
+                return False
+            try:
+                self._process = subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                                                 stderr=subprocess.DEVNULL)
+            except OSError:
+                return False
+        try:
+            return self._process.wait() == 0 and not self._stop.is_set()
+        finally:
+            with self._lock:
+                self._process = None
+
+    def _play_winsound(self, path: str) -> bool:
+        import winsound
+        with wave.open(path, 'rb') as clip:
+            duration = clip.getnframes() / clip.getframerate()
+        if self._stop.is_set():
+            return False
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC
+                           | winsound.SND_NODEFAULT)
+        if self._stop.wait(duration):
+            winsound.PlaySound(None, 0)
+            return False
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            if self._process is not None:
+                self._process.terminate()
@@ -0,0 +1,252 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+RESULT_CLASS = 'tF2Cxc'
+SNIPPET_CLASSES = frozenset(['IsZvec', 'VwiC3b'])
+SNIPPET_LENGTH = 250
+MAX_RESULTS = 5
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+
+def _make_result(title: str, link: str, snippet: Optional[str]) -> dict:
+    snippet = snippet.strip() if snippet else ''
+    return {
+        'title': title.strip(),
+        'link': link,
+        'snippet': snippet[:SNIPPET_LENGTH] + '...' if snippet else ''
+    }
+
+
+class ResultExtractor:
+    """Base class for result page extractors
+
+    `extract` takes the body as an iterable of byte chunks (for example
+    `response.iter_content()`) and stops consuming it as soon as `limit`
+    distinct results were found, returning them in page order. When given,
+    `on_result` is called with each result as soon as it is parsed.
+    """
+    name = 'base'
+
+    def extract(self, chunks: Iterable[bytes], encoding: str = 'utf-8',
+                limit: int = MAX_RESULTS,
+                on_result: Optional[Callable[[dict], None]] = None) -> List[dict]:
+        raise NotImplementedError
+
+    def extract_html(self, html: Union[str, bytes], limit: int = MAX_RESULTS) -> List[dict]:
+        """Convenience wrapper for a body that is already in memory"""
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return self.extract([html], 'utf-8', limit)
+
+
+class _ResultParser(HTMLParser):
+    """Event-driven state machine over html.parser callbacks
+
+    Open elements are kept on a stack of tag names. An end tag pops down to
+    the nearest open element with the same name, closing whatever was left
+    open inside it (`<p>`, `<li>`...); an end tag with no open match is
+    ignored. The result, title and snippet are tracked by their stack level.
+    """
+    def __init__(self, limit: int, on_result: Optional[Callable[[dict], None]] = None):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.on_result = on_result
+        self.results: List[dict] = []
+        self.seen_links = set()
+        self.done = False
+        self._open: List[str] = []
+        self._result_level: Optional[int] = None
+        self._title_level: Optional[int] = None
+        self._snippet_level: Optional[int] = None
+        self._reset_result()
+
+    def _reset_result(self) -> None:
+        self._link: Optional[str] = None
+        self._title_parts: List[str] = []
+        self._snippet_parts: Optional[List[str]] = None
+        self._has_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done or tag in VOID_TAGS:
+            return
+        level = len(self._open)
+        self._open.append(tag)
+        classes = ()
+        for key, value in attrs:
+            if key == 'class' and value:
+                classes = value.split()
+                break
+        if self._result_level is None:
+            if RESULT_CLASS in classes:
+                self._result_level = level
+                self._reset_result()
+            return
+        if tag == 'a' and self._link is None:
+            self._link = dict(attrs).get('href')
+        elif tag == 'h3' and not self._has_title:
+            self._title_level = level
+            self._has_title = True
+        elif self._snippet_parts is None and SNIPPET_CLASSES.intersection(classes):
+            self._snippet_level = level
+            self._snippet_parts = []
+
+    def handle_endtag(self, tag):
+        if self.done or tag in VOID_TAGS:
+            return
+        open_tags = self._open
+        for level in range(len(open_tags) - 1, -1, -1):
+            if open_tags[level] == tag:
+                break
+        else:
+            return  # stray end tag
+        del open_tags[level:]
+        if self._title_level is not None and self._title_level >= level:
+            self._title_level = None
+        if self._snippet_level is not None and self._snippet_level >= level:
+            self._snippet_level = None
+        if self._result_level is not None and self._result_level >= level:
+            self._result_level = None
+            self._finish_result()
+
+    def handle_data(self, data):
+        if self._title_level is not None:
+            self._title_parts.append(data)
+        if self._snippet_level is not None:
+            self._snippet_parts.append(data)
+
+    def _finish_result(self) -> None:
+        link = self._link
+        if not self._has_title or not link or link in self.seen_links:
+            return
+        self.seen_links.add(link)
+        snippet = ''.join(self._snippet_parts) if self._snippet_parts is not None else None
+        result = _make_result(''.join(self._title_parts), link, snippet)
+        self.results.append(result)
+        if self.on_result:
+            self.on_result(result)
+        if len(self.results) >= self.limit:
+            self.done = True
+
+
+class StreamingHTMLExtractor(ResultExtractor):
+    """Pure-Python incremental extractor built on html.parser"""
+    name = 'html.parser'
+
+    def extract(self, chunks, encoding='utf-8', limit=MAX_RESULTS, on_result=None):
+        parser = _ResultParser(limit, on_result)
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        for chunk in chunks:
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                return parser.results
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+        return parser.results
+
+
+class LxmlExtractor(ResultExtractor):
+    """Incremental extractor on lxml's C pull parser; feeds raw bytes"""
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+
+    def extract(self, chunks, encoding='utf-8', limit=MAX_RESULTS, on_result=None):
+        parser = self._etree.HTMLPullParser(events=('end',), encoding=encoding)
+        results: List[dict] = []
+        seen_links = set()
+        for chunk in chunks:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                classes = element.get('class')
+                if not classes or RESULT_CLASS not in classes.split():
+                    continue
+                result = self._collect(element, seen_links)
+                element.clear()
+                if result is None:
+                    continue
+                results.append(result)
+                if on_result:
+                    on_result(result)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    @staticmethod
+    def _collect(element, seen_links: set) -> Optional[dict]:
+        title = element.find('.//h3')
+        anchor = element.find('.//a')
+        link = anchor.get('href') if anchor is not None else None
+        if title is None or not link or link in seen_links:
+            return None
+        seen_links.add(link)
+        snippet = None
+        for candidate in element.iter():
+            classes = candidate.get('class')
+            if classes and SNIPPET_CLASSES.intersection(classes.split()):
+                snippet = candidate.text_content()
+                break
+        return _make_result(title.text_content(), link, snippet)
+
+
+class SoupExtractor(ResultExtractor):
+    """Original BeautifulSoup implementation: parses the whole page first"""
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def extract(self, chunks, encoding='utf-8', limit=MAX_RESULTS, on_result=None):
+        soup = self._soup(b''.join(chunks).decode(encoding, errors='replace'), 'html.parser')
+        results: List[dict] = []
+        seen_links = set()
+        for result in soup.select(f'.{RESULT_CLASS}'):
+            title = result.select_one('h3')
+            link = result.a.get('href') if result.a else None
+            if not title or not link or link in seen_links:
+                continue
+            seen_links.add(link)
+            snippet = result.select_one(', '.join(f'.{c}' for c in sorted(SNIPPET_CLASSES)))
+            result = _make_result(title.text, link, snippet.text if snippet else None)
+            results.append(result)
+            if on_result:
+                on_result(result)
+            if len(results) >= limit:
+                break
+        return results
+
+
+EXTRACTORS: Dict[str, Callable[[], ResultExtractor]] = {
+    LxmlExtractor.name: LxmlExtractor,
+    StreamingHTMLExtractor.name: StreamingHTMLExtractor,
+    SoupExtractor.name: SoupExtractor,
+}
+PREFERRED_ORDER = (LxmlExtractor.name, StreamingHTMLExtractor.name)
+
+
+def available_extractors() -> List[str]:
+    """Names of the extractors whose backend can be imported"""
+    names = []
+    for name, factory in EXTRACTORS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_extractor(name: Optional[str] = None) -> ResultExtractor:
+    """Build the named extractor, or the fastest available one"""
+    if name is not None:
+        return EXTRACTORS[name]()
+    for candidate in PREFERRED_ORDER:
+        try:
+            return EXTRACTORS[candidate]()
+        except ImportError:
+            continue
+    return StreamingHTMLExtractor()
@@ -0,0 +1,166 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Optional
+
+ROW_HEIGHT = 150
+ROW_PADDING = 10
+SPARE_ROWS = 2
+WRAP_LENGTH = 700
+
+
+class _ResultRow:
+    """One recyclable result widget, rebound to whichever result is visible"""
+    def __init__(self, canvas: tk.Canvas, on_open: Callable[[int], None],
+                 on_select: Callable[[int], None]):
+        self.index: Optional[int] = None
+        self.frame = ttk.LabelFrame(canvas, text="")
+        self.frame.pack_propagate(False)
+
+        # Title with clickable link
+        title_frame = ttk.Frame(self.frame)
+        title_frame.pack(fill="x", pady=(0, 5))
+        self.title = ttk.Label(title_frame, font=('Arial', 10, 'bold'))
+        self.title.pack(side="left")
+        ttk.Button(title_frame, text="Abrir Link",
+                   command=lambda: on_open(self.index)).pack(side="right", padx=5)
+
+        # Snippet text
+        self.snippet = ttk.Label(self.frame, wraplength=WRAP_LENGTH)
+        self.snippet.pack(anchor='w')
+
+        # Select button
+        ttk.Button(self.frame, text="Selecionar para Salvar",
+                   command=lambda: on_select(self.index)).pack(pady=5)
+
+        self.item = canvas.create_window(0, -ROW_HEIGHT, window=self.frame, anchor="nw",
+                                         height=ROW_HEIGHT - ROW_PADDING, state='hidden')
+
+    def bind(self, index: int, result: dict) -> None:
+        if self.index == index:
+            return
+        self.index = index
+        self.frame.configure(text=f"Resultado {index + 1}")
+        self.title.configure(text=result['title'])
+        self.snippet.configure(text=result['snippet'])
+
+
+class ResultsView:
+    """Single, reusable search results window with virtualized rows
+
+    Only enough row widgets to fill the viewport are ever created; while
+    scrolling they are repositioned and rebound to the visible results.
+    Results can be appended one by one as they arrive. Closing the window
+    only hides it. All methods must run on the Tk main thread.
+    """
+    def __init__(self, master: tk.Misc, on_select: Callable[[dict], None],
+                 on_open: Optional[Callable[[str], None]] = None):
+        self.master = master
+        self.on_select = on_select
+        self.on_open = on_open or self._open_link
+        self.results: List[dict] = []
+        self.window: Optional[tk.Toplevel] = None
+        self._rows: List[_ResultRow] = []
+
+    def _build(self) -> None:
+        self.window = tk.Toplevel(self.master)
+        self.window.title("Resultados da Pesquisa")
+        self.window.geometry("800x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+
+        container = ttk.Frame(self.window)
+        self.canvas = tk.Canvas(container, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        container.pack(fill="both", expand=True)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        # Bound on the toplevel so the wheel also works over the row widgets
+        self.window.bind("<MouseWheel>", self._on_wheel)
+        self.window.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.window.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self.canvas.configure(yscrollincrement=ROW_HEIGHT // 3)
+
+    def _ensure_window(self) -> None:
+        if self.window is None or not self.window.winfo_exists():
+            self._rows = []
+            self._build()
+        if self.window.state() == 'withdrawn':
+            self.window.deiconify()
+        self.window.lift()
+
+    def begin(self, title: Optional[str] = None) -> None:
+        """Clear the view for a new search"""
+        self._ensure_window()
+        if title:
+            self.window.title(f"Resultados da Pesquisa - {title}")
+        self.results = []
+        for row in self._rows:
+            row.index = None  # force a rebind, indices now refer to new results
+        self.canvas.yview_moveto(0)
+        self._update_scrollregion()
+        self._render()
+
+    def append(self, result: dict) -> None:
+        """Add one result as it arrives from the extractor"""
+        self._ensure_window()
+        self.results.append(result)
+        self._update_scrollregion()
+        self._render()
+
+    def show(self, results: List[dict], title: Optional[str] = None) -> None:
+        """Replace the contents with a complete result list"""
+        self.begin(title)
+        self.results = list(results)
+        self._update_scrollregion()
+        self._render()
+
+    def _update_scrollregion(self) -> None:
+        width = max(self.canvas.winfo_width(), 1)
+        self.canvas.configure(scrollregion=(0, 0, width, len(self.results) * ROW_HEIGHT))
+
+    def _visible_range(self):
+        height = max(self.canvas.winfo_height(), ROW_HEIGHT)
+        top = max(int(self.canvas.canvasy(0)) // ROW_HEIGHT, 0)
+        count = height // ROW_HEIGHT + SPARE_ROWS
+        return top, min(top + count, len(self.results)), count
+
+    def _render(self) -> None:
+        top, bottom, needed = self._visible_range()
+        while len(self._rows) < needed:
+            self._rows.append(_ResultRow(self.canvas, self._open_index, self._select_index))
+        width = max(self.canvas.winfo_width() - 2 * ROW_PADDING, 1)
+        for slot, row in enumerate(self._rows):
+            index = top + slot
+            if index < bottom:
+                row.bind(index, self.results[index])
+                self.canvas.coords(row.item, ROW_PADDING, index * ROW_HEIGHT)
+                self.canvas.itemconfigure(row.item, width=width, state='normal')
+            else:
+                row.index = None
+                self.canvas.itemconfigure(row.item, state='hidden')
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        self._render()
+
+    def _on_resize(self, event) -> None:
+        self._update_scrollregion()
+        self._render()
+
+    def _on_wheel(self, event) -> None:
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def _open_index(self, index: Optional[int]) -> None:
+        if index is not None:
+            self.on_open(self.results[index]['link'])
+
+    def _select_index(self, index: Optional[int]) -> None:
+        if index is not None:
+            self.on_select(self.results[index])
+
+    @staticmethod
+    def _open_link(url: str) -> None:
+        import webbrowser
+        webbrowser.open(url)
@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from sqlite3 import Error
+from typing import Dict, List, Optional
+
+from database import conexao
+from dispatcher import normalize_word
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+TOUCH_BATCH = 64  # memory hits whose disk access time is written in one go
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lowercase, no accents, single spaces"""
+    return ' '.join(normalize_word(query).split())
+
+
+class SearchCache:
+    """Bounded TTL cache for search results
+
+    An in-memory LRU sits in front of a SQLite table, so results survive
+    restarts. Entries expire after `ttl` seconds; the disk store keeps at
+    most `max_entries` rows, dropping the least recently used ones. Memory
+    hits refresh the disk access time too, batched: it is written every
+    TOUCH_BATCH hits and always before the disk store is trimmed.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}  # key -> last memory hit not yet on disk
+        self.hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.expirations = 0
+        self._create_table()
+
+    def _create_table(self) -> None:
+        try:
+            with conexao() as conn:
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    chave TEXT PRIMARY KEY,
+                    resultados TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_acessado "
+                             "ON search_cache (acessado_em)")
+        except Error as e:
+            print(e)
+
+    def _remember(self, key: str, created: float, results: List[dict]) -> None:
+        """Insert into the memory LRU, evicting the oldest entry if full"""
+        self._memory[key] = (created, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def get(self, query: str) -> Optional[List[dict]]:
+        """Return cached results for the query, or None on a miss"""
+        key = normalize_query(query)
+        now = time.time()
+        touched = None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self._touched[key] = now
+                    if len(self._touched) >= TOUCH_BATCH:
+                        touched, self._touched = self._touched, {}
+                else:
+                    del self._memory[key]
+                    entry = None
+        if entry is not None:
+            if touched:
+                try:
+                    with conexao() as conn:
+                        self._write_touches(conn, touched)
+                except Error as e:
+                    print(e)
+            return entry[1]
+
+        row = None
+        try:
+            with conexao() as conn:
+                row = conn.execute("SELECT resultados, criado_em FROM search_cache WHERE chave = ?",
+                                   (key,)).fetchone()
+                if row is not None:
+                    if now - row[1] > self.ttl:
+                        conn.execute("DELETE FROM search_cache WHERE chave = ?", (key,))
+                        row = None
+                        with self._lock:
+                            self.expirations += 1
+                    else:
+                        conn.execute("UPDATE search_cache SET acessado_em = ? WHERE chave = ?",
+                                     (now, key))
+        except Error as e:
+            print(e)
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            results = json.loads(row[0])
+            self._remember(key, row[1], results)
+            self.hits += 1
+            return results
+
+    @staticmethod
+    def _write_touches(conn, touched: Dict[str, float]) -> None:
+        conn.executemany("UPDATE search_cache SET acessado_em = MAX(acessado_em, ?) "
+                         "WHERE chave = ?", [(at, key) for key, at in touched.items()])
+
+    def put(self, query: str, results: List[dict]) -> None:
+        """Store results in memory and on disk, trimming the disk store"""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, results)
+            touched, self._touched = self._touched, {}
+        try:
+            with conexao() as conn:
+                # Entries hot in memory must not look idle to the trim below
+                self._write_touches(conn, touched)
+                conn.execute("INSERT OR REPLACE INTO search_cache "
+                             "(chave, resultados, criado_em, acessado_em) VALUES (?, ?, ?, ?)",
+                             (key, json.dumps(results, ensure_ascii=False), now, now))
+                cursor = conn.execute("""
+                    DELETE FROM search_cache WHERE chave IN (
+                        SELECT chave FROM search_cache
+                        ORDER BY acessado_em DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+                if cursor.rowcount > 0:
+                    with self._lock:
+                        self.disk_evictions += cursor.rowcount
+        except Error as e:
+            print(e)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries from both tiers; returns how many rows were removed"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for key in [k for k, (created, _) in self._memory.items() if created < cutoff]:
+                del self._memory[key]
+        try:
+            with conexao() as conn:
+                removed = conn.execute("DELETE FROM search_cache WHERE criado_em < ?",
+                                       (cutoff,)).rowcount
+        except Error as e:
+            print(e)
+            return 0
+        with self._lock:
+            self.expirations += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        try:
+            with conexao() as conn:
+                conn.execute("DELETE FROM search_cache")
+        except Error as e:
+            print(e)
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_evictions': self.memory_evictions,
+                'disk_evictions': self.disk_evictions,
+                'expirations': self.expirations,
+                'memory_entries': len(self._memory),
+            }
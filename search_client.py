@@ -0,0 +1,103 @@
+from typing import Callable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from result_extractor import MAX_RESULTS, ResultExtractor, get_extractor
+from tracing import traced
+
+DEFAULT_BASE_URL = 'https://www.google.com'
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0',
+    'Accept-Language': 'pt-BR,pt;q=0.9'
+}
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3
+CHUNK_SIZE = 16 * 1024
+# After an early stop, drain at most this much so the connection stays pooled
+MAX_DRAIN_BYTES = 256 * 1024
+
+
+class SearchClient:
+    """Web search over a shared keep-alive session
+
+    There is no connectivity probe: a network failure surfaces as
+    `requests.ConnectionError` from the search request itself. Idempotent
+    GETs are retried a bounded number of times with exponential backoff.
+    """
+    def __init__(self, base_url: str = DEFAULT_BASE_URL,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT,
+                 retries: int = MAX_RETRIES,
+                 backoff_factor: float = BACKOFF_FACTOR,
+                 pool_size: int = 4,
+                 extractor: Optional[ResultExtractor] = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.extractor = extractor or get_extractor()
+
+    def fetch(self, query: str, stream: bool = False) -> requests.Response:
+        """Issue the search request and return the raw response"""
+        response = self.session.get(f"{self.base_url}/search", params={'q': query},
+                                    timeout=self.timeout, stream=stream)
+        response.raise_for_status()
+        return response
+
+    @traced('network')
+    def search(self, query: str, limit: int = MAX_RESULTS,
+               on_result: Optional[Callable[[dict], None]] = None) -> List[dict]:
+        """Fetch results for the query, parsing the body as it streams in
+
+        `on_result` receives each result as soon as it is parsed.
+        """
+        with self.fetch(query, stream=True) as response:
+            chunks = response.iter_content(CHUNK_SIZE)
+            results = self.extractor.extract(chunks, self._encoding(response), limit, on_result)
+            self._drain(response)
+        return results
+
+    @staticmethod
+    def _encoding(response: requests.Response) -> str:
+        # requests falls back to ISO-8859-1 for text/* without a charset
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.encoding
+        return 'utf-8'
+
+    @staticmethod
+    def _drain(response: requests.Response) -> None:
+        """Read the unparsed remainder so the connection can be reused
+
+        Reads `response.raw` directly, so chunked bodies (no Content-Length)
+        are drained too. If more than MAX_DRAIN_BYTES are left, the
+        connection is closed instead: a new one is cheaper than the read.
+        """
+        raw = response.raw
+        drained = 0
+        while drained <= MAX_DRAIN_BYTES:
+            data = raw.read(CHUNK_SIZE, decode_content=True)  # as iter_content reads it
+            if not data:
+                return
+            drained += len(data)
+        raw.close()
+
+    def close(self) -> None:
+        self.session.close()
+
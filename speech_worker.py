@@ -0,0 +1,244 @@
+import itertools
+import queue
+import re
+import threading
+from typing import Callable, Iterable, List, Optional
+
+from phrase_cache import ClipPlayer, PhraseCache, clip_key
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+_PRIORITY_RENDER = 10  # pre-rendering only runs when nothing is waiting to be said
+_PRIORITY_STOP = -1
+
+DEFAULT_RATE = 170
+_SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences so long answers can be interrupted between them"""
+    return [part for part in _SENTENCE_END.split(text.strip()) if part]
+
+
+def _default_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+class NullEngine:
+    """pyttsx3-compatible engine that speaks nothing (headless runs, benchmarks)"""
+    def setProperty(self, name, value) -> None:
+        pass
+
+    def connect(self, topic, callback) -> None:
+        pass
+
+    def say(self, text) -> None:
+        pass
+
+    def runAndWait(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class SpeechRequest:
+    """Handle for a queued utterance; `wait()` blocks until it is spoken or cancelled"""
+    def __init__(self, text: str, generation: int,
+                 on_done: Optional[Callable[['SpeechRequest'], None]]):
+        self.text = text
+        self.generation = generation
+        self.on_done = on_done
+        self.completed = False
+        self.done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def _finish(self, completed: bool) -> None:
+        if self.done.is_set():
+            return
+        self.completed = completed
+        self.done.set()
+        if self.on_done:
+            self.on_done(self)
+
+
+class SpeechWorker:
+    """Text-to-speech on a dedicated thread fed by a priority queue
+
+    `say` returns immediately. The TTS engine is created and driven only
+    by the worker thread. `cancel` drops everything queued and stops the
+    sentence being spoken at the next word boundary.
+
+    With a `phrase_cache_factory`, the worker thread builds a PhraseCache
+    (it touches the disk, so not during startup) and sentences that have a
+    pre-rendered clip are played from disk instead of synthesized; frequent
+    sentences, and those passed to `prerender`, are rendered with the
+    engine's file output while the worker is otherwise idle.
+    """
+    def __init__(self, engine_factory: Optional[Callable] = None, rate: int = DEFAULT_RATE,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 phrase_cache_factory: Optional[Callable[[], PhraseCache]] = None):
+        self._engine_factory = engine_factory or _default_engine
+        self.rate = rate
+        self.on_error = on_error
+        self._phrase_cache_factory = phrase_cache_factory
+        self.phrase_cache: Optional[PhraseCache] = None  # built by the worker thread
+        self._player = ClipPlayer()
+        self._voice: Optional[str] = None
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._current: Optional[SpeechRequest] = None
+        self._engine = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='speech-worker', daemon=True)
+        self._thread.start()
+
+    def say(self, text: str, priority: int = PRIORITY_NORMAL, interrupt: bool = False,
+            on_done: Optional[Callable[[SpeechRequest], None]] = None) -> SpeechRequest:
+        """Queue text for speaking; with `interrupt`, cancel everything pending first"""
+        if interrupt:
+            self.cancel()
+        with self._lock:
+            request = SpeechRequest(text, self._generation, on_done)
+            chunks = split_sentences(text)
+            if not chunks:
+                request._finish(True)
+                return request
+            for index, chunk in enumerate(chunks):
+                last = index == len(chunks) - 1
+                self._queue.put((priority, next(self._sequence), chunk, last, request))
+        return request
+
+    def prerender(self, texts: Iterable[str]) -> None:
+        """Queue clips for these phrases, rendered when the worker is idle"""
+        if self._phrase_cache_factory is None:
+            return
+        for text in texts:
+            for chunk in split_sentences(text):
+                self._queue.put((_PRIORITY_RENDER, next(self._sequence), chunk, True, None))
+
+    def cancel(self) -> None:
+        """Drop queued speech and interrupt the current sentence"""
+        dropped = []
+        kept = []
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[0] == _PRIORITY_STOP:
+                    kept.append(item)
+                    break
+                if item[4] is None:
+                    kept.append(item)  # pre-rendering is not speech
+                else:
+                    dropped.append(item[4])
+            for item in kept:
+                self._queue.put(item)
+        self._player.stop()
+        for request in dropped:
+            request._finish(False)
+
+    def is_speaking(self) -> bool:
+        return self._current is not None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the engine has been initialized on the worker thread"""
+        return self._ready.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Cancel pending speech and end the worker thread"""
+        self.cancel()
+        self._queue.put((_PRIORITY_STOP, next(self._sequence), None, True, None))
+        self._thread.join(timeout)
+
+    def _stale(self, request: SpeechRequest) -> bool:
+        return request.generation != self._generation
+
+    def _on_word(self, name, location, length) -> None:
+        current = self._current
+        if current is not None and self._stale(current):
+            self._engine.stop()
+
+    def _run(self) -> None:
+        try:
+            self._engine = self._engine_factory()
+            self._engine.setProperty('rate', self.rate)
+            self._engine.connect('started-word', self._on_word)
+            # Engines without file output cannot render clips
+            if self._phrase_cache_factory is not None and hasattr(self._engine, 'save_to_file'):
+                self._voice = self._engine.getProperty('voice')
+                self.phrase_cache = self._phrase_cache_factory()
+        except Exception as e:
+            self._report(e)
+        finally:
+            self._ready.set()
+
+        while True:
+            priority, _, chunk, last, request = self._queue.get()
+            if priority == _PRIORITY_STOP:
+                break
+            if request is None:
+                self._render(chunk)
+                continue
+            # Before the stale check: a cancel from here on stops the clip
+            self._player.reset()
+            if self._stale(request) or self._engine is None:
+                request._finish(False)
+                continue
+            self._current = request
+            try:
+                if not self._play_cached(chunk) and not self._stale(request):
+                    self._engine.say(chunk)
+                    self._engine.runAndWait()
+            except Exception as e:
+                self._report(e)
+                request._finish(False)
+            finally:
+                self._current = None
+            if self._stale(request):
+                request._finish(False)
+            elif last:
+                request._finish(True)
+
+    def _key(self, chunk: str) -> str:
+        return clip_key(chunk, self._voice, self.rate)
+
+    def _play_cached(self, chunk: str) -> bool:
+        """Play the clip for `chunk` if there is one; False means synthesize it"""
+        if self.phrase_cache is None:
+            return False
+        key = self._key(chunk)
+        path = self.phrase_cache.lookup(key)
+        if path is None:
+            if self.phrase_cache.should_render(key):
+                self._queue.put((_PRIORITY_RENDER, next(self._sequence), chunk, True, None))
+            return False
+        return self._player.play(path)
+
+    def _render(self, chunk: str) -> None:
+        if self.phrase_cache is None or self._engine is None:
+            return
+        key = self._key(chunk)
+        if key in self.phrase_cache:
+            return
+        try:
+            self._engine.save_to_file(chunk, self.phrase_cache.temporary_path(key))
+            self._engine.runAndWait()
+            self.phrase_cache.store(key)
+        except Exception as e:
+            self._report(e)
+
+    def _report(self, error: Exception) -> None:
+        if self.on_error:
+            self.on_error(error)
+        else:
+            print(error)
@@ -0,0 +1,84 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """Collects how long each import/initialization step took
+
+    Disabled profilers still run the measured code but record nothing.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.records: List[Tuple[str, float, float, str]] = []  # name, start, seconds, thread
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.records.append((name, start - PROCESS_START, elapsed,
+                                     threading.current_thread().name))
+
+    def mark(self, name: str) -> None:
+        """Record a point in time (e.g. first paint) relative to process start"""
+        if self.enabled:
+            with self._lock:
+                self.records.append((name, time.perf_counter() - PROCESS_START, 0.0,
+                                     threading.current_thread().name))
+
+    def report(self) -> str:
+        with self._lock:
+            records = sorted(self.records, key=lambda record: record[1])
+        lines = [f"{'etapa':<34} {'início (ms)':>12} {'duração (ms)':>13}  thread"]
+        for name, start, elapsed, thread in records:
+            lines.append(f"{name:<34} {start * 1e3:>12.1f} {elapsed * 1e3:>13.1f}  {thread}")
+        return '\n'.join(lines)
+
+
+class Lazy(Generic[T]):
+    """A subsystem built on first use; thread-safe and timed by the profiler"""
+    def __init__(self, name: str, factory: Callable[[], T],
+                 profiler: Optional[StartupProfiler] = None):
+        self.name = name
+        self._factory = factory
+        self._profiler = profiler or StartupProfiler()
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> T:
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                with self._profiler.measure(self.name):
+                    self._value = self._factory()
+                self._ready = True
+        return self._value
+
+    def peek(self) -> Optional[T]:
+        """The value if it was already built, without building it"""
+        return self._value if self._ready else None
+
+
+def lazy_module(name: str, profiler: Optional[StartupProfiler] = None) -> Lazy:
+    """Lazy import of a module, reported as 'import <name>'"""
+    return Lazy(f'import {name}', lambda: importlib.import_module(name), profiler)
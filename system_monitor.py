@@ -0,0 +1,139 @@
+import time
+import tkinter as tk
+from collections import deque
+from typing import Deque, List, Optional
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from metrics_sampler import MetricsSampler, get_sampler
+
+WINDOW_SECONDS = 60  # 600 samples at 10 Hz, reduced to MAX_PLOT_POINTS by LTTB
+MAX_PLOT_POINTS = 300
+RENDER_INTERVAL_MS = 100
+FRAME_STATS = 120
+
+
+class MonitorPlot:
+    """RAM/CPU figure with preallocated artists, redrawn by blitting
+
+    Axes, titles and ticks are drawn once into a cached background; each
+    frame restores it and redraws only the two lines and value labels.
+    Works with any Agg-based canvas, so it can be timed without Tk.
+    """
+    def __init__(self, window_seconds: float = WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.fig = Figure(figsize=(5, 4), dpi=100)
+        self.ax_ram = self.fig.add_subplot(211)
+        self.ax_cpu = self.fig.add_subplot(212)
+        self.ram_line, self.ram_label = self._setup_axes(self.ax_ram, 'r-', 'Uso de RAM')
+        self.cpu_line, self.cpu_label = self._setup_axes(self.ax_cpu, 'b-', 'Uso de CPU')
+        self.fig.tight_layout()
+        self.canvas = None
+        self._background = None
+
+    def _setup_axes(self, ax, style, title):
+        """Configure static parts of an axes and create its animated artists"""
+        ax.set_title(title)
+        ax.set_ylim(0, 100)
+        ax.set_xlim(-self.window_seconds, 0)
+        line, = ax.plot([], [], style, animated=True)
+        label = ax.text(0.01, 0.85, '', transform=ax.transAxes, animated=True)
+        return line, label
+
+    def attach(self, canvas) -> None:
+        """Bind to a canvas and recapture the background on every full draw"""
+        self.canvas = canvas
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event) -> None:
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self) -> None:
+        for ax, line, label in ((self.ax_ram, self.ram_line, self.ram_label),
+                                (self.ax_cpu, self.cpu_line, self.cpu_label)):
+            ax.draw_artist(line)
+            ax.draw_artist(label)
+
+    def update(self, ram_times: List[float], ram: List[float],
+               cpu_times: List[float], cpu: List[float]) -> None:
+        """Replace the plotted series; times are seconds relative to now"""
+        self.ram_line.set_data(ram_times, ram)
+        self.cpu_line.set_data(cpu_times, cpu)
+        self.ram_label.set_text(f'{ram[-1]:.1f}%' if ram else '')
+        self.cpu_label.set_text(f'{cpu[-1]:.1f}%' if cpu else '')
+
+    def render(self) -> None:
+        """Blit the changed artists over the cached background"""
+        if self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+
+class SystemMonitor:
+    """Handles system monitoring and visualization
+
+    Data comes from the shared MetricsSampler; this window only subscribes
+    and redraws on the Tk main thread via `after` when a new sample is
+    available, so no widget is touched from a background thread. Windows
+    longer than MAX_PLOT_POINTS samples are downsampled with LTTB.
+    """
+    def __init__(self, parent: tk.Toplevel, sampler: Optional[MetricsSampler] = None,
+                 window_seconds: float = WINDOW_SECONDS,
+                 interval_ms: int = RENDER_INTERVAL_MS):
+        self.parent = parent
+        self.sampler = sampler or get_sampler()
+        self.window_seconds = window_seconds
+        self.interval_ms = interval_ms
+        self.plot = MonitorPlot(window_seconds)
+        self.canvas = FigureCanvasTkAgg(self.plot.fig, master=parent)
+        self.plot.attach(self.canvas)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        self.frame_times: Deque[float] = deque(maxlen=FRAME_STATS)
+        self.running = False
+        self._after_id: Optional[str] = None
+        self._token: Optional[int] = None
+        self._rendered_version = -1
+
+    def start(self) -> None:
+        """Subscribe to the sampler and start the render loop on the Tk event loop"""
+        if not self.running:
+            self.running = True
+            self._token = self.sampler.subscribe(lambda sample: None)
+            self._after_id = self.parent.after(0, self._tick)
+
+    def _tick(self) -> None:
+        if not self.running or not self.parent.winfo_exists():
+            self.stop()
+            return
+        if self.sampler.version != self._rendered_version:
+            self._rendered_version = self.sampler.version
+            series = self.sampler.window(self.window_seconds, ('ram', 'cpu'), MAX_PLOT_POINTS)
+            self.plot.update(*series['ram'], *series['cpu'])
+            start = time.perf_counter()
+            self.plot.render()
+            self.frame_times.append(time.perf_counter() - start)
+        self._after_id = self.parent.after(self.interval_ms, self._tick)
+
+    def mean_frame_time(self) -> float:
+        """Average draw time per frame over the recent frames, in seconds"""
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def stop(self) -> None:
+        """Stop the render loop and release the sampler subscription"""
+        self.running = False
+        if self._token is not None:
+            self.sampler.unsubscribe(self._token)
+            self._token = None
+        if self._after_id is not None:
+            try:
+                self.parent.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
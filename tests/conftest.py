@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(ROOT, 'benchmarks')
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+
+sys.path[:0] = [ROOT, BENCHMARKS_DIR]
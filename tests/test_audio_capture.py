@@ -0,0 +1,48 @@
+import threading
+import time
+
+from audio_capture import SEGMENT_QUEUE, ListenService, RecognizerBackend
+from falsos import BackendFalso, MicrofoneFalso, gerar_pcm
+
+
+class _StuckBackend(RecognizerBackend):
+    """Blocks on the first segment until released, so the queue fills up"""
+    def __init__(self):
+        self.release = threading.Event()
+
+    def recognize(self, segment):
+        self.release.wait(10)
+        return None
+
+
+def test_segments_flow_from_end_of_speech_to_text():
+    utterances = []
+    service = ListenService(MicrofoneFalso(gerar_pcm(falas=4)), BackendFalso(),
+                            on_utterance=utterances.append)
+    service.set_continuous(True)
+    assert service.finished.wait(10)
+    service.stop()
+
+    assert len(utterances) == 4
+    assert all(u.text and u.text.startswith('fala de ') for u in utterances)
+    assert all(u.error is None for u in utterances)
+    # The fake backend answers instantly, so latency is pipeline overhead only
+    assert max(u.latency for u in utterances) < 0.5
+
+
+def test_stop_returns_with_a_full_segment_queue():
+    backend = _StuckBackend()
+    service = ListenService(MicrofoneFalso(gerar_pcm(falas=SEGMENT_QUEUE + 4)), backend)
+    service.set_continuous(True)
+    deadline = time.monotonic() + 10
+    while not service._segments.full() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service._segments.full()
+
+    stopper = threading.Thread(target=service.stop, daemon=True)
+    stopper.start()
+    stopper.join(3)  # bounded by the per-thread join timeout
+    stopped = not stopper.is_alive()
+    backend.release.set()
+    assert stopped
+    assert service.finished.wait(2)
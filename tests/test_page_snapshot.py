@@ -0,0 +1,26 @@
+import requests
+
+from fake_search_server import servir_paginas
+from page_snapshot import PageSnapshotter
+
+
+def test_busy_host_queues_without_holding_workers():
+    stored = []
+    with servir_paginas() as base_url:
+        snapshotter = PageSnapshotter(workers=4, per_host=2,
+                                      store=lambda *row: stored.append(row) or True)
+        hosts = [base_url, base_url.replace('127.0.0.1', 'localhost')]
+        # The first host's pages are all submitted first, enough to fill every worker
+        futures = [snapshotter.submit(i, f"{hosts[i // 6]}/pagina/artigo_culto.html?s=0.05")
+                   for i in range(12)]
+        jobs = [future.result(timeout=10) for future in futures]
+        snapshotter.close(wait=True)
+        stats = requests.get(f"{base_url}/estatisticas").json()
+
+    assert all(job.error is None and job.text for job in jobs)
+    assert len(stored) == 12
+    per_host = stats['simultaneas_max_por_host']
+    assert len(per_host) == 2
+    assert max(per_host.values()) <= 2
+    # One host's queue never starves the other: both ran at their limit together
+    assert stats['simultaneas_max'] > 2
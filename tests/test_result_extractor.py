@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from result_extractor import available_extractors, get_extractor
+
+
+def _page(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', available_extractors())
+def test_malformed_markup_keeps_every_result(name):
+    body = _page('resultados_malformados.html')
+    chunks = [body[i:i + 64] for i in range(0, len(body), 64)]
+    results = get_extractor(name).extract(chunks)
+    assert [r['link'].rsplit('/', 1)[1] for r in results] == [
+        'escala', 'repertorio', 'vozes', 'contato']
+    assert results[1]['title'] == 'Repertório do coral'
+    assert results[1]['snippet'].startswith('Hinos e cânticos')
+    assert 'Contato' not in results[2]['snippet']
+
+
+def test_unclosed_paragraphs_do_not_swallow_the_next_result():
+    html = ('<div class="tF2Cxc"><a href="/1"><h3>um</h3></a>'
+            '<div class="VwiC3b"><p>one<p>two</div></div>'
+            '<div class="tF2Cxc"><a href="/2"><h3>dois</h3></a></div>')
+    results = get_extractor('html.parser').extract_html(html)
+    assert [(r['title'], r['snippet']) for r in results] == [('um', 'onetwo...'), ('dois', '')]
+
+
+def test_stops_at_limit():
+    results = get_extractor('html.parser').extract([_page('resultados_culto.html')], limit=2)
+    assert len(results) == 2
@@ -0,0 +1,39 @@
+import itertools
+
+import pytest
+
+import database
+import search_cache
+from search_cache import SearchCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    database.definir_caminho_db(str(tmp_path / 'kb.db'))
+    database.inicializar_db()
+    yield SearchCache(max_entries=2, memory_entries=10)
+    database.fechar_conexoes()
+
+
+def _disk_keys(cache):
+    with database.conexao() as conn:
+        return {key for key, in conn.execute("SELECT chave FROM search_cache")}
+
+
+def test_memory_hits_keep_the_disk_entry_alive(cache, monkeypatch):
+    clock = itertools.count(1_000_000)
+    monkeypatch.setattr(search_cache.time, 'time', lambda: float(next(clock)))
+    cache.put('primeira', [{'title': '1'}])
+    cache.put('segunda', [{'title': '2'}])
+    assert cache.get('primeira') == [{'title': '1'}]  # served from memory
+    cache.put('terceira', [{'title': '3'}])
+    assert _disk_keys(cache) == {'primeira', 'terceira'}
+
+
+def test_evictions_are_counted_per_tier(cache):
+    cache.memory_entries = 1
+    for query in ('a', 'b', 'c'):
+        cache.put(query, [])
+    stats = cache.stats()
+    assert stats['memory_evictions'] == 2
+    assert stats['disk_evictions'] == 1
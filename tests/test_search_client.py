@@ -0,0 +1,40 @@
+import pytest
+import requests
+
+from fake_search_server import servir_paginas
+from search_client import MAX_DRAIN_BYTES, SearchClient
+
+
+def _stats(base_url):
+    return requests.get(f"{base_url}/estatisticas").json()
+
+
+@pytest.mark.parametrize('chunked', [False, True], ids=['content-length', 'chunked'])
+def test_early_stop_keeps_the_connection(chunked):
+    with servir_paginas(chunked=chunked) as base_url:
+        client = SearchClient(base_url=base_url, retries=0)
+        try:
+            for _ in range(5):
+                assert len(client.search('culto', limit=1)) == 1
+        finally:
+            client.close()
+        stats = _stats(base_url)
+    assert stats['requisicoes'] == 6
+    assert stats['conexoes'] == 2  # the client's one, plus the stats request
+
+
+@pytest.mark.parametrize('chunked', [False, True], ids=['content-length', 'chunked'])
+def test_large_remainder_closes_the_connection(chunked):
+    with servir_paginas(chunked=chunked) as base_url:
+        client = SearchClient(base_url=base_url, retries=0)
+        kb = 2 * MAX_DRAIN_BYTES // 1024
+        try:
+            for _ in range(2):
+                with client.session.get(f"{base_url}/grande", params={'kb': kb},
+                                        stream=True) as response:
+                    next(response.iter_content(1024))
+                    client._drain(response)
+        finally:
+            client.close()
+        stats = _stats(base_url)
+    assert stats['conexoes'] == 3
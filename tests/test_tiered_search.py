@@ -0,0 +1,41 @@
+import pytest
+
+import database
+from search_cache import SearchCache
+from tiered_search import TIER_KNOWLEDGE, TIER_NETWORK, TieredSearch
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    database.definir_caminho_db(str(tmp_path / 'kb.db'))
+    database.inicializar_db()
+    database.adicionar_informacao('horário do culto', 'Culto de domingo\nàs 19h', 'http://a/')
+    database.adicionar_informacao('coral', 'ensaio do coral antes do culto de domingo')
+    yield
+    database.fechar_conexoes()
+
+
+def _remote(query, on_result=None):
+    return [{'title': 'web', 'link': f'http://web/{query}', 'snippet': ''}]
+
+
+def _offline(query, on_result=None):
+    raise OSError('offline')
+
+
+def test_topic_match_answers_locally(knowledge):
+    answer = TieredSearch(SearchCache(), _offline).lookup('horario do culto')
+    assert answer.tier == TIER_KNOWLEDGE and answer.error is None
+    assert [r['topic'] for r in answer.results] == ['horário do culto']
+
+
+def test_content_only_match_goes_to_the_network(knowledge):
+    answer = TieredSearch(SearchCache(), _remote).lookup('culto domingo')
+    assert answer.tier == TIER_NETWORK
+
+
+def test_content_only_match_is_the_fallback_offline(knowledge):
+    answer = TieredSearch(SearchCache(), _offline).lookup('ensaio domingo')
+    assert answer.tier == TIER_KNOWLEDGE and not answer.stale
+    assert isinstance(answer.error, OSError)
+    assert [r['topic'] for r in answer.results] == ['coral']
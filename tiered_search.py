@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from database import buscar_resultados_locais
+from dispatcher import FILLER_WORDS
+from kb_replica import words
+from search_cache import SearchCache
+
+TIER_KNOWLEDGE = 'conhecimento'
+TIER_CACHE = 'cache'
+TIER_NETWORK = 'rede'
+
+LOCAL_BUDGET_MS = 50
+LOCAL_LIMIT = 5
+KNOWLEDGE_MAX_AGE = timedelta(days=90)
+
+TIER_DESCRIPTIONS = {
+    TIER_KNOWLEDGE: 'da base de conhecimento',
+    TIER_CACHE: 'em cache',
+    TIER_NETWORK: 'da internet',
+}
+
+
+class SearchAnswer:
+    """Results plus the tier that produced them"""
+    def __init__(self, results: List[dict], tier: str, stale: bool = False,
+                 elapsed: float = 0.0, error: Optional[Exception] = None):
+        self.results = results
+        self.tier = tier
+        self.stale = stale
+        self.elapsed = elapsed
+        self.error = error  # network error, when a stale local answer was used instead
+
+    @property
+    def description(self) -> str:
+        return TIER_DESCRIPTIONS[self.tier]
+
+
+def knowledge_to_result(topic: str, info: str, source: Optional[str]) -> dict:
+    """Convert a conhecimento row into the search result shape
+
+    Rows saved from a search hold "title\\nsnippet" and the link as source.
+    """
+    title, _, snippet = info.partition('\n')
+    return {'title': title or topic, 'link': source or '', 'snippet': snippet or info,
+            'topic': topic}
+
+
+def _covers(topic: str, terms: List[str]) -> bool:
+    """Whether every term starts some word of `topic`"""
+    if not terms:
+        return False
+    topic_words = words(topic)
+    return all(any(word.startswith(term) for word in topic_words) for term in terms)
+
+
+class TieredSearch:
+    """Answer a query from the result cache, then the knowledge base, then the network
+
+    Local tiers run within `local_budget_ms`. A knowledge base entry only
+    answers the query when it is newer than `knowledge_max_age` and its
+    topic has a word starting with each query word (fillers like "do"
+    aside); entries that merely mention the words somewhere do not keep
+    the network from being tried. Otherwise
+    `fetch_remote` is called and its results are cached; `on_result` is
+    handed to `fetch_remote` so network results can be shown as they stream
+    in. If the network fails or finds nothing and local entries were
+    found, those are returned instead, marked as stale when all are old.
+    """
+    def __init__(self, cache: SearchCache, fetch_remote: Callable[..., List[dict]],
+                 local_budget_ms: float = LOCAL_BUDGET_MS, local_limit: int = LOCAL_LIMIT,
+                 knowledge_max_age: timedelta = KNOWLEDGE_MAX_AGE):
+        self.cache = cache
+        self.fetch_remote = fetch_remote
+        self.local_budget_ms = local_budget_ms
+        self.local_limit = local_limit
+        self.knowledge_max_age = knowledge_max_age
+        self.served = {TIER_CACHE: 0, TIER_KNOWLEDGE: 0, TIER_NETWORK: 0}
+
+    def lookup(self, query: str,
+               on_result: Optional[Callable[[dict], None]] = None) -> SearchAnswer:
+        start = time.perf_counter()
+        cached = self.cache.get(query)
+        if cached is not None:
+            return self._answer(cached, TIER_CACHE, start)
+
+        fallback = None
+        remaining = self.local_budget_ms - (time.perf_counter() - start) * 1000
+        rows = buscar_resultados_locais(query, self.local_limit, max(remaining, 1))
+        if rows:
+            cutoff = self._cutoff()
+            terms = [term for term in words(query) if term not in FILLER_WORDS]
+            answers = [knowledge_to_result(topic, info, source)
+                       for topic, info, source, created in rows
+                       if not self._is_stale(created, cutoff) and _covers(topic, terms)]
+            if answers:
+                return self._answer(answers, TIER_KNOWLEDGE, start)
+            fallback = [knowledge_to_result(topic, info, source) for topic, info, source, _ in rows]
+            stale = all(self._is_stale(created, cutoff) for _, _, _, created in rows)
+
+        try:
+            results = self.fetch_remote(query, on_result)
+        except Exception as e:
+            if fallback is None:
+                raise
+            return self._answer(fallback, TIER_KNOWLEDGE, start, stale=stale, error=e)
+        if results:
+            self.cache.put(query, results)
+        elif fallback:
+            return self._answer(fallback, TIER_KNOWLEDGE, start, stale=stale)
+        return self._answer(results, TIER_NETWORK, start)
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None) - self.knowledge_max_age
+
+    @staticmethod
+    def _is_stale(created: Optional[str], cutoff: datetime) -> bool:
+        try:
+            return datetime.strptime(created, '%Y-%m-%d %H:%M:%S') < cutoff
+        except (TypeError, ValueError):
+            return False  # unknown age: trust it
+
+    def _answer(self, results, tier, start, stale=False, error=None) -> SearchAnswer:
+        self.served[tier] += 1
+        return SearchAnswer(results, tier, stale, time.perf_counter() - start, error)
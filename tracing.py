@@ -0,0 +1,322 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+MAX_TRACES = 200
+EXPORT_INTERVAL = 15.0  # seconds
+METRICS_FILE = 'jarvis_metrics.prom'
+METRIC_NAME = 'jarvis_span_seconds'
+
+
+class Histogram:
+    """Latency histogram with fixed bucket bounds, in the Prometheus layout"""
+    __slots__ = ('bounds', 'counts', 'count', 'total')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations <= bound) pairs, ending with +Inf"""
+        running = 0
+        pairs = []
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (0 if empty)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, running in self.cumulative():
+            if running >= target:
+                return bound
+        return float('inf')
+
+    def copy(self) -> 'Histogram':
+        clone = Histogram(self.bounds)
+        clone.counts = list(self.counts)
+        clone.count = self.count
+        clone.total = self.total
+        return clone
+
+
+class Span:
+    __slots__ = ('name', 'start', 'duration', 'thread')
+
+    def __init__(self, name: str, start: float, duration: float, thread: str):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, {self.duration * 1e3:.1f} ms)"
+
+
+class Trace:
+    """Spans of one command, from `execute_command` to the last reply spoken
+
+    Spans may be added from other threads (e.g. the speech worker) after
+    the command itself has returned.
+    """
+    def __init__(self, command: str):
+        self.command = command
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def report(self) -> str:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        lines = [f"{self.command}"]
+        for span in spans:
+            lines.append(f"  {span.name:<36} +{(span.start - self.start) * 1e3:8.1f} ms "
+                         f"{span.duration * 1e3:9.1f} ms  {span.thread}")
+        return '\n'.join(lines)
+
+
+class _NullSpan:
+    """Shared no-op context used while tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.tracer.record(self.name, self.start, time.perf_counter() - self.start)
+
+
+class _TraceScope(_ActiveSpan):
+    """Binds a new Trace to the current thread and times it as `execute_command`"""
+    __slots__ = ('trace', 'previous')
+
+    def __init__(self, tracer: 'Tracer', command: str):
+        super().__init__(tracer, 'execute_command')
+        self.trace = Trace(command)
+
+    def __enter__(self):
+        self.previous = getattr(self.tracer._local, 'trace', None)
+        self.tracer._local.trace = self.trace
+        super().__enter__()
+        return self.trace
+
+    def __exit__(self, *exc) -> None:
+        super().__exit__(*exc)
+        self.tracer._local.trace = self.previous
+        with self.tracer._lock:
+            self.tracer.traces.append(self.trace)
+
+
+class Tracer:
+    """Per-command spans and per-span latency histograms
+
+    While disabled, `span` and `trace` return a shared no-op context and
+    `deferred` returns None, so instrumented code pays one attribute check.
+    Histograms are keyed by span name (e.g. 'handler:_search_web',
+    'database:buscar_informacao') and can be exported to a Prometheus text
+    file and to the `latencias` table of the knowledge base.
+    """
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 max_traces: int = MAX_TRACES):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self.traces: Deque[Trace] = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._export_stop: Optional[threading.Event] = None
+        self._export_path: Optional[str] = None
+        self._export_thread: Optional[threading.Thread] = None
+
+    def span(self, name: str):
+        """Context manager timing a block; attached to the current trace, if any"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name)
+
+    def trace(self, command: str):
+        """Context manager starting the trace of one command on this thread"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _TraceScope(self, command)
+
+    def current(self) -> Optional[Trace]:
+        return getattr(self._local, 'trace', None)
+
+    def deferred(self, name: str) -> Optional[Callable[[], None]]:
+        """Start a span now and return a callable that ends it from any thread
+
+        Used for work handed to another thread, like queued speech.
+        """
+        if not self.enabled:
+            return None
+        trace = self.current()
+        start = time.perf_counter()
+        return lambda: self.record(name, start, time.perf_counter() - start, trace)
+
+    def record(self, name: str, start: float, duration: float,
+               trace: Optional[Trace] = None) -> None:
+        """Add a finished span to its histogram and to `trace` (default: current)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(duration)
+        trace = trace or self.current()
+        if trace is not None:
+            trace.add(Span(name, start, duration, threading.current_thread().name))
+
+    def snapshot(self) -> Dict[str, Histogram]:
+        with self._lock:
+            return {name: histogram.copy() for name, histogram in self.histograms.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.traces.clear()
+
+    def report(self) -> str:
+        lines = [f"{'span':<36} {'n':>7} {'média (ms)':>11} {'p50 ≤ (ms)':>11} {'p95 ≤ (ms)':>11}"]
+        for name, histogram in sorted(self.snapshot().items()):
+            lines.append(f"{name:<36} {histogram.count:>7} "
+                         f"{histogram.total / histogram.count * 1e3:>11.1f} "
+                         f"{histogram.quantile(0.5) * 1e3:>11.1f} "
+                         f"{histogram.quantile(0.95) * 1e3:>11.1f}")
+        return '\n'.join(lines)
+
+    def export_prometheus(self, path: str = METRICS_FILE) -> None:
+        """Write the histograms in the Prometheus text format (atomic replace)"""
+        lines = [f"# HELP {METRIC_NAME} Latency of each traced step of the assistant.",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        for name, histogram in sorted(self.snapshot().items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for bound, running in histogram.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{METRIC_NAME}_bucket{{span="{label}",le="{le}"}} {running}')
+            lines.append(f'{METRIC_NAME}_sum{{span="{label}"}} {histogram.total!r}')
+            lines.append(f'{METRIC_NAME}_count{{span="{label}"}} {histogram.count}')
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temporary, path)
+
+    def export_sqlite(self) -> None:
+        """Upsert one row per span into the `latencias` table of the knowledge base"""
+        from database import conexao
+        now = time.time()
+        rows = [(name, histogram.count, histogram.total, histogram.quantile(0.5),
+                 histogram.quantile(0.95), histogram.quantile(0.99),
+                 json.dumps([[None if bound == float('inf') else bound, running]
+                             for bound, running in histogram.cumulative()]), now)
+                for name, histogram in self.snapshot().items()]
+        with conexao() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS latencias (
+                span TEXT PRIMARY KEY,
+                total INTEGER NOT NULL,
+                soma_s REAL NOT NULL,
+                p50_s REAL,
+                p95_s REAL,
+                p99_s REAL,
+                buckets TEXT NOT NULL,
+                atualizado_em REAL NOT NULL
+            )
+            """)
+            conn.executemany("INSERT OR REPLACE INTO latencias VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             rows)
+
+    def export(self, path: Optional[str] = METRICS_FILE) -> None:
+        if path:
+            self.export_prometheus(path)
+        self.export_sqlite()
+
+    def start_export(self, path: Optional[str] = METRICS_FILE,
+                     interval: float = EXPORT_INTERVAL) -> None:
+        """Export every `interval` seconds on a background thread until `stop_export`"""
+        if self._export_thread is not None:
+            return
+        self._export_stop = stop = threading.Event()
+        self._export_path = path
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.export(path)
+                except Exception as e:
+                    print(f"Erro ao exportar métricas: {e}")
+
+        self._export_thread = threading.Thread(target=run, name='trace-export', daemon=True)
+        self._export_thread.start()
+
+    def stop_export(self) -> None:
+        """Stop the export thread and write the final numbers"""
+        if self._export_thread is None:
+            return
+        self._export_stop.set()
+        self._export_thread.join()
+        self._export_thread = None
+        self.export(self._export_path)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer (disabled until `enabled` is set)"""
+    return _tracer
+
+
+def traced(prefix: str):
+    """Decorator recording each call as a '<prefix>:<function name>' span"""
+    def decorate(func):
+        name = f"{prefix}:{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _ActiveSpan(_tracer, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate